@@ -11,4 +11,7 @@ _AVAILABLE_READERS: dict[str, Type['SystemReader']] = {}
 from .core import *
 from .io import *
 
+# Translators are imported lazily, so only the registry is loaded here
+from .translators import translate, detect_translators
+
 __all__ = [s for s in dir() if not s.startswith('_')]
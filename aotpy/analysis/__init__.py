@@ -0,0 +1,10 @@
+"""
+This subpackage contains tools for analysing the telemetry data of adaptive optics systems, such as spectral estimates
+and statistics.
+
+The tools work on `Image` data of any kind (in memory, memory-mapped or `LazyArray`), processing it in chunks so that
+data larger than the available memory can be analysed.
+"""
+
+from .spectral import *
+from .statistics import *
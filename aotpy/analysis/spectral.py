@@ -0,0 +1,192 @@
+"""
+This module contains functions for estimating the spectral content of time-dependent telemetry data.
+"""
+
+import math
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ..core.image import Image, LazyArray, SparseArray
+from ..core.loop import Loop
+
+__all__ = ['get_sampling_rate', 'psd']
+
+_NUMPY_WINDOWS = {
+    'hann': np.hanning,
+    'hanning': np.hanning,
+    'hamming': np.hamming,
+    'blackman': np.blackman,
+    'boxcar': np.ones,
+}
+
+
+def get_sampling_rate(image: Image, loop: Loop = None) -> float:
+    """
+    Get the sampling rate of the data in `image`.
+
+    The `framerate` of `loop` is used if available. Otherwise, the sampling rate is estimated from the median interval
+    between the timestamps of the `time` of `image`.
+
+    Parameters
+    ----------
+    image
+        Time-dependent image.
+    loop : optional
+        Loop associated with the image.
+
+    Raises
+    ------
+    ValueError
+        If the sampling rate cannot be found.
+    """
+    if loop is not None and loop.framerate:
+        return float(loop.framerate)
+    if image.time is not None and len(image.time.timestamps) > 1:
+        interval = np.median(np.diff(np.asarray(image.time.timestamps, dtype=float)))
+        if interval > 0:
+            return float(1 / interval)
+    raise ValueError(f"Cannot find the sampling rate of image '{image.name}'. Specify it, or a loop with a framerate.")
+
+
+def _get_window(window, nperseg: int) -> np.ndarray:
+    if not isinstance(window, str):
+        window = np.asarray(window, dtype=float)
+        if window.shape != (nperseg,):
+            raise ValueError(f"Window must have length nperseg ({nperseg}), got shape {window.shape}.")
+        return window
+    try:
+        from scipy.signal import get_window
+    except (ImportError, ModuleNotFoundError):
+        get_window = None
+    if get_window is not None:
+        return get_window(window, nperseg)
+    if window not in _NUMPY_WINDOWS:
+        raise ImportError(f"Window '{window}' requires the scipy module. Windows available without scipy: "
+                          f"{str(list(_NUMPY_WINDOWS))[1:-1]}")
+    # Periodic windows, as used for spectral analysis
+    return _NUMPY_WINDOWS[window](nperseg + 1)[:-1]
+
+
+def psd(image: Image | np.ndarray, axis: int = 0, nperseg: int = 256, window='hann', *, fs: float = None,
+        loop: Loop = None, noverlap: int = None, detrend: str | bool = 'constant', batch_size: int = None,
+        workers: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Estimate the power spectral density of time-dependent data with Welch's method, for all channels at once.
+
+    The data is split into overlapping segments along `axis`. Each segment is detrended and windowed, and the squared
+    magnitudes of their Fourier transforms are averaged. Segments are read and transformed in batches, accumulating
+    the result. The result is equivalent to `scipy.signal.welch` with ``scaling='density'`` and ``average='mean'``.
+
+    Parameters
+    ----------
+    image
+        Time-dependent data, for example `WavefrontSensor.measurements`, `Loop.commands` or
+        `ControlLoop.modal_coefficients`. May also be an array.
+    axis : default = 0
+        Axis that corresponds to time. `LazyArray` data only supports the first axis.
+    nperseg : default = 256
+        Length of each segment. If it is larger than the data, the length of the data is used instead.
+    window : default = 'hann'
+        Window applied to each segment. Either the name of a window (see `scipy.signal.get_window`; only ``'hann'``,
+        ``'hamming'``, ``'blackman'`` and ``'boxcar'`` are available without scipy) or an array of length `nperseg`.
+    fs : optional
+        Sampling rate. If None, it is obtained with `get_sampling_rate`. (in Hz units)
+    loop : optional
+        Loop associated with the data, whose `framerate` is used as sampling rate if `fs` is None.
+    noverlap : optional
+        Number of samples that consecutive segments overlap. If None, half of a segment is used.
+    detrend : default = 'constant'
+        ``'constant'`` to subtract the mean of each segment, or False to use the segments as they are.
+    batch_size : optional
+        Number of segments read and transformed at a time. If None, it is chosen so that each batch of data occupies
+        roughly `LazyArray.chunk_bytes`.
+    workers : optional
+        If given, batches are processed concurrently by a pool with this number of threads, which overlaps reading the
+        data with computing the transforms.
+
+    Returns
+    -------
+        Tuple containing the array of frequencies and the power spectral density, which has the same dimensions as the
+        data except along `axis`, which corresponds to the frequencies.
+
+    Raises
+    ------
+    ValueError
+        If the parameters are invalid or the sampling rate cannot be found.
+    """
+    if isinstance(image, Image):
+        if fs is None:
+            fs = get_sampling_rate(image, loop)
+        data = image.data
+    else:
+        if fs is None:
+            if loop is None or not loop.framerate:
+                raise ValueError("Sampling rate must be specified for arrays.")
+            fs = float(loop.framerate)
+        data = image
+    if isinstance(data, SparseArray):
+        data = data.todense()
+    elif not isinstance(data, (np.ndarray, LazyArray)):
+        data = np.asarray(data)
+    if np.issubdtype(data.dtype, np.complexfloating):
+        raise ValueError("Complex data is not supported.")
+    axis = range(len(data.shape))[axis]
+    if axis != 0:
+        if isinstance(data, LazyArray):
+            raise ValueError("Lazy data only supports computing the PSD along the first axis.")
+        # Moving the axis only creates a view, so memory-mapped data is still read one batch at a time
+        data = np.moveaxis(data, axis, 0)
+
+    n = len(data)
+    if n == 0:
+        raise ValueError("Data is empty.")
+    if nperseg > n:
+        warnings.warn(f"nperseg = {nperseg} is greater than the length of the data ({n}), using nperseg = {n}.")
+        nperseg = n
+    if noverlap is None:
+        noverlap = nperseg // 2
+    if not 0 <= noverlap < nperseg:
+        raise ValueError(f"noverlap must be non-negative and smaller than nperseg, got {noverlap}.")
+    if detrend not in ('constant', False):
+        raise ValueError(f"Unknown detrend '{detrend}', expected 'constant' or False.")
+
+    win = _get_window(window, nperseg)
+    step = nperseg - noverlap
+    n_segments = (n - noverlap) // step
+    if batch_size is None:
+        segment_bytes = max(nperseg * math.prod(data.shape[1:]) * max(data.dtype.itemsize, 8), 1)
+        batch_size = max(LazyArray.chunk_bytes // segment_bytes, 1)
+    win_shape = (1, -1) + (1,) * (len(data.shape) - 1)
+    win_batch = win.reshape(win_shape)
+
+    def process(first: int) -> np.ndarray:
+        count = min(batch_size, n_segments - first)
+        start = first * step
+        frames = np.asarray(data[start:start + (count - 1) * step + nperseg], dtype=np.float64)
+        # Segments are views into the frames read for this batch, with dimensions (segment, sample, channels...)
+        segments = np.lib.stride_tricks.sliding_window_view(frames, nperseg, axis=0)[::step]
+        segments = np.moveaxis(segments, -1, 1)
+        if detrend == 'constant':
+            segments = segments - segments.mean(axis=1, keepdims=True)
+        spectrum = np.fft.rfft(segments * win_batch, axis=1)
+        return (spectrum.real ** 2 + spectrum.imag ** 2).sum(axis=0)
+
+    batches = range(0, n_segments, batch_size)
+    if workers is None:
+        total = sum(process(first) for first in batches)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            total = sum(executor.map(process, batches))
+
+    result = total / (n_segments * fs * np.sum(win ** 2))
+    # One-sided spectrum: all frequencies except 0 (and the Nyquist frequency, if present) appear twice
+    if nperseg % 2:
+        result[1:] *= 2
+    else:
+        result[1:-1] *= 2
+    freqs = np.fft.rfftfreq(nperseg, 1 / fs)
+    if axis != 0:
+        result = np.moveaxis(result, 0, axis)
+    return freqs, result
@@ -0,0 +1,302 @@
+"""
+This module contains classes for computing statistics of time-dependent telemetry data in a single pass.
+"""
+
+import math
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..core.image import Image, _iter_chunks
+
+__all__ = ['StreamingStatistics', 'FrameStatistics', 'ImageStatistics', 'image_statistics']
+
+
+class StreamingStatistics:
+    """Statistics of each channel of time-dependent data, accumulated one chunk of frames at a time.
+
+    Mean and variance are computed with Welford's method (merging the statistics of each chunk), along with the
+    minimum, maximum and number of NaN values of each channel. Percentiles are estimated from a uniform random sample
+    of each channel (bottom-k sampling), which gives exact results while fewer than `sample_size` values have been seen.
+
+    Accumulators can be merged (see `merge`), so that statistics computed for different files (or in different
+    processes) can be aggregated without reading the data again.
+
+    Parameters
+    ----------
+    shape : default = ()
+        Shape of each frame (that is, the shape of the data without its first dimension).
+    sample_size : default = 1024
+        Number of values kept for each channel to estimate percentiles. Note that this uses
+        :math:`16 \\times sample\\_size` bytes per channel. If 0, percentiles are not available.
+    seed : optional
+        Seed for the random number generator used for sampling.
+    """
+
+    def __init__(self, shape: tuple[int, ...] = (), sample_size: int = 1024, seed=None) -> None:
+        self.shape: tuple[int, ...] = tuple(shape)
+        self.sample_size: int = sample_size
+        self._rng = np.random.default_rng(seed)
+        self._count = np.zeros(self.shape, dtype=np.int64)
+        self._nan_count = np.zeros(self.shape, dtype=np.int64)
+        self._mean = np.zeros(self.shape)
+        self._m2 = np.zeros(self.shape)
+        self._min = np.full(self.shape, np.inf)
+        self._max = np.full(self.shape, -np.inf)
+        self._sample = np.empty((0, *self.shape))
+        self._keys = np.empty((0, *self.shape))
+
+    def _combine(self, count, mean, m2, minimum, maximum, nan_count, sample, keys) -> None:
+        # Chan et al. pairwise update of the mean and the sum of squared deviations
+        total = self._count + count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = mean - self._mean
+            self._mean = np.where(total > 0, self._mean + delta * (count / total), 0)
+            self._m2 = np.where(total > 0, self._m2 + m2 + delta ** 2 * (self._count * count / total), 0)
+        self._count = total
+        self._nan_count = self._nan_count + nan_count
+        self._min = np.fmin(self._min, minimum)
+        self._max = np.fmax(self._max, maximum)
+        if self.sample_size:
+            # Keep the values with the smallest random keys, which is a uniform sample of all values seen
+            sample = np.concatenate([self._sample, sample])
+            keys = np.concatenate([self._keys, keys])
+            if len(keys) > self.sample_size:
+                index = np.argpartition(keys, self.sample_size - 1, axis=0)[:self.sample_size]
+                sample = np.take_along_axis(sample, index, axis=0)
+                keys = np.take_along_axis(keys, index, axis=0)
+            self._sample, self._keys = sample, keys
+
+    def update(self, frames: np.ndarray) -> 'StreamingStatistics':
+        """
+        Add a chunk of frames to the statistics.
+
+        Parameters
+        ----------
+        frames
+            Array with dimensions :math:`n \\times` `shape`.
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        if frames.shape[1:] != self.shape:
+            raise ValueError(f"Frames with shape {frames.shape[1:]} do not match statistics with shape {self.shape}.")
+        nans = np.isnan(frames)
+        count = len(frames) - nans.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(count > 0, np.nansum(frames, axis=0) / count, 0)
+        m2 = np.nansum((frames - mean) ** 2, axis=0)
+        sample = keys = None
+        if self.sample_size:
+            keys = self._rng.random(frames.shape)
+            keys[nans] = np.inf
+            sample = frames
+        self._combine(count, mean, m2, np.fmin.reduce(frames, axis=0, initial=np.inf),
+                      np.fmax.reduce(frames, axis=0, initial=-np.inf), nans.sum(axis=0), sample, keys)
+        return self
+
+    def merge(self, other: 'StreamingStatistics') -> 'StreamingStatistics':
+        """
+        Add the statistics accumulated by `other` to these statistics.
+
+        Parameters
+        ----------
+        other
+            Statistics of other data with the same frame shape.
+        """
+        if other.shape != self.shape:
+            raise ValueError(f"Statistics with shape {other.shape} cannot be merged with shape {self.shape}.")
+        self.sample_size = min(self.sample_size, other.sample_size)
+        self._combine(other._count, other._mean, other._m2, other._min, other._max, other._nan_count,
+                      other._sample, other._keys)
+        return self
+
+    @property
+    def count(self) -> np.ndarray:
+        """Number of values (excluding NaN) of each channel."""
+        return self._count
+
+    @property
+    def nan_count(self) -> np.ndarray:
+        """Number of NaN values of each channel."""
+        return self._nan_count
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Mean of each channel (NaN if there are no values)."""
+        return np.where(self._count > 0, self._mean, np.nan)
+
+    def variance(self, ddof: int = 0) -> np.ndarray:
+        """
+        Variance of each channel (NaN if there are not enough values).
+
+        Parameters
+        ----------
+        ddof : default = 0
+            Delta degrees of freedom, the divisor used is the number of values minus `ddof`.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self._count > ddof, self._m2 / (self._count - ddof), np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Standard deviation of each channel (NaN if there are no values)."""
+        return np.sqrt(self.variance())
+
+    @property
+    def min(self) -> np.ndarray:
+        """Minimum of each channel (NaN if there are no values)."""
+        return np.where(self._count > 0, self._min, np.nan)
+
+    @property
+    def max(self) -> np.ndarray:
+        """Maximum of each channel (NaN if there are no values)."""
+        return np.where(self._count > 0, self._max, np.nan)
+
+    def percentile(self, q) -> np.ndarray:
+        """
+        Estimate percentiles of each channel from the sampled values.
+
+        Parameters
+        ----------
+        q
+            Percentile or sequence of percentiles, between 0 and 100.
+
+        Returns
+        -------
+            Array with the dimensions of `q` followed by `shape`.
+        """
+        if not self.sample_size:
+            raise ValueError("Percentiles are not available, since no values were sampled (sample_size = 0).")
+        sample = np.where(np.isinf(self._keys), np.nan, self._sample)
+        if not len(sample):
+            return np.full(np.shape(q) + self.shape, np.nan)
+        with warnings.catch_warnings():
+            # Channels without values produce NaN, as with the other statistics
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanpercentile(sample, q, axis=0)
+
+
+@dataclass
+class FrameStatistics:
+    """Statistics of each frame of time-dependent data, computed over all channels."""
+
+    mean: np.ndarray
+    """Mean of each frame (NaN if the frame has no values)."""
+
+    variance: np.ndarray
+    """Variance of each frame (NaN if the frame has no values)."""
+
+    min: np.ndarray
+    """Minimum of each frame (NaN if the frame has no values)."""
+
+    max: np.ndarray
+    """Maximum of each frame (NaN if the frame has no values)."""
+
+    nan_count: np.ndarray
+    """Number of NaN values in each frame."""
+
+    @classmethod
+    def from_frames(cls, frames: np.ndarray) -> 'FrameStatistics':
+        """
+        Compute the statistics of each frame in `frames`.
+
+        Parameters
+        ----------
+        frames
+            Array whose first dimension corresponds to frames.
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        frames = frames.reshape(len(frames), math.prod(frames.shape[1:]))
+        nans = np.isnan(frames)
+        nan_count = nans.sum(axis=1)
+        count = frames.shape[1] - nan_count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.nansum(frames, axis=1) / count
+            variance = np.nansum((frames - mean[:, np.newaxis]) ** 2, axis=1) / count
+        empty = count == 0
+        minimum = np.fmin.reduce(frames, axis=1, initial=np.inf)
+        maximum = np.fmax.reduce(frames, axis=1, initial=-np.inf)
+        minimum[empty] = np.nan
+        maximum[empty] = np.nan
+        return cls(mean=mean, variance=variance, min=minimum, max=maximum, nan_count=nan_count)
+
+    @classmethod
+    def concatenate(cls, stats: list['FrameStatistics']) -> 'FrameStatistics':
+        """
+        Concatenate the statistics of consecutive sequences of frames.
+
+        Parameters
+        ----------
+        stats
+            Statistics to be concatenated, in order.
+        """
+        return cls(**{name: np.concatenate([getattr(s, name) for s in stats])
+                      for name in ('mean', 'variance', 'min', 'max', 'nan_count')})
+
+    def __len__(self) -> int:
+        return len(self.mean)
+
+
+@dataclass
+class ImageStatistics:
+    """Statistics of time-dependent data, as computed by `image_statistics`."""
+
+    channels: StreamingStatistics
+    """Statistics of each channel over time."""
+
+    frames: FrameStatistics = None
+    """Statistics of each frame over all channels, if computed."""
+
+    def merge(self, other: 'ImageStatistics') -> 'ImageStatistics':
+        """
+        Add the statistics of `other` (for example, from the next file of the same night) to these statistics. The
+        frames of `other` are assumed to follow the frames of these statistics.
+
+        Parameters
+        ----------
+        other
+            Statistics of other data with the same frame shape.
+        """
+        self.channels.merge(other.channels)
+        if self.frames is not None and other.frames is not None:
+            self.frames = FrameStatistics.concatenate([self.frames, other.frames])
+        else:
+            self.frames = None
+        return self
+
+
+def image_statistics(image: Image | np.ndarray, *, chunk: int = None, per_frame: bool = True,
+                     sample_size: int = 1024, seed=None) -> ImageStatistics:
+    """
+    Compute the statistics of each channel and of each frame of time-dependent data, reading it only once.
+
+    Works on any data whose first dimension is time, such as
+    `WavefrontSensor.measurements`, `WavefrontSensor.subaperture_intensities`, `Loop.commands` or
+    `Detector.pixel_intensities`.
+
+    Parameters
+    ----------
+    image
+        Time-dependent data. May also be an array.
+    chunk : optional
+        Number of frames processed at a time. If None, it is chosen so that each chunk occupies roughly
+        `LazyArray.chunk_bytes`.
+    per_frame : default = True
+        Whether statistics of each frame should also be computed.
+    sample_size : default = 1024
+        Number of values kept for each channel to estimate percentiles, see `StreamingStatistics`.
+    seed : optional
+        Seed for the random number generator used for sampling.
+    """
+    data = image.data if isinstance(image, Image) else image
+    if not hasattr(data, 'shape'):
+        data = np.asarray(data)
+    channels = StreamingStatistics(tuple(data.shape[1:]), sample_size=sample_size, seed=seed)
+    frames = []
+    for _, x in _iter_chunks(data, chunk):
+        channels.update(x)
+        if per_frame:
+            frames.append(FrameStatistics.from_frames(x))
+    if per_frame and not frames:
+        frames.append(FrameStatistics.from_frames(np.empty((0, *data.shape[1:]))))
+    return ImageStatistics(channels=channels, frames=FrameStatistics.concatenate(frames) if per_frame else None)
@@ -0,0 +1,227 @@
+"""
+This module contains tools for translating whole directory trees of non-standard AO telemetry data into AOT files.
+
+Datasets are discovered with the translator registry (see `aotpy.translators.registry`) and translated in parallel by a
+pool of processes. Progress is recorded in a manifest file in the output directory, keyed by a fingerprint of each
+dataset, so that interrupted runs can be resumed and datasets that were already translated are skipped.
+"""
+
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from .translators.cache import fingerprint as _fingerprint
+from .translators.registry import detect_translators, get_translator
+
+__all__ = ['BatchItem', 'find_datasets', 'fingerprint', 'translate_tree']
+
+MANIFEST_NAME = 'aotpy_manifest.json'
+_MANIFEST_VERSION = 1
+
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+
+
+@dataclass
+class BatchItem:
+    """Dataset found by `find_datasets`, along with the result of its translation."""
+
+    input: Path
+    """Path to the dataset (file or folder, depending on the translator)."""
+
+    translator: str
+    """Name of the translator that handles the dataset."""
+
+    args: tuple
+    """Positional arguments for initializing the translator."""
+
+    output: Path = None
+    """Path to the AOT file produced from the dataset."""
+
+    fingerprint: str = None
+    """Fingerprint of the dataset, as computed by `fingerprint`."""
+
+    status: str = None
+    """Result of the translation: ``'done'``, ``'failed'`` or ``'skipped'`` (already translated in a previous run)."""
+
+    error: str = None
+    """Description of the error that occurred during translation, if it failed."""
+
+
+def find_datasets(root: str | os.PathLike) -> list[BatchItem]:
+    """
+    Find all datasets under `root` that can be handled by a registered translator.
+
+    Once a folder is recognized as a dataset, its subfolders are not searched. Paths recognized by more than one
+    translator are skipped with a warning.
+
+    Parameters
+    ----------
+    root
+        Path to the directory tree to be searched.
+    """
+    items = []
+
+    def check(path: Path) -> bool:
+        detected = detect_translators(path)
+        if len(detected) > 1:
+            warnings.warn(f"Skipping '{path}': recognized by more than one translator "
+                          f"({str(list(detected))[1:-1]}).")
+            return True
+        if detected:
+            items.append(BatchItem(path, *next(iter(detected.items()))))
+            return True
+        return False
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirpath = Path(dirpath)
+        if check(dirpath):
+            dirnames.clear()
+            continue
+        dirnames.sort()
+        for filename in sorted(filenames):
+            check(dirpath / filename)
+    return items
+
+
+def fingerprint(path: str | os.PathLike, translator: str = '', translator_kwargs: dict = None) -> str:
+    """
+    Compute a fingerprint that identifies the current state of the dataset in `path`.
+
+    The fingerprint is based on the relative path, size and modification time of every file in the dataset (file
+    contents are not read), as well as the translator and its options. Any change in these produces a new fingerprint.
+
+    Parameters
+    ----------
+    path
+        Path to the dataset (file or folder).
+    translator : default = ''
+        Name of the translator used for the dataset.
+    translator_kwargs : optional
+        Keyword arguments passed on to the translator.
+    """
+    return _fingerprint(path, extra=(translator, sorted((translator_kwargs or {}).items())))
+
+
+def _load_manifest(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get('version') != _MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in '{path}'.")
+    return manifest['items']
+
+
+def _save_manifest(path: Path, items: dict) -> None:
+    # Write to a temporary file first, so that a crash never leaves a corrupted manifest behind
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump({'version': _MANIFEST_VERSION, 'items': items}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _translate_one(translator: str, args: tuple, translator_kwargs: dict, output: Path, write_kwargs: dict) -> None:
+    cls = get_translator(translator)
+    if cls._supports_lazy:
+        translator_kwargs = {'lazy': True, **translator_kwargs}
+    # Only move the file into place once it is complete, so that a crash never leaves a truncated file as output
+    partial = output.with_name(f'{output.stem}.{os.getpid()}.partial{output.suffix}')
+    try:
+        cls(*args, **translator_kwargs).system.write_to_file(partial, overwrite=True, **write_kwargs)
+        os.replace(partial, output)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def translate_tree(root: str | os.PathLike, out_dir: str | os.PathLike, *, workers: int = None,
+                   translator_kwargs: dict[str, dict] = None, retry_failed: bool = True,
+                   extension: str = 'fits', **kwargs) -> list[BatchItem]:
+    """
+    Translate every dataset found under `root` into an AOT file in `out_dir`, using a pool of processes.
+
+    Output files mirror the structure of the input tree (for example, the dataset in ``root/night1/ciao`` is written
+    to ``out_dir/night1/ciao.fits``). Progress is recorded in a manifest file in `out_dir` after each dataset is
+    translated. When this function is run again, datasets whose fingerprint (see `fingerprint`) matches a successful
+    translation in the manifest are skipped, so interrupted runs resume where they left off and only new or modified
+    datasets are translated.
+
+    Parameters
+    ----------
+    root
+        Path to the directory tree that contains the datasets (see `find_datasets`).
+    out_dir
+        Path to the directory where the AOT files and the manifest are written.
+    workers : optional
+        Maximum number of worker processes. If None, it defaults to the number of processors on the machine.
+    translator_kwargs : optional
+        Dictionary mapping translator names to the keyword arguments passed on to them (for example
+        ``{'CIAO': {'at_number': 1}}``).
+    retry_failed : default = True
+        Whether datasets that failed in a previous run should be translated again.
+    extension : default = 'fits'
+        Extension of the output files, which determines the writer used.
+    **kwargs
+        Keyword arguments passed on to `AOSystem.write_to_file` (for example ``chunk_size``).
+
+    Returns
+    -------
+        List with the datasets found and the result of their translation.
+    """
+    root = Path(root)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    translator_kwargs = translator_kwargs or {}
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+
+    items = find_datasets(root)
+    pending = []
+    for item in items:
+        rel = item.input.relative_to(root) if item.input != root else Path(root.name)
+        item.output = out_dir / rel.parent / f'{rel.stem if item.input.is_file() else rel.name}.{extension}'
+        item.fingerprint = fingerprint(item.input, item.translator, translator_kwargs.get(item.translator))
+        entry = manifest.get(item.fingerprint)
+        if entry is not None and (entry['status'] == STATUS_DONE and (out_dir / entry['output']).is_file() or
+                                  entry['status'] == STATUS_FAILED and not retry_failed):
+            item.status = STATUS_SKIPPED
+            item.error = entry.get('error')
+        else:
+            pending.append(item)
+
+    if not pending:
+        return items
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for item in pending:
+            item.output.parent.mkdir(parents=True, exist_ok=True)
+            futures[executor.submit(_translate_one, item.translator, item.args,
+                                    translator_kwargs.get(item.translator, {}), item.output, kwargs)] = item
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                item.status = STATUS_FAILED
+                item.error = f'{type(e).__name__}: {e}'
+                warnings.warn(f"Failed to translate '{item.input}' with {item.translator}: {item.error}")
+            else:
+                item.status = STATUS_DONE
+            rel = str(item.input.relative_to(root))
+            # Entries from previous versions of the same dataset are no longer useful
+            for key in [k for k, v in manifest.items() if v['input'] == rel]:
+                del manifest[key]
+            manifest[item.fingerprint] = {
+                'input': rel,
+                'translator': item.translator,
+                'output': str(item.output.relative_to(out_dir)),
+                'status': item.status,
+                'error': item.error
+            }
+            _save_manifest(manifest_path, manifest)
+    return items
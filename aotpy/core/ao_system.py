@@ -8,9 +8,13 @@ from datetime import datetime
 from pathlib import Path
 
 from .atmosphere import AtmosphericParameters
-from .base import Metadatum
+from .base import Metadatum, Referenceable
+from .image import Image
 from .loop import Loop
+from .memory import MemoryReport
 from .optical_sensor import WavefrontSensor, ScoringCamera
+from .registry import SystemRegistry
+from .shared import SharedSystem, SharedSystemHandle
 from .source import Source
 from .telescope import MainTelescope
 from .wavefront_corrector import WavefrontCorrector
@@ -73,6 +77,104 @@ class AOSystem:
     metadata: list[Metadatum] = field(default_factory=list)
     """List of Metadatum objects that are associated with the overall system."""
 
+    _registry: SystemRegistry = field(default=None, init=False, repr=False, compare=False)
+    _registry_key: tuple = field(default=None, init=False, repr=False, compare=False)
+
+    def _get_registry_key(self) -> tuple:
+        # Identity of every object directly held by the system. If any of the lists changes, the key changes.
+        return (id(self.main_telescope),) + tuple(
+            tuple(id(x) for x in objs) for objs in (self.atmosphere_params, self.sources, self.scoring_cameras,
+                                                    self.wavefront_sensors, self.wavefront_correctors, self.loops))
+
+    @property
+    def registry(self) -> SystemRegistry:
+        """
+        Index of all objects reachable from the system, which allows constant time lookups by `uid` or image name.
+
+        The registry is rebuilt automatically if the lists of objects in the system have changed since it was last
+        built. Changes to nested references are only detected after calling `refresh_registry`.
+        """
+        if self._registry is None or self._registry_key != self._get_registry_key():
+            return self.refresh_registry()
+        return self._registry
+
+    def refresh_registry(self) -> SystemRegistry:
+        """
+        Rebuild the registry of objects in the system and return it.
+        """
+        self._registry = SystemRegistry(self)
+        self._registry_key = self._get_registry_key()
+        return self._registry
+
+    def get_object(self, uid: str, cls: type = Referenceable) -> Referenceable:
+        """
+        Return the object in the system identified by `uid`. See `SystemRegistry.get`.
+
+        Parameters
+        ----------
+        uid
+            Unique identifier of the object.
+        cls : default = Referenceable
+            Type of the object being searched, used to disambiguate objects of different types sharing the same `uid`.
+        """
+        return self.registry.get(uid, cls)
+
+    def get_image(self, name: str) -> Image:
+        """
+        Return the `Image` in the system identified by `name` (case-insensitive). See `SystemRegistry.get_image`.
+
+        Parameters
+        ----------
+        name
+            Name of the image.
+        """
+        return self.registry.get_image(name)
+
+    def __getstate__(self) -> dict:
+        # The registry is indexed by object identity, which is not preserved when pickling. It is rebuilt on demand.
+        state = self.__dict__.copy()
+        state['_registry'] = None
+        state['_registry_key'] = None
+        return state
+
+    def to_shared(self) -> SharedSystem:
+        """
+        Copy the image data of the system into shared memory blocks, so that it can be used by other processes without
+        being copied again. Only the object graph and the block descriptors (`SharedSystem.handle`) need to be sent to
+        other processes, which can then rebuild the system with `AOSystem.from_shared`.
+
+        The returned `SharedSystem` owns the blocks, which are released when it is closed. It can be used as a context
+        manager::
+
+            with system.to_shared() as shared:
+                with ProcessPoolExecutor() as executor:
+                    executor.map(analyse, itertools.repeat(shared.handle, n))
+        """
+        return SharedSystem(self)
+
+    @staticmethod
+    def from_shared(handle: SharedSystemHandle) -> 'AOSystem':
+        """
+        Rebuild `AOSystem` from a handle created by `AOSystem.to_shared`. The image data is not copied: it is backed by
+        the shared memory blocks and is therefore read-only.
+
+        Parameters
+        ----------
+        handle
+            Handle obtained from `SharedSystem.handle`.
+        """
+        return SharedSystem.load(handle)
+
+    def memory_report(self) -> MemoryReport:
+        """
+        Return a `MemoryReport` describing the bytes held by each image in the system and by each object that
+        references them. The report also indicates which images are views or memory-mapped and which are referenced
+        more than once.
+
+        The registry is refreshed before building the report, so that nested changes are taken into account.
+        """
+        return MemoryReport.from_registry(self.refresh_registry())
+
     def write_to_file(self, filename: str | os.PathLike, **kwargs) -> None:
         """
         Writes `AOSystem` to a file. The writing function is deduced by the extension in the specified `filename`.
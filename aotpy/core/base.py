@@ -3,14 +3,115 @@ This module contains a classes used as a base for the rest of the core of aotpy.
 """
 
 from collections import namedtuple
+from collections.abc import Iterable, MutableSequence
 from dataclasses import dataclass
 from typing import Any
 
-__all__ = ['Referenceable', 'Coordinates', 'Metadatum']
+import numpy as np
+
+__all__ = ['Referenceable', 'Coordinates', 'CoordinatesArray', 'Metadatum']
 
 Coordinates = namedtuple('Coordinates', 'x y')
 
 
+class CoordinatesArray(MutableSequence):
+    """Sequence of `Coordinates` backed by a single :math:`N \\times 2` float array.
+
+    Behaves like a list of `Coordinates` (indexing returns `Coordinates`, it can be iterated, appended to and compared
+    with lists), while storing all values contiguously. This makes handling large sets of coordinates (for example the
+    actuators of large deformable mirrors) much cheaper, as whole columns can be accessed via `x` and `y`.
+
+    Parameters
+    ----------
+    coordinates
+        Either an :math:`N \\times 2` array or an iterable of `Coordinates` (or any other pairs of numbers).
+    """
+
+    def __init__(self, coordinates: Iterable = ()) -> None:
+        array = np.array(coordinates if isinstance(coordinates, np.ndarray) else list(coordinates), dtype=np.float64)
+        if array.size == 0:
+            array = array.reshape(0, 2)
+        if array.ndim != 2 or array.shape[1] != 2:
+            raise ValueError(f"Coordinates must have shape (N, 2), got {array.shape}.")
+        self._array = array
+
+    @classmethod
+    def from_xy(cls, x: Iterable, y: Iterable) -> 'CoordinatesArray':
+        """
+        Create `CoordinatesArray` from separate sequences of horizontal and vertical coordinates.
+
+        Parameters
+        ----------
+        x
+            Horizontal coordinates. Null values (`None`) are converted to NaN.
+        y
+            Vertical coordinates. Must have the same length as `x`. Null values (`None`) are converted to NaN.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.shape != y.shape or x.ndim != 1:
+            raise ValueError("'x' and 'y' must be one-dimensional and have the same length.")
+        return cls(np.column_stack([x, y]))
+
+    @property
+    def array(self) -> np.ndarray:
+        """The underlying :math:`N \\times 2` array."""
+        return self._array
+
+    @property
+    def x(self) -> np.ndarray:
+        """Horizontal coordinates (view over the underlying array)."""
+        return self._array[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        """Vertical coordinates (view over the underlying array)."""
+        return self._array[:, 1]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is None:
+            return self._array
+        return self._array.astype(dtype)
+
+    def __len__(self) -> int:
+        return self._array.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CoordinatesArray(self._array[index])
+        return Coordinates(*self._array[index].tolist())
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            self._array[index] = CoordinatesArray(value).array
+        else:
+            self._array[index] = value
+
+    def __delitem__(self, index) -> None:
+        self._array = np.delete(self._array, index, axis=0)
+
+    def __iter__(self):
+        return (Coordinates(x, y) for x, y in self._array.tolist())
+
+    def insert(self, index: int, value) -> None:
+        self._array = np.insert(self._array, index, value, axis=0)
+
+    def extend(self, values: Iterable) -> None:
+        self._array = np.concatenate([self._array, CoordinatesArray(values).array])
+
+    def __eq__(self, other) -> bool:
+        try:
+            other = np.asarray(other, dtype=np.float64)
+        except (TypeError, ValueError):
+            return NotImplemented
+        if other.size == 0:
+            return len(self) == 0
+        return other.shape == self._array.shape and np.array_equal(self._array, other, equal_nan=True)
+
+    def __repr__(self) -> str:
+        return f'CoordinatesArray({self._array.tolist()})'
+
+
 @dataclass
 class Metadatum:
     """Contains a set of key, value and (optionally) comment which describe the Image data in some aspect."""
@@ -2,6 +2,8 @@
 This module contains classes that define multidimensional data in AOT and their respective metadata.
 """
 
+import math
+import os
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -10,7 +12,517 @@ import numpy as np
 from .base import Metadatum
 from .time import Time
 
-__all__ = ['Image']
+__all__ = ['Image', 'SparseArray', 'LazyArray']
+
+
+class SparseArray:
+    """Multidimensional sparse array in coordinate (COO) format.
+
+    Only the non-zero values are stored, along with their respective indices. This is useful for data that is mostly
+    zeros, such as influence functions or interaction matrices of large deformable mirrors. The array can be densified
+    on demand with `todense` (or `numpy.asarray`).
+
+    Parameters
+    ----------
+    coords
+        Indices of the stored values, with dimensions :math:`n_{dim} \\times n_{nz}`.
+    values
+        Stored values, with dimensions :math:`n_{nz}`.
+    shape
+        Shape of the equivalent dense array.
+    """
+
+    def __init__(self, coords: np.ndarray, values: np.ndarray, shape: tuple[int, ...]) -> None:
+        self.shape: tuple[int, ...] = tuple(int(x) for x in shape)
+        self.coords: np.ndarray = np.asarray(coords, dtype=np.int64).reshape(len(self.shape), -1)
+        self.values: np.ndarray = np.asarray(values).reshape(-1)
+        if self.coords.shape[1] != self.values.size:
+            raise ValueError(f"Number of indices ({self.coords.shape[1]}) does not match number of values "
+                             f"({self.values.size}).")
+        if self.values.size and (np.any(self.coords < 0) or
+                                 np.any(self.coords.max(axis=1) >= np.array(self.shape, dtype=np.int64))):
+            raise ValueError(f"Indices out of bounds for shape {self.shape}.")
+
+    @classmethod
+    def from_dense(cls, array: np.ndarray) -> 'SparseArray':
+        """
+        Create `SparseArray` containing the non-zero values of a dense `array`.
+
+        Parameters
+        ----------
+        array
+            Dense array to be converted.
+        """
+        array = np.asarray(array)
+        coords = np.nonzero(array)
+        return cls(np.array(coords, dtype=np.int64).reshape(array.ndim, -1), array[coords], array.shape)
+
+    @classmethod
+    def from_scipy(cls, matrix, shape: tuple[int, ...] = None) -> 'SparseArray':
+        """
+        Create `SparseArray` from a scipy sparse matrix/array (any format).
+
+        Parameters
+        ----------
+        matrix
+            Scipy sparse matrix to be converted.
+        shape : optional
+            Shape of the resulting array. If given, the 2D matrix is interpreted as a flattened version of this shape,
+            where the first dimension is kept and all others are flattened (C order). For example, an influence
+            function with dimensions :math:`a_v \\times h \\times w` can be stored as a matrix with dimensions
+            :math:`a_v \\times (h w)`.
+        """
+        coo = matrix.tocoo()
+        if shape is None:
+            return cls(np.vstack([coo.row, coo.col]), coo.data, coo.shape)
+        shape = tuple(shape)
+        if shape[0] != coo.shape[0] or math.prod(shape[1:]) != coo.shape[1]:
+            raise ValueError(f"Matrix with shape {coo.shape} cannot be interpreted as shape {shape}.")
+        coords = np.vstack([coo.row, *np.unravel_index(coo.col, shape[1:])]) if len(shape) > 1 else coo.row
+        return cls(coords, coo.data, shape)
+
+    @property
+    def ndim(self) -> int:
+        """Number of dimensions of the array."""
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        """Number of elements of the equivalent dense array."""
+        return math.prod(self.shape)
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored values."""
+        return self.values.size
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Data type of the values."""
+        return self.values.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used to store indices and values."""
+        return self.coords.nbytes + self.values.nbytes
+
+    def todense(self) -> np.ndarray:
+        """
+        Return the equivalent dense array. Repeated indices are summed.
+        """
+        dense = np.zeros(self.shape, dtype=self.dtype)
+        np.add.at(dense, tuple(self.coords), self.values)
+        return dense
+
+    def to_scipy(self, fmt: str = 'csr'):
+        """
+        Return the array as a 2D scipy sparse matrix, keeping the first dimension and flattening all others (C order).
+        Requires scipy.
+
+        Parameters
+        ----------
+        fmt : default = 'csr'
+            Scipy sparse format of the returned matrix (for example ``'csr'``, ``'csc'`` or ``'coo'``).
+        """
+        try:
+            from scipy import sparse
+        except (ImportError, ModuleNotFoundError):
+            raise ImportError("Converting to scipy sparse matrices requires the scipy module.") from None
+        if self.ndim == 1:
+            shape = (1, self.shape[0])
+            row, col = np.zeros_like(self.coords[0]), self.coords[0]
+        else:
+            shape = (self.shape[0], math.prod(self.shape[1:]))
+            row, col = self.coords[0], np.ravel_multi_index(tuple(self.coords[1:]), self.shape[1:])
+        # scipy only supports native byte order
+        values = self.values.astype(self.values.dtype.newbyteorder('='), copy=False)
+        return sparse.coo_matrix((values, (row, col)), shape=shape).asformat(fmt)
+
+    def _canonical(self) -> tuple[np.ndarray, np.ndarray]:
+        # Linear indices and values, sorted and with repeated indices summed
+        linear = np.ravel_multi_index(tuple(self.coords), self.shape) if self.nnz else np.empty(0, dtype=np.int64)
+        unique, inverse = np.unique(linear, return_inverse=True)
+        values = np.zeros(unique.size, dtype=self.dtype)
+        np.add.at(values, inverse, self.values)
+        keep = values != 0
+        return unique[keep], values[keep]
+
+    def allclose(self, other: 'SparseArray') -> bool:
+        """
+        Check if both sparse arrays have the same shape and approximately the same values.
+
+        Parameters
+        ----------
+        other
+            Array to compare against.
+        """
+        if self.shape != other.shape:
+            return False
+        a_idx, a_val = self._canonical()
+        b_idx, b_val = other._canonical()
+        return np.array_equal(a_idx, b_idx) and np.allclose(a_val, b_val)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        dense = self.todense()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f'SparseArray(shape={self.shape}, nnz={self.nnz}, dtype={self.dtype})'
+
+
+class LazyArray:
+    """Multidimensional array whose data is only computed when requested, in chunks along the first dimension.
+
+    The data is obtained by applying `func` to consecutive slices of `source` (for example, a memory-mapped column of a
+    FITS binary table), so that arrays larger than the available memory can be processed or written one chunk at a
+    time. The full array can be computed on demand with `load` (or `numpy.asarray`), while indexing the first dimension
+    with integers, slices or one-dimensional integer or boolean arrays only computes the frames around the selection.
+
+    Methods that process time-dependent data (such as `ControlLoop.reconstruct_modes`, `Detector.calibrated_pixels` or
+    `aotpy.analysis.psd`) read it in chunks of frames that occupy roughly `chunk_bytes` (unless told otherwise by
+    their ``chunk`` argument), so that only one chunk needs to be in memory at a time. Their input may therefore be a
+    `LazyArray` or a memory-mapped array larger than the available memory, and their output may be written into a
+    memory-mapped file.
+
+    Parameters
+    ----------
+    source
+        Array-like object that supports `len` and slicing along its first dimension.
+    func : optional
+        Function applied to each slice of `source`. It must preserve the length of the first dimension of the slice.
+        If None, the slices are returned as they are.
+    """
+
+    chunk_bytes: int = 64 * 1024 ** 2
+    """Default size of the chunks returned by `iter_chunks` and processed at a time by methods that read
+    time-dependent data in chunks, in bytes."""
+
+    def __init__(self, source, func=None) -> None:
+        self.source = source
+        self.func = func
+        # Apply the function to an empty slice in order to find the shape and type of the result
+        sample = self._compute(0, 0)
+        self.shape: tuple[int, ...] = (len(source), *sample.shape[1:])
+        self.dtype: np.dtype = sample.dtype
+
+    @classmethod
+    def concatenate(cls, arrays: list) -> 'LazyArray':
+        """
+        Concatenate `arrays` along their first dimension, without copying them. Each chunk is assembled from the
+        arrays it spans only when it is computed.
+
+        Parameters
+        ----------
+        arrays
+            Array-like objects that support `len` and slicing along their first dimension. All other dimensions must
+            match.
+        """
+        return cls(_Concatenation(arrays))
+
+    def _compute(self, start: int, stop: int) -> np.ndarray:
+        chunk = self.source[start:stop]
+        if self.func is not None:
+            chunk = self.func(chunk)
+        return np.asarray(chunk)
+
+    @property
+    def ndim(self) -> int:
+        """Number of dimensions of the array."""
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        """Number of elements of the array."""
+        return math.prod(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes the array occupies once computed."""
+        return self.size * self.dtype.itemsize
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def _default_chunk_size(self) -> int:
+        # Number of elements of the first dimension that occupy roughly `chunk_bytes`
+        row_bytes = max(math.prod(self.shape[1:]) * self.dtype.itemsize, 1)
+        return max(self.chunk_bytes // row_bytes, 1)
+
+    def map(self, func) -> 'LazyArray':
+        """
+        Return a new `LazyArray` whose chunks are the result of applying `func` to the chunks of this array.
+
+        Parameters
+        ----------
+        func
+            Function applied to each chunk. It must preserve the length of the first dimension of the chunk.
+        """
+        return LazyArray(self, func)
+
+    def iter_chunks(self, chunk_size: int = None):
+        """
+        Iterate over the array in chunks along the first dimension.
+
+        Parameters
+        ----------
+        chunk_size : optional
+            Number of elements of the first dimension in each chunk. If None, it is chosen so that each chunk occupies
+            roughly `chunk_bytes`.
+        """
+        if chunk_size is None:
+            chunk_size = self._default_chunk_size()
+        for start in range(0, len(self), chunk_size):
+            yield self._compute(start, min(start + chunk_size, len(self)))
+
+    def load(self) -> np.ndarray:
+        """
+        Compute the full array.
+        """
+        out = np.empty(self.shape, dtype=self.dtype)
+        start = 0
+        for chunk in self.iter_chunks():
+            out[start:start + len(chunk)] = chunk
+            start += len(chunk)
+        return out
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        first, rest = key[0], key[1:]
+        if isinstance(first, (int, np.integer)):
+            first = range(len(self))[first]
+            return self._compute(first, first + 1)[(0, *rest)]
+        if isinstance(first, slice):
+            start, stop, step = first.indices(len(self))
+            if step == 1:
+                return self._compute(start, max(start, stop))[(slice(None), *rest)]
+            indices = np.arange(start, stop, step)
+        elif (indices := self._frame_indices(first)) is None:
+            # Any other kind of indexing requires the full array
+            return self.load()[key]
+        # Selected frames are read in bounded contiguous ranges, rather than computing the full array
+        return _take_frames(self, indices, self._default_chunk_size())[(slice(None), *rest)]
+
+    def _frame_indices(self, key) -> np.ndarray | None:
+        """
+        Convert a one-dimensional integer or boolean index along the first dimension into non-negative frame indices.
+        Returns None if `key` is not such an index.
+        """
+        if not isinstance(key, (list, np.ndarray, range)):
+            return None
+        indices = np.asarray(key)
+        if indices.ndim != 1:
+            return None
+        if indices.dtype == bool:
+            if len(indices) != len(self):
+                raise IndexError(f"Boolean index has length {len(indices)}, but the array has length {len(self)}.")
+            return np.flatnonzero(indices)
+        if indices.size == 0:
+            return indices.astype(np.intp)
+        if not np.issubdtype(indices.dtype, np.integer):
+            return None
+        if np.any((indices < -len(self)) | (indices >= len(self))):
+            raise IndexError(f"Index out of bounds for array with length {len(self)}.")
+        return np.where(indices < 0, indices + len(self), indices).astype(np.intp)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        out = self.load()
+        return out if dtype is None else out.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f'LazyArray(shape={self.shape}, dtype={self.dtype})'
+
+
+class _Concatenation:
+    """Sequence of arrays that can be sliced as if they were concatenated along their first dimension."""
+
+    def __init__(self, arrays: list) -> None:
+        if not arrays:
+            raise ValueError('At least one array is necessary for concatenation.')
+        shapes = {tuple(np.shape(a[0:0])[1:]) for a in arrays}
+        if len(shapes) > 1:
+            raise ValueError(f"Arrays cannot be concatenated, found trailing dimensions {sorted(shapes)}.")
+        self.arrays = list(arrays)
+        self.offsets = np.cumsum([0] + [len(a) for a in self.arrays])
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(self, key: slice) -> np.ndarray:
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            # The contiguous range covered by the slice is read, and then sliced with the step
+            indices = range(start, stop, step)
+            if not indices:
+                return self[0:0]
+            lo, hi = min(indices[0], indices[-1]), max(indices[0], indices[-1]) + 1
+            return self[lo:hi][indices[0] - lo::step]
+        parts = []
+        for array, begin, end in zip(self.arrays, self.offsets[:-1], self.offsets[1:]):
+            lo, hi = max(start, begin), min(stop, end)
+            if lo < hi:
+                parts.append(np.asarray(array[lo - begin:hi - begin]))
+        if not parts:
+            return np.asarray(self.arrays[0][0:0])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def _iter_chunks(data, chunk_size: int = None):
+    """
+    Yield (start, chunk) pairs that cover the first dimension of `data` (which may be a numpy array, a memory-mapped
+    array, a `LazyArray` or a `SparseArray`), so that large data can be processed without fully loading it.
+
+    Parameters
+    ----------
+    data
+        Data to be iterated.
+    chunk_size : optional
+        Number of elements of the first dimension in each chunk. If None, it is chosen so that each chunk occupies
+        roughly `LazyArray.chunk_bytes`.
+    """
+    if isinstance(data, SparseArray):
+        data = data.todense()
+    if chunk_size is None:
+        row_bytes = max(math.prod(data.shape[1:]) * data.dtype.itemsize, 1)
+        chunk_size = max(LazyArray.chunk_bytes // row_bytes, 1)
+    elif chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}.")
+    for start in range(0, len(data), chunk_size):
+        yield start, np.asarray(data[start:start + chunk_size])
+
+
+def _allocate(out, shape: tuple[int, ...], dtype) -> np.ndarray:
+    """
+    Get an array where results with `shape` and `dtype` are to be written.
+
+    Parameters
+    ----------
+    out
+        If None, a new array is allocated. If it is a path, a memory-mapped ``.npy`` file is created there (see
+        `numpy.lib.format.open_memmap`). Otherwise, it must be an array with the expected shape, which is used as is.
+    shape
+        Shape of the results.
+    dtype
+        Data type of the results, only used when the array is created.
+    """
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if isinstance(out, (str, os.PathLike)):
+        return np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+    if out.shape != tuple(shape):
+        raise ValueError(f"Output array has shape {out.shape}, expected {tuple(shape)}.")
+    return out
+
+
+def _select_time(time: Time | None, indices: np.ndarray | None, n: int) -> Time | None:
+    """
+    Get the `Time` of the frames with `indices`, out of `n` frames described by `time`. Lists with a length other than
+    `n` are not selected, since they cannot be related to the frames.
+    """
+    if time is None or indices is None:
+        return time
+
+    def select(values: list) -> list:
+        return [values[i] for i in indices] if len(values) == n else []
+
+    return Time(f'{time.uid} selection', timestamps=select(time.timestamps), frame_numbers=select(time.frame_numbers))
+
+
+def _take_frames(data: 'LazyArray', indices: np.ndarray, max_span: int) -> np.ndarray:
+    """
+    Read the frames with `indices` from lazy data, which only supports contiguous reads. Frames are read in contiguous
+    ranges that span at most `max_span` frames, so that sparse selections do not read the whole data at once. Ranges
+    are also split where selected frames are more than two frames apart, so that at most half of the frames read are
+    not selected.
+    """
+    order = np.argsort(indices, kind='stable')
+    ordered = indices[order]
+    gaps = np.append(np.flatnonzero(np.diff(ordered) > 2) + 1, len(ordered))
+    result = np.empty((len(indices), *data.shape[1:]), dtype=data.dtype)
+    begin = 0
+    while begin < len(ordered):
+        first = ordered[begin]
+        end = min(np.searchsorted(ordered, first + max_span), gaps[np.searchsorted(gaps, begin, side='right')])
+        result[order[begin:end]] = data[first:ordered[end - 1] + 1][ordered[begin:end] - first]
+        begin = end
+    return result
+
+
+def _scatter(data, rows: np.ndarray, cols: np.ndarray, shape: tuple[int, int], *, frames=None,
+             fill_value: float = np.nan, chunk_size: int = None, out=None) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Scatter the last dimension of `data` into 2D maps with `shape`, so that element :math:`i` is written at
+    (`rows[i]`, `cols[i]`) and the remaining cells are set to `fill_value`.
+
+    The first dimension of `data` is processed in chunks, with one fancy-indexing assignment per chunk.
+
+    Parameters
+    ----------
+    data
+        Data with dimensions :math:`... \\times n`, which may be a numpy array, a memory-mapped array, a `LazyArray`
+        or a `SparseArray`.
+    rows, cols
+        Row and column of each of the :math:`n` elements in the maps.
+    shape
+        Shape of the maps.
+    frames : optional
+        Slice or sequence of indices that selects which elements of the first dimension of `data` are scattered. If
+        None, all elements are scattered.
+    fill_value : default = np.nan
+        Value of the cells that do not correspond to any element. If it cannot be represented by the data type of
+        `data`, the result is promoted to a floating point data type.
+    chunk_size : optional
+        Number of elements of the first dimension processed at a time. If None, it is chosen so that each chunk of
+        maps occupies roughly `LazyArray.chunk_bytes`.
+    out : optional
+        Where the maps are written, see `_allocate`.
+
+    Returns
+    -------
+        Maps with dimensions :math:`... \\times shape`, and the indices of the selected elements of the first dimension
+        (None if `frames` is None).
+    """
+    if isinstance(data, SparseArray):
+        data = data.todense()
+    if data.shape[-1] != len(rows):
+        raise ValueError(f"Data with dimensions {tuple(data.shape)} does not match the {len(rows)} positions in the "
+                         f"maps.")
+    dtype = data.dtype if np.can_cast(type(fill_value), data.dtype, 'same_kind') else \
+        np.result_type(data.dtype, np.float32)
+    invalid = np.ones(shape, dtype=bool)
+    invalid[rows, cols] = False
+
+    if data.ndim == 1:
+        if frames is not None:
+            raise ValueError("Frames can only be selected for data with more than one dimension.")
+        result = _allocate(out, shape, dtype)
+        result[invalid] = fill_value
+        result[rows, cols] = np.asarray(data)
+        return result, None
+
+    indices = None if frames is None else np.atleast_1d(np.arange(len(data))[frames])
+    n = len(data) if indices is None else len(indices)
+    result = _allocate(out, (n, *data.shape[1:-1], *shape), dtype)
+    if chunk_size is None:
+        row_bytes = max(math.prod(result.shape[1:]) * result.dtype.itemsize, 1)
+        chunk_size = max(LazyArray.chunk_bytes // row_bytes, 1)
+    elif chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}.")
+    for start in range(0, n, chunk_size):
+        if indices is None:
+            x = np.asarray(data[start:start + chunk_size])
+        else:
+            selected = indices[start:start + chunk_size]
+            if isinstance(data, LazyArray):
+                x = _take_frames(data, selected, chunk_size)
+            else:
+                x = np.asarray(data[selected])
+        block = result[start:start + len(x)]
+        block[..., invalid] = fill_value
+        block[..., rows, cols] = x
+    if isinstance(result, np.memmap):
+        result.flush()
+    return result, indices
 
 
 @dataclass
@@ -21,7 +533,10 @@ class Image:
     """Unique name that identifies the data."""
 
     data: np.ndarray
-    """The multi-dimensional data itself."""
+    """The multi-dimensional data itself. Data that is mostly zeros may instead be stored as a `SparseArray`
+    (scipy sparse matrices are automatically converted), in which case it is only densified on demand via `dense`.
+    Data that is too large to be held in memory may be stored as a `LazyArray`, which is computed in chunks when
+    needed (for example, when writing to a file)."""
 
     # _: KW_ONLY
 
@@ -33,15 +548,51 @@ class Image:
     metadata: list[Metadatum] = field(default_factory=list)
     """List of Metadatum objects that describe the Image data."""
 
+    _derived: dict[str, tuple[Any, Any]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
     def __eq__(self, other):
+        if isinstance(self.data, SparseArray) and isinstance(other.data, SparseArray):
+            data_equal = self.data.allclose(other.data)
+        else:
+            data_equal = np.allclose(self.data, other.data)
         return self.name.upper() == other.name.upper() and \
-            np.allclose(self.data, other.data) and \
+            data_equal and \
             self.unit == other.unit and \
             self.time == other.time and \
             self.metadata == other.metadata
 
     def __post_init__(self):
         self.name = self.name.upper()
+        if not isinstance(self.data, (np.ndarray, SparseArray)) and hasattr(self.data, 'tocoo'):
+            # scipy sparse matrix
+            self.data = SparseArray.from_scipy(self.data)
+
+    @property
+    def is_sparse(self) -> bool:
+        """Whether the data is stored as a `SparseArray`."""
+        return isinstance(self.data, SparseArray)
+
+    @property
+    def is_lazy(self) -> bool:
+        """Whether the data is stored as a `LazyArray`."""
+        return isinstance(self.data, LazyArray)
+
+    def dense(self) -> np.ndarray:
+        """Return the data as a dense array, computing it if it is lazy. If the data is neither sparse nor lazy, it is
+        returned without copying."""
+        if isinstance(self.data, SparseArray):
+            return self.data.todense()
+        if isinstance(self.data, LazyArray):
+            return self.data.load()
+        return self.data
+
+    def _get_derived(self, key: str, func) -> Any:
+        # Results derived from the data are cached until the data is replaced by another object. In-place changes to the
+        # data are not detected.
+        cached = self._derived.get(key)
+        if cached is None or cached[0] is not self.data:
+            cached = self._derived[key] = (self.data, func(self.data))
+        return cached[1]
 
     def metadata_to_dict(self) -> dict[str, Any]:
         """Return the metadata as a dictionary key->value (comments are ignored)."""
@@ -2,15 +2,88 @@
 This module contains classes that describe conceptual loops in an adaptive optics system.
 """
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
 
 from .base import Referenceable
-from .image import Image
+from .image import Image, _allocate, _iter_chunks
 from .optical_sensor import WavefrontSensor
 from .time import Time
 from .wavefront_corrector import WavefrontCorrector
 
-__all__ = ['Loop', 'ControlLoop', 'OffloadLoop']
+__all__ = ['Loop', 'ControlLoop', 'OffloadLoop', 'TransferFunctions']
+
+# Number of sets of frequencies for which the transfer functions of each loop are cached
+_MAX_CACHED_TRANSFER_FUNCTIONS = 16
+
+
+def _delayed_positions(target_time: Time, n_target: int, source_time: Time, n_source: int, delay: float,
+                       framerate: float = None) -> np.ndarray:
+    """
+    Find the (fractional) positions in a source sequence that correspond to each frame of a target sequence, delayed by
+    `delay` frames. Positions outside the source sequence are NaN.
+
+    Frame numbers are used if both sequences have them, otherwise timestamps are used if both sequences have them and
+    `framerate` is known. If neither is available, both sequences must have the same length and are assumed to be
+    synchronous.
+    """
+    indices = np.arange(n_source, dtype=float)
+    if target_time is not None and source_time is not None:
+        if len(target_time.frame_numbers) == n_target and len(source_time.frame_numbers) == n_source:
+            target = np.asarray(target_time.frame_numbers, dtype=float) - delay
+            return np.interp(target, np.asarray(source_time.frame_numbers, dtype=float), indices,
+                             left=np.nan, right=np.nan)
+        if framerate and len(target_time.timestamps) == n_target and len(source_time.timestamps) == n_source:
+            target = np.asarray(target_time.timestamps, dtype=float) - delay / framerate
+            return np.interp(target, np.asarray(source_time.timestamps, dtype=float), indices,
+                             left=np.nan, right=np.nan)
+    if n_target != n_source:
+        raise ValueError(f"Cannot align sequences with {n_target} and {n_source} frames without frame numbers or "
+                         f"timestamps.")
+    positions = np.arange(n_target, dtype=float) - delay
+    positions[(positions < 0) | (positions > n_source - 1)] = np.nan
+    return positions
+
+
+def _filter_frames(b: np.ndarray, a: np.ndarray, x: np.ndarray, state: np.ndarray) -> np.ndarray:
+    """
+    Evaluate the difference equations of normalized filters (direct form II transposed) one frame at a time,
+    vectorized across modes. `b` and `a` have dimensions :math:`k \\times m`, `x` has dimensions :math:`t \\times m` and
+    `state` (dimensions :math:`(k - 1) \\times m`) is updated in place.
+    """
+    y = np.empty_like(x)
+    for n in range(len(x)):
+        xn = x[n]
+        yn = b[0] * xn + state[0] if len(state) else b[0] * xn
+        for i in range(len(state) - 1):
+            state[i] = b[i + 1] * xn + state[i + 1] - a[i + 1] * yn
+        if len(state):
+            state[-1] = b[-1] * xn - a[-1] * yn
+        y[n] = yn
+    return y
+
+
+@dataclass(frozen=True)
+class TransferFunctions:
+    """Transfer functions of a loop evaluated at a set of frequencies, as returned by `Loop.transfer_functions`.
+
+    Each transfer function has dimensions :math:`m \\times f`, where :math:`m` is the number of modes with distinct
+    time filters (:math:`m=1` if the same filter applies to all modes) and :math:`f` is the number of frequencies."""
+
+    frequencies: np.ndarray
+    """Frequencies at which the transfer functions were evaluated. (in Hz units)"""
+
+    open_loop: np.ndarray
+    """Open-loop transfer function :math:`G = C z^{-d}`, where :math:`C` is the time filter and :math:`d` is the
+    delay."""
+
+    rejection: np.ndarray
+    """Rejection (error) transfer function :math:`1 / (1 + G)`."""
+
+    noise: np.ndarray
+    """Noise (closed-loop) transfer function :math:`G / (1 + G)`."""
 
 
 @dataclass(kw_only=True)
@@ -52,6 +125,193 @@ class Loop(Referenceable):
     all modes. Uses standard transfer function :math:`sys(z) = \sum_{i=0}^{N-1} b_i z^i/\sum_{j=0}^N a_j z^j`.
     (Dimensions :math:`m \times j`, dimensionless quantity, using data type flt)"""
 
+    _transfer_functions: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _transfer_functions_key: tuple = field(default=None, init=False, repr=False, compare=False)
+
+    def _get_transfer_functions_key(self) -> tuple:
+        # Identity of the filter images and their data, as well as the parameters that affect the transfer functions.
+        # If any of these changes, previously evaluated transfer functions are discarded.
+        return tuple((id(img), id(img.data)) if img is not None else None
+                     for img in (self.time_filter_num, self.time_filter_den)) + (self.delay, self.framerate)
+
+    def transfer_functions(self, freqs: np.ndarray) -> TransferFunctions:
+        """
+        Evaluate the open-loop, rejection and noise transfer functions of the loop, for every mode and frequency.
+
+        The time filter :math:`C(z)` is defined by `time_filter_num` and `time_filter_den` (if there is no denominator,
+        it is assumed to be 1), while the loop is modelled as a pure delay of `delay` frames (which may be fractional),
+        with :math:`z = e^{2 \\pi i f / framerate}`. All modes and frequencies are evaluated at once.
+
+        Results are cached for each set of frequencies, until the time filter images (or their data), `delay` or
+        `framerate` are replaced. In-place changes to the data of the images are not detected. The returned arrays are
+        read-only, since they may be shared with later calls.
+
+        Parameters
+        ----------
+        freqs
+            Frequencies at which the transfer functions are evaluated. (in Hz units)
+
+        Raises
+        ------
+        ValueError
+            If the loop has no time filter numerators, `delay` or `framerate`.
+        """
+        if self.framerate is None:
+            raise ValueError(f"Loop '{self.uid}' has no framerate.")
+        if self.delay is None:
+            raise ValueError(f"Loop '{self.uid}' has no delay.")
+        if self.time_filter_num is None:
+            raise ValueError(f"Loop '{self.uid}' has no time filter numerators.")
+        freqs = np.array(freqs, dtype=float).reshape(-1)
+        if self._transfer_functions_key != (key := self._get_transfer_functions_key()):
+            self._transfer_functions.clear()
+            self._transfer_functions_key = key
+        if (cached := self._transfer_functions.get(freqs.tobytes())) is not None:
+            return cached
+        if len(self._transfer_functions) >= _MAX_CACHED_TRANSFER_FUNCTIONS:
+            self._transfer_functions.clear()
+
+        phase = 2j * np.pi * freqs / self.framerate
+        z = np.exp(phase)
+        num = np.atleast_2d(np.nan_to_num(np.asarray(self.time_filter_num.dense(), dtype=float)))
+        # Polynomials are evaluated for all modes at once, as products with the powers of z
+        numerator = num @ z ** np.arange(num.shape[1])[:, np.newaxis]
+        denominator = np.ones_like(numerator)
+        if self.time_filter_den is not None:
+            den = np.atleast_2d(np.nan_to_num(np.asarray(self.time_filter_den.dense(), dtype=float)))
+            if len(num) != len(den) and 1 not in (len(num), len(den)):
+                raise ValueError(f"Time filter numerators ({len(num)} modes) and denominators ({len(den)} modes) do "
+                                 f"not match.")
+            denominator = den @ z ** np.arange(den.shape[1])[:, np.newaxis]
+        # The closed-loop functions are built from the polynomials, so that they stay finite at the poles of the
+        # controller (e.g. at f=0 for an integrator), where only the open-loop function is infinite
+        denominator = denominator * np.exp(phase * self.delay)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            open_loop = numerator / denominator
+        rejection = denominator / (denominator + numerator)
+        noise = numerator / (denominator + numerator)
+        for array in (freqs, open_loop, rejection, noise):
+            array.flags.writeable = False
+        result = TransferFunctions(frequencies=freqs, open_loop=open_loop, rejection=rejection, noise=noise)
+        self._transfer_functions[freqs.tobytes()] = result
+        return result
+
+    def _filter_coefficients(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the time filter coefficients in powers of :math:`z^{-1}` (the form used by difference equations), as two
+        arrays with dimensions :math:`m \\times k`, normalized so that the first denominator coefficient is 1.
+        """
+        if self.time_filter_num is None:
+            raise ValueError(f"Loop '{self.uid}' has no time filter numerators.")
+        num = np.atleast_2d(np.nan_to_num(np.asarray(self.time_filter_num.dense(), dtype=float)))
+        if self.time_filter_den is None:
+            den = np.ones((1, 1))
+        else:
+            den = np.atleast_2d(np.nan_to_num(np.asarray(self.time_filter_den.dense(), dtype=float)))
+        if len(num) != len(den) and 1 not in (len(num), len(den)):
+            raise ValueError(f"Time filter numerators ({len(num)} modes) and denominators ({len(den)} modes) do not "
+                             f"match.")
+        n_modes = max(len(num), len(den))
+        num = np.broadcast_to(num, (n_modes, num.shape[1]))
+        den = np.broadcast_to(den, (n_modes, den.shape[1]))
+
+        rows_b, rows_a = [], []
+        for b, a in zip(num, den):
+            if not np.any(a):
+                raise ValueError(f"Time filter of loop '{self.uid}' has a null denominator.")
+            # Multiplying by z^-n (where n is the degree of the denominator) reverses the order of the coefficients
+            degree = np.flatnonzero(a)[-1]
+            b = np.trim_zeros(b, 'b')
+            if len(b) - 1 > degree:
+                raise ValueError(f"Time filter of loop '{self.uid}' is not causal (numerator has a higher degree than "
+                                 f"the denominator).")
+            rows_a.append(a[degree::-1] / a[degree])
+            rows_b.append(np.concatenate([np.zeros(degree + 1 - len(b)), b[::-1]]) / a[degree])
+        k = max(len(x) for x in rows_a)
+        return (np.array([np.pad(x, (0, k - len(x))) for x in rows_b]),
+                np.array([np.pad(x, (0, k - len(x))) for x in rows_a]))
+
+    def simulate_controller(self, inputs: Image | np.ndarray, *, chunk: int = None,
+                            out: np.ndarray | str | os.PathLike = None, name: str = None) -> Image:
+        """
+        Apply the time filter of the loop (see `time_filter_num` and `time_filter_den`) to a sequence of inputs, for
+        example reconstructed residual modes, replaying the temporal controller of the loop.
+
+        All modes are filtered at once, and the filter state is carried from one chunk of frames to the next. The filter
+        starts from a null state. If scipy is available, `scipy.signal.lfilter` is used for each group of modes that
+        share the same filter. Otherwise, the difference equations are evaluated one frame at a time, vectorized across
+        modes.
+
+        Parameters
+        ----------
+        inputs
+            Inputs to the controller, with dimensions :math:`t \\times m`. If it is an `Image`, its `time` is kept.
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk of inputs occupies roughly
+            `LazyArray.chunk_bytes`.
+        out : optional
+            Where the outputs (with dimensions :math:`t \\times m`) are written. If None, a new array is allocated. If
+            it is a path, the result is written into a memory-mapped ``.npy`` file created there. Otherwise, it must be
+            an array with the correct shape.
+        name : optional
+            Name of the returned image. If None, a name is derived from the `uid` of the loop.
+
+        Returns
+        -------
+            `Image` containing the outputs of the controller.
+
+        Raises
+        ------
+        ValueError
+            If the time filter is missing, is not causal or does not match the number of modes in `inputs`.
+        """
+        time = inputs.time if isinstance(inputs, Image) else None
+        data = inputs.data if isinstance(inputs, Image) else inputs
+        if not isinstance(data, np.ndarray) and not hasattr(data, 'iter_chunks'):
+            data = np.asarray(data)
+        if len(data.shape) != 2:
+            raise ValueError(f"Inputs must have dimensions t x m, got shape {tuple(data.shape)}.")
+        b, a = self._filter_coefficients()
+        n_modes = data.shape[1]
+        if len(b) not in (1, n_modes):
+            raise ValueError(f"Time filter is defined for {len(b)} modes, but inputs have {n_modes} modes.")
+        b = np.broadcast_to(b, (n_modes, b.shape[1]))
+        a = np.broadcast_to(a, (n_modes, a.shape[1]))
+        dtype = np.result_type(data.dtype, np.float32)
+
+        try:
+            from scipy.signal import lfilter
+        except (ImportError, ModuleNotFoundError):
+            lfilter = None
+        if lfilter is not None:
+            # Modes that share the same filter are filtered together
+            coefficients, groups = np.unique(np.hstack([b, a]), axis=0, return_inverse=True)
+            if len(coefficients) == 1:
+                groups = [slice(None)]
+            else:
+                groups = [np.flatnonzero(groups.reshape(-1) == i) for i in range(len(coefficients))]
+
+        k = b.shape[1]
+        state = np.zeros((k - 1, n_modes), dtype=dtype)
+        result = _allocate(out, data.shape, dtype)
+        for start, x in _iter_chunks(data, chunk):
+            x = x.astype(dtype, copy=False)
+            if lfilter is not None:
+                y = np.empty_like(x)
+                for columns in groups:
+                    i = np.arange(n_modes)[columns][0]
+                    if k == 1:
+                        y[:, columns] = b[i, 0] * x[:, columns]
+                    else:
+                        y[:, columns], state[:, columns] = lfilter(b[i], a[i], x[:, columns], axis=0,
+                                                                   zi=state[:, columns])
+            else:
+                y = _filter_frames(b.T, a.T, x, state)
+            result[start:start + len(x)] = y
+        if isinstance(result, np.memmap):
+            result.flush()
+        return Image(name if name is not None else f'{self.uid} controller output', result, time=time)
+
 
 @dataclass(kw_only=True)
 class ControlLoop(Loop):
@@ -97,6 +357,167 @@ class ControlLoop(Loop):
     """Reconstructed corrector commands before time filtering
     (Dimensions :math:`t \\times a_v`, in user defined units, using data type flt)"""
 
+    def reconstruct_modes(self, *, chunk: int = None, out: np.ndarray | str | os.PathLike = None,
+                          name: str = None) -> Image:
+        """
+        Reconstruct the modal coefficients from the measurements of the `input_sensor`, by applying
+        `measurements_to_modes` to the measurements minus the reference measurements (if any).
+
+        Each chunk of frames is reconstructed with a single matrix multiplication. Since the reconstruction is linear,
+        the reference measurements are reconstructed once and subtracted from the result, instead of being subtracted
+        from each frame.
+
+        Parameters
+        ----------
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk of measurements occupies
+            roughly `LazyArray.chunk_bytes`.
+        out : optional
+            Where the coefficients (with dimensions :math:`t \\times m`) are written. If None, a new array is allocated.
+            If it is a path, the result is written into a memory-mapped ``.npy`` file created there. Otherwise, it must
+            be an array with the correct shape.
+        name : optional
+            Name of the returned image. If None, a name is derived from the `uid` of the loop.
+
+        Returns
+        -------
+            `Image` containing the reconstructed modal coefficients, with the `time` of the loop (or of the
+            measurements, if the loop has none).
+
+        Raises
+        ------
+        ValueError
+            If the loop has no `measurements_to_modes`, if the input sensor has no measurements or if their dimensions
+            do not match.
+        """
+        if self.measurements_to_modes is None:
+            raise ValueError(f"Loop '{self.uid}' has no measurements to modes matrix.")
+        if self.input_sensor.measurements is None:
+            raise ValueError(f"Input sensor '{self.input_sensor.uid}' of loop '{self.uid}' has no measurements.")
+        measurements = self.input_sensor.measurements
+        data = measurements.data
+        matrix = np.asarray(self.measurements_to_modes.dense())
+        if tuple(data.shape[1:]) != tuple(matrix.shape[1:]):
+            raise ValueError(f"Measurements with dimensions {tuple(data.shape[1:])} do not match measurements to modes "
+                             f"matrix with dimensions {tuple(matrix.shape[1:])}.")
+        # Transposed once, so that each chunk is reconstructed by a single (t x d*s_v) @ (d*s_v x m) product
+        matrix_t = np.ascontiguousarray(matrix.reshape(matrix.shape[0], -1).T)
+        dtype = np.result_type(data.dtype, matrix_t.dtype, np.float32)
+        if dtype != matrix_t.dtype:
+            matrix_t = matrix_t.astype(dtype)
+
+        offset = None
+        if (ref := self.input_sensor.ref_measurements) is not None:
+            offset = np.asarray(ref.dense(), dtype=dtype).reshape(-1) @ matrix_t
+
+        result = _allocate(out, (len(data), matrix_t.shape[1]), dtype)
+        for start, frames in _iter_chunks(data, chunk):
+            block = result[start:start + len(frames)]
+            np.matmul(frames.reshape(len(frames), -1).astype(dtype, copy=False), matrix_t, out=block)
+            if offset is not None:
+                block -= offset
+        if isinstance(result, np.memmap):
+            result.flush()
+        return Image(name if name is not None else f'{self.uid} reconstructed modes', result,
+                     time=self.time if self.time is not None else measurements.time)
+
+    def _measurements_per_command(self) -> np.ndarray:
+        # Response of the measurements (d x s_v, flattened) to each of the a_v actuators
+        if self.interaction_matrix is not None:
+            matrix = np.asarray(self.interaction_matrix.dense())
+        elif self.modes_to_measurements is not None and self.commands_to_modes is not None:
+            matrix = np.asarray(self.modes_to_measurements.dense()) @ np.asarray(self.commands_to_modes.dense())
+        else:
+            raise ValueError(f"Loop '{self.uid}' has neither an interaction matrix nor both modes to measurements and "
+                             f"commands to modes matrices.")
+        # Matrices are s_v x d x a_v, while measurements are d x s_v
+        return matrix.transpose(1, 0, 2).reshape(-1, matrix.shape[-1])
+
+    def pseudo_open_loop(self, delay: float = None, *, chunk: int = None, out: np.ndarray | str | os.PathLike = None,
+                         name: str = None) -> Image:
+        """
+        Reconstruct the pseudo open-loop measurements, by adding the delayed `commands` projected into measurement space
+        to the (residual) measurements of the `input_sensor`. That is, for each frame :math:`t`,
+        :math:`s_{pol}(t) = s(t) + D c(t - delay)`, where :math:`D` is the `interaction_matrix` (or, if it is not
+        available, `modes_to_measurements` multiplied by `commands_to_modes`).
+
+        Measurements and commands are aligned using the frame numbers of their respective `Time` (the time of the
+        measurements and the time of the commands, or of the loop). If frame numbers are not available, timestamps and
+        the `framerate` of the loop are used instead. Otherwise, both must have the same number of frames and are
+        assumed to be synchronous. Fractional delays are handled by linearly interpolating between consecutive
+        commands. Frames whose delayed commands are not available (for example, the first frames of the recording) are
+        NaN.
+
+        Parameters
+        ----------
+        delay : optional
+            Delay between the measurements and the application of the respective commands. If None, the `delay` of the
+            loop is used. (in frame units)
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk of measurements occupies
+            roughly `LazyArray.chunk_bytes`.
+        out : optional
+            Where the measurements (with dimensions :math:`t \\times d \\times s_v`) are written. If None, a new array
+            is allocated. If it is a path, the result is written into a memory-mapped ``.npy`` file created there.
+            Otherwise, it must be an array with the correct shape.
+        name : optional
+            Name of the returned image. If None, a name is derived from the `uid` of the loop.
+
+        Returns
+        -------
+            `Image` containing the pseudo open-loop measurements, with the same `time` as the measurements.
+
+        Raises
+        ------
+        ValueError
+            If the necessary data is missing, if dimensions do not match or if the measurements and commands cannot be
+            aligned.
+        """
+        if delay is None:
+            if self.delay is None:
+                raise ValueError(f"Loop '{self.uid}' has no delay, it must be specified.")
+            delay = self.delay
+        if self.input_sensor.measurements is None:
+            raise ValueError(f"Input sensor '{self.input_sensor.uid}' of loop '{self.uid}' has no measurements.")
+        if self.commands is None:
+            raise ValueError(f"Loop '{self.uid}' has no commands.")
+        measurements = self.input_sensor.measurements
+        data = measurements.data
+        commands = self.commands.data
+        matrix = self._measurements_per_command()
+        if matrix.shape != (np.prod(data.shape[1:]), commands.shape[1]):
+            raise ValueError(f"Interaction matrix with dimensions {matrix.shape} does not match measurements with "
+                             f"dimensions {tuple(data.shape[1:])} and commands for {commands.shape[1]} actuators.")
+        dtype = np.result_type(data.dtype, commands.dtype, matrix.dtype, np.float32)
+        matrix_t = np.ascontiguousarray(matrix.T, dtype=dtype)
+
+        command_time = self.commands.time if self.commands.time is not None else self.time
+        positions = _delayed_positions(measurements.time, len(data), command_time, len(commands), delay,
+                                       self.framerate)
+
+        result = _allocate(out, data.shape, dtype)
+        for start, frames in _iter_chunks(data, chunk):
+            pos = positions[start:start + len(frames)]
+            valid = ~np.isnan(pos)
+            block = np.full((len(frames), matrix_t.shape[1]), np.nan, dtype=dtype)
+            if not valid.any():
+                result[start:start + len(frames)] = block.reshape(frames.shape)
+                continue
+            pos = pos[valid]
+            lo = np.floor(pos).astype(int)
+            frac = (pos - lo)[:, np.newaxis]
+            hi = np.minimum(lo + 1, len(commands) - 1)
+            # Only the range of commands needed by this chunk is read
+            first = lo.min()
+            window = np.asarray(commands[first:hi.max() + 1], dtype=dtype)
+            delayed = (1 - frac) * window[lo - first] + frac * window[hi - first]
+            block[valid] = frames.reshape(len(frames), -1)[valid] + delayed @ matrix_t
+            result[start:start + len(frames)] = block.reshape(frames.shape)
+        if isinstance(result, np.memmap):
+            result.flush()
+        return Image(name if name is not None else f'{self.uid} pseudo open-loop measurements', result,
+                     unit=measurements.unit, time=measurements.time)
+
 
 @dataclass(kw_only=True)
 class OffloadLoop(Loop):
@@ -0,0 +1,148 @@
+"""
+This module contains classes that describe the memory footprint of an adaptive optics system.
+"""
+
+import mmap
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .base import Referenceable
+from .image import Image, LazyArray, SparseArray
+from .registry import SystemRegistry
+
+__all__ = ['ImageMemoryUsage', 'MemoryReport']
+
+STORAGE_OWNED = 'owned'
+STORAGE_VIEW = 'view'
+STORAGE_MEMMAP = 'memmap'
+STORAGE_SPARSE = 'sparse'
+STORAGE_LAZY = 'lazy'
+STORAGE_OTHER = 'other'
+
+
+def _get_storage(data: Any) -> str:
+    """Classify how the memory of `data` is held: owned copy, view over another array or memory-mapped file."""
+    if isinstance(data, SparseArray):
+        return STORAGE_SPARSE
+    if isinstance(data, LazyArray):
+        return STORAGE_LAZY
+    if not isinstance(data, np.ndarray):
+        return STORAGE_OTHER
+    base = data
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return STORAGE_MEMMAP
+        base = getattr(base, 'base', None)
+    if data.base is not None:
+        return STORAGE_VIEW
+    return STORAGE_OWNED
+
+
+def _format_bytes(n: int) -> str:
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if n < 1024:
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} TiB'
+
+
+def _label(obj: Any) -> str:
+    if isinstance(obj, Referenceable):
+        return f"{type(obj).__name__} '{obj.uid}'"
+    return type(obj).__name__
+
+
+@dataclass
+class ImageMemoryUsage:
+    """Describes the memory used by the data of one `Image`."""
+
+    image: Image
+    """The image being described."""
+
+    nbytes: int
+    """Number of bytes spanned by the image data."""
+
+    storage: str
+    """How the data is held: ``'owned'`` (array owns its memory), ``'view'`` (array is a view over another array),
+    ``'memmap'`` (array is backed by a memory-mapped file), ``'sparse'`` (data is a `SparseArray`), ``'lazy'`` (data
+    is a `LazyArray`, only computed when needed) or ``'other'`` (data is not a numpy array)."""
+
+    referrers: list[tuple[Any, str]] = field(default_factory=list)
+    """List of (object, field name) pairs that reference the image."""
+
+    @property
+    def name(self) -> str:
+        """Name of the image."""
+        return self.image.name
+
+    @property
+    def shared(self) -> bool:
+        """Whether the image is referenced more than once in the system."""
+        return len(self.referrers) > 1
+
+
+@dataclass
+class MemoryReport:
+    """Memory footprint of an `AOSystem`, as produced by `AOSystem.memory_report`.
+
+    Each image is only counted once, even if it is referenced several times in the system."""
+
+    images: list[ImageMemoryUsage] = field(default_factory=list)
+    """Memory used by each image in the system, sorted by decreasing size."""
+
+    objects: dict[str, int] = field(default_factory=dict)
+    """Bytes held by the images directly referenced by each object in the system, sorted by decreasing size."""
+
+    @classmethod
+    def from_registry(cls, registry: SystemRegistry) -> 'MemoryReport':
+        """
+        Build the report from the objects indexed in `registry`.
+
+        Parameters
+        ----------
+        registry
+            Registry of the system to be described.
+        """
+        images = []
+        objects = {}
+        for image in registry.images():
+            usage = ImageMemoryUsage(image=image,
+                                     nbytes=int(getattr(image.data, 'nbytes', 0)),
+                                     storage=_get_storage(image.data),
+                                     referrers=registry.referrers(image))
+            images.append(usage)
+            for referrer, _ in usage.referrers:
+                label = _label(referrer)
+                objects[label] = objects.get(label, 0) + usage.nbytes
+        images.sort(key=lambda x: x.nbytes, reverse=True)
+        objects = dict(sorted(objects.items(), key=lambda x: x[1], reverse=True))
+        return cls(images=images, objects=objects)
+
+    @property
+    def total_bytes(self) -> int:
+        """Total number of bytes spanned by all images in the system."""
+        return sum(x.nbytes for x in self.images)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Number of bytes held in memory by images that are neither memory-mapped nor lazy."""
+        return sum(x.nbytes for x in self.images if x.storage not in (STORAGE_MEMMAP, STORAGE_LAZY))
+
+    @property
+    def shared_images(self) -> list[ImageMemoryUsage]:
+        """Images that are referenced more than once in the system."""
+        return [x for x in self.images if x.shared]
+
+    def __str__(self) -> str:
+        out = f'Total: {_format_bytes(self.total_bytes)} ({_format_bytes(self.resident_bytes)} resident)'
+        out += f'\n\tObjects ({len(self.objects)}):'
+        for label, nbytes in self.objects.items():
+            out += f'\n\t\t{_format_bytes(nbytes):>10}  {label}'
+        out += f'\n\tImages ({len(self.images)}):'
+        for x in self.images:
+            out += f"\n\t\t{_format_bytes(x.nbytes):>10}  '{x.name}' [{x.storage}]"
+            if x.shared:
+                out += f" (referenced by {', '.join(_label(r) for r, _ in x.referrers)})"
+        return out
@@ -4,11 +4,14 @@ This module contains classes that describe different optical sensors in the syst
 This includes scoring cameras and wavefront sensors, and their respective detectors.
 """
 
+import os
 from dataclasses import dataclass, field
 
+import numpy as np
+
 from .aberration import Aberration
 from .base import Referenceable, Coordinates
-from .image import Image
+from .image import Image, _allocate, _iter_chunks, _scatter, _select_time
 from .source import Source
 
 __all__ = ['Detector', 'ScoringCamera', 'WavefrontSensor', 'ShackHartmann', 'Pyramid']
@@ -112,6 +115,104 @@ class Detector(Referenceable):
     the same reference origin point, from which transformations may occur.
     (Dimensions :math:`3 \times 3 \times t`, dimensionless quantity, using data type flt)"""
 
+    def calibrated_pixels(self, *, dark: bool = True, sky_background: bool = True, flat_field: bool = True,
+                          bad_pixels: bool = True, fill_value: float = np.nan, chunk: int = None,
+                          out: np.ndarray | str | os.PathLike = None, name: str = None) -> Image:
+        """
+        Calibrate the `pixel_intensities`, by subtracting the `dark` and the `sky_background`, correcting by the
+        `flat_field` and masking the pixels identified in the `bad_pixel_map`. That is, for each frame,
+        :math:`p_{cal} = (p - dark - sky\\_background) \\times flat\\_field`. Note that `flat_field` is the inverse of
+        the pixel sensitivity, so applying it is a multiplication. Calibration data that is not available is skipped.
+
+        Each chunk of frames is calibrated directly in the output array, so no full-size temporary arrays are created.
+        The output has the smallest floating point data type that can represent the pixel intensities and calibration
+        data (typically ``float32`` for integer pixel intensities).
+
+        Parameters
+        ----------
+        dark : default = True
+            Whether the `dark` should be subtracted.
+        sky_background : default = True
+            Whether the `sky_background` should be subtracted.
+        flat_field : default = True
+            Whether the `flat_field` should be applied.
+        bad_pixels : default = True
+            Whether the pixels identified in the `bad_pixel_map` should be replaced by `fill_value`.
+        fill_value : default = np.nan
+            Value given to bad pixels.
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk occupies roughly
+            `LazyArray.chunk_bytes`.
+        out : optional
+            Where the calibrated pixel intensities (with dimensions :math:`t \\times h \\times w`) are written. If None,
+            a new array is allocated. If it is a path, the result is written into a memory-mapped ``.npy`` file created
+            there. Otherwise, it must be an array with the correct shape, which may be the (floating point)
+            `pixel_intensities` data itself in order to calibrate it in place.
+        name : optional
+            Name of the returned image. If None, a name is derived from the `uid` of the detector.
+
+        Returns
+        -------
+            `Image` containing the calibrated pixel intensities, with the same `time` as the pixel intensities.
+
+        Raises
+        ------
+        ValueError
+            If the detector has no pixel intensities or if the dimensions of the calibration data do not match.
+        """
+        if self.pixel_intensities is None:
+            raise ValueError(f"Detector '{self.uid}' has no pixel intensities.")
+        pixels = self.pixel_intensities
+        data = pixels.data
+        shape = tuple(data.shape[1:])
+
+        def get(attr: str, enabled: bool) -> np.ndarray | None:
+            image = getattr(self, attr)
+            if not enabled or image is None:
+                return None
+            array = np.asarray(image.data)
+            if array.shape != shape:
+                raise ValueError(f"Detector '{self.uid}' has {attr} with dimensions {array.shape}, which do not match "
+                                 f"pixel intensities with dimensions {shape}.")
+            return array
+
+        dark = get('dark', dark)
+        sky = get('sky_background', sky_background)
+        flat = get('flat_field', flat_field)
+        bad = get('bad_pixel_map', bad_pixels)
+        dtype = np.result_type(data.dtype, np.float32, *(x.dtype for x in (dark, sky, flat) if x is not None))
+
+        # Per-pixel terms are combined once, so that each frame only needs one subtraction and one multiplication
+        offset = None
+        if dark is not None or sky is not None:
+            offset = np.zeros(shape, dtype=dtype)
+            for x in (dark, sky):
+                if x is not None:
+                    offset += x
+        if flat is not None:
+            flat = flat.astype(dtype, copy=False)
+        if bad is not None:
+            bad = bad != 0
+            if not bad.any():
+                bad = None
+
+        result = _allocate(out, data.shape, dtype)
+        for start, frames in _iter_chunks(data, chunk):
+            # Operations are done in place in the output, which may also be the input (frames are read beforehand)
+            block = result[start:start + len(frames)]
+            if offset is not None:
+                np.subtract(frames, offset, out=block)
+            elif not np.may_share_memory(block, frames):
+                block[...] = frames
+            if flat is not None:
+                np.multiply(block, flat, out=block)
+            if bad is not None:
+                block[:, bad] = fill_value
+        if isinstance(result, np.memmap):
+            result.flush()
+        return Image(name if name is not None else f'{self.uid} calibrated pixel intensities', result,
+                     unit=pixels.unit, time=pixels.time)
+
 
 @dataclass(kw_only=True)
 class ScoringCamera(Referenceable):
@@ -138,6 +239,21 @@ class ScoringCamera(Referenceable):
     aberration: Aberration = None
 
 
+def _subaperture_positions(mask: np.ndarray) -> np.ndarray:
+    mask = np.asarray(mask)
+    rows, cols = np.nonzero(mask != -1)
+    indices = mask[rows, cols]
+    positions = np.empty((indices.size, 2), dtype=int)
+    if indices.size and (np.any(indices < 0) or np.any(indices >= indices.size) or
+                         np.unique(indices).size != indices.size):
+        raise ValueError("Indices of the valid subapertures must be a sequence from 0 to the number of valid "
+                         "subapertures minus 1.")
+    positions[indices, 0] = rows
+    positions[indices, 1] = cols
+    positions.flags.writeable = False
+    return positions
+
+
 @dataclass(kw_only=True)
 class WavefrontSensor(Referenceable):
     """Abstract class that contains data related to one wavefront sensor in the system."""
@@ -198,6 +314,100 @@ class WavefrontSensor(Referenceable):
         if self.__class__ == WavefrontSensor:
             raise TypeError("Cannot instantiate abstract class.")
 
+    @staticmethod
+    def index_subapertures(valid: np.ndarray, order: str = 'C') -> np.ndarray:
+        """
+        Build the data of a subaperture mask (see `subaperture_mask`) from an array that indicates which subapertures
+        are valid. Valid subapertures are numbered consecutively, in row-major or column-major order.
+
+        Parameters
+        ----------
+        valid
+            Array with the dimensions of the subaperture grid, which is truthy for valid subapertures.
+        order : default = 'C'
+            ``'C'`` to number the subapertures in row-major order or ``'F'`` to number them in column-major order.
+        """
+        if order not in ('C', 'F'):
+            raise ValueError(f"Unknown order '{order}', expected 'C' or 'F'.")
+        valid = np.asarray(valid, dtype=bool)
+        flat_valid = valid.ravel(order=order)
+        mask = np.full(valid.size, -1, dtype=int)
+        mask[flat_valid] = np.arange(np.count_nonzero(flat_valid))
+        return mask.reshape(valid.shape, order=order)
+
+    @staticmethod
+    def get_subaperture_positions(mask: Image) -> np.ndarray:
+        """
+        Return the position of each valid subaperture in the subaperture `mask`, as an array with dimensions
+        :math:`s_v \\times 2` whose rows contain the (row, column) indices of the respective valid subaperture.
+
+        The result is cached in `mask` until its data is replaced, so it is only computed once.
+
+        Parameters
+        ----------
+        mask
+            Subaperture mask (see `subaperture_mask`).
+
+        Raises
+        ------
+        ValueError
+            If the indices of the valid subapertures are not a sequence from 0 to :math:`s_v - 1`.
+        """
+        return mask._get_derived('subaperture_positions', _subaperture_positions)
+
+    @property
+    def subaperture_positions(self) -> np.ndarray:
+        """Position of each valid subaperture in `subaperture_mask`, see `get_subaperture_positions`."""
+        if self.subaperture_mask is None:
+            raise ValueError(f"Wavefront sensor '{self.uid}' has no subaperture mask.")
+        return self.get_subaperture_positions(self.subaperture_mask)
+
+    def to_maps(self, image: Image = None, *, frames=None, fill_value: float = np.nan, chunk: int = None,
+                out: np.ndarray | str | os.PathLike = None, name: str = None) -> Image:
+        """
+        Scatter data defined for each valid subaperture into maps with the dimensions of the `subaperture_mask`, where
+        each value is placed in the cell of the respective subaperture (see `subaperture_positions`). For example,
+        `measurements` with dimensions :math:`t \\times d \\times s_v` become maps with dimensions
+        :math:`t \\times d \\times s \\times s`. Each chunk of frames is scattered with a single vectorized assignment.
+
+        Parameters
+        ----------
+        image : optional
+            Data whose last dimension corresponds to the :math:`s_v` valid subapertures, such as `measurements`,
+            `ref_measurements` or `subaperture_intensities`. If None, `measurements` are used.
+        frames : optional
+            Slice or sequence of indices that selects which frames (elements of the first dimension of the data) are
+            scattered. If None, all frames are scattered.
+        fill_value : default = np.nan
+            Value of the cells that correspond to invalid subapertures.
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk of maps occupies roughly
+            `LazyArray.chunk_bytes`.
+        out : optional
+            Where the maps are written. If None, a new array is allocated. If it is a path, the result is written into
+            a memory-mapped ``.npy`` file created there. Otherwise, it must be an array with the correct shape.
+        name : optional
+            Name of the returned image. If None, a name is derived from the name of the data.
+
+        Returns
+        -------
+            `Image` containing the maps, with the `time` of the selected frames.
+
+        Raises
+        ------
+        ValueError
+            If the necessary data is missing or if its last dimension does not match the valid subapertures.
+        """
+        if image is None:
+            if self.measurements is None:
+                raise ValueError(f"Wavefront sensor '{self.uid}' has no measurements.")
+            image = self.measurements
+        positions = self.subaperture_positions
+        result, indices = _scatter(image.data, positions[:, 0], positions[:, 1], self.subaperture_mask.data.shape,
+                                   frames=frames, fill_value=fill_value, chunk_size=chunk, out=out)
+        return Image(name if name is not None else f'{image.name} maps', result, unit=image.unit,
+                     time=_select_time(image.time, indices, len(image.data)))
+
 
 @dataclass(kw_only=True)
 class ShackHartmann(WavefrontSensor):
@@ -217,6 +427,116 @@ class ShackHartmann(WavefrontSensor):
     """Spot full width half maximum for each of :math:`s_v` subapertures and  :math:`d` dimensions.
     (Dimensions :math:`d \\times s_v`, in arcsec units, using data type flt)"""
 
+    def compute_centroids(self, method: str = 'cog', *, pixels: Image = None, threshold: float = 0,
+                          chunk: int = None, out: np.ndarray | str | os.PathLike = None, name: str = None) -> Image:
+        """
+        Compute the centroid of the spot in each valid subaperture, for each frame of detector pixel intensities.
+
+        Each valid subaperture (see `subaperture_mask`) corresponds to a square window of `subaperture_size` pixels,
+        starting at the first of the `mask_offsets` (or at the detector origin, if there are no offsets). All windows
+        are cut from each chunk of frames with a single strided view, and the centroids of every subaperture in the
+        chunk are computed at once. Centroids are given in pixels, relative to the center of the respective window,
+        with the horizontal offset first (as in `measurements`). Subapertures without flux are NaN.
+
+        Parameters
+        ----------
+        method : default = 'cog'
+            Centroiding method. One of:
+
+            - ``'cog'``: center of gravity of the pixel intensities.
+            - ``'wcog'``: center of gravity of the pixel intensities multiplied by the `weight_map` of the detector.
+            - ``'threshold'``: center of gravity of the pixel intensities after subtracting `threshold` (pixels below
+              it are ignored).
+        pixels : optional
+            Pixel intensities (with dimensions :math:`t \\times h \\times w`). If None, the `pixel_intensities` of
+            the detector are used. This allows using calibrated pixels instead (see `Detector.calibrated_pixels`).
+        threshold : default = 0
+            Threshold subtracted from the pixel intensities when `method` is ``'threshold'``. (in ADU units)
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk occupies roughly
+            `LazyArray.chunk_bytes`.
+        out : optional
+            Where the centroids (with dimensions :math:`t \\times 2 \\times s_v`) are written. If None, a new array is
+            allocated. If it is a path, the result is written into a memory-mapped ``.npy`` file created there.
+            Otherwise, it must be an array with the correct shape.
+        name : optional
+            Name of the returned image. If None, a name is derived from the `uid` of the sensor.
+
+        Returns
+        -------
+            `Image` containing the centroids, with the same `time` as the pixel intensities.
+
+        Raises
+        ------
+        ValueError
+            If the necessary data is missing, if `method` is unknown or if the subapertures do not fit in the detector.
+        """
+        if method not in ('cog', 'wcog', 'threshold'):
+            raise ValueError(f"Unknown centroiding method '{method}', expected 'cog', 'wcog' or 'threshold'.")
+        if pixels is None:
+            if self.detector is None or self.detector.pixel_intensities is None:
+                raise ValueError(f"Wavefront sensor '{self.uid}' has no detector pixel intensities.")
+            pixels = self.detector.pixel_intensities
+        if self.subaperture_size is None:
+            raise ValueError(f"Wavefront sensor '{self.uid}' has no subaperture size.")
+        size = int(self.subaperture_size)
+        if size != self.subaperture_size or size < 1:
+            raise ValueError(f"Subaperture size must be a positive integer number of pixels, got "
+                             f"{self.subaperture_size}.")
+        positions = self.subaperture_positions
+        grid = self.subaperture_mask.data.shape
+        offset = self.mask_offsets[0] if self.mask_offsets else Coordinates(0, 0)
+        x0, y0 = int(offset.x), int(offset.y)
+        data = pixels.data
+        if x0 < 0 or y0 < 0 or y0 + grid[0] * size > data.shape[1] or x0 + grid[1] * size > data.shape[2]:
+            raise ValueError(f"Subapertures of wavefront sensor '{self.uid}' ({grid[0]}x{grid[1]} subapertures of "
+                             f"{size} pixels, starting at ({x0}, {y0})) do not fit in pixel intensities with "
+                             f"dimensions {tuple(data.shape[1:])}.")
+
+        def windows(frames: np.ndarray) -> np.ndarray:
+            # View with dimensions (..., rows, cols, size, size), then pick the valid subapertures
+            region = frames[..., y0:y0 + grid[0] * size, x0:x0 + grid[1] * size]
+            *st, sy, sx = region.strides
+            view = np.lib.stride_tricks.as_strided(region, (*region.shape[:-2], grid[0], grid[1], size, size),
+                                                   (*st, sy * size, sx * size, sy, sx), writeable=False)
+            return view[..., positions[:, 0], positions[:, 1], :, :]
+
+        dtype = np.result_type(data.dtype, np.float32)
+        weights = None
+        if method == 'wcog':
+            if self.detector is None or self.detector.weight_map is None:
+                raise ValueError(f"Wavefront sensor '{self.uid}' has no detector weight map.")
+            weight_map = np.asarray(self.detector.weight_map.data)
+            if weight_map.shape != data.shape[1:]:
+                raise ValueError(f"Weight map with dimensions {weight_map.shape} does not match pixel intensities with "
+                                 f"dimensions {tuple(data.shape[1:])}.")
+            dtype = np.result_type(dtype, weight_map.dtype)
+            weights = windows(weight_map).astype(dtype)
+        coords = np.arange(size, dtype=dtype) - (size - 1) / 2
+
+        result = _allocate(out, (len(data), 2, len(positions)), dtype)
+        for start, frames in _iter_chunks(data, chunk):
+            w = windows(frames).astype(dtype)
+            if method == 'wcog':
+                w *= weights
+            elif method == 'threshold':
+                w -= threshold
+                np.maximum(w, 0, out=w)
+            # Marginal sums avoid building coordinate grids with the dimensions of the windows
+            flux_x = w.sum(axis=-2)
+            flux = flux_x.sum(axis=-1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x = flux_x @ coords / flux
+                y = w.sum(axis=-1) @ coords / flux
+            x[flux == 0] = np.nan
+            y[flux == 0] = np.nan
+            block = result[start:start + len(frames)]
+            block[:, 0] = x
+            block[:, 1] = y
+        if isinstance(result, np.memmap):
+            result.flush()
+        return Image(name if name is not None else f'{self.uid} centroids', result, unit='pix', time=pixels.time)
+
 
 @dataclass(kw_only=True)
 class Pyramid(WavefrontSensor):
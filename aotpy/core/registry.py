@@ -0,0 +1,171 @@
+"""
+This module contains a class that indexes all the objects that compose an adaptive optics system.
+"""
+
+import dataclasses
+from typing import Any, Iterator, Type, TypeVar
+
+from .base import Referenceable
+from .image import Image
+from .telescope import Segments
+
+__all__ = ['SystemRegistry']
+
+T = TypeVar('T', bound=Referenceable)
+
+
+def _iter_children(obj: Any) -> Iterator[tuple[str, Referenceable | Image]]:
+    """
+    Yield (field name, child) pairs for every `Referenceable` or `Image` directly referenced by `obj`.
+
+    Lists of objects are expanded, while `Segments` are transparently traversed since they are not referenceable on
+    their own.
+    """
+    if not dataclasses.is_dataclass(obj):
+        return
+    for f in dataclasses.fields(obj):
+        value = getattr(obj, f.name, None)
+        if isinstance(value, list):
+            values = value
+        else:
+            values = [value]
+        for v in values:
+            if isinstance(v, (Referenceable, Image)):
+                yield f.name, v
+            elif isinstance(v, Segments):
+                yield from _iter_children(v)
+
+
+class SystemRegistry:
+    """Index of all the objects that are reachable from an `AOSystem`.
+
+    Every `Referenceable` is indexed by its `uid` and every `Image` is indexed by its `name`, enabling constant time
+    lookups. The registry also keeps track of reverse references, which allows finding which objects reference a
+    certain object (for example, which loops use a certain wavefront sensor).
+
+    The registry is a snapshot of the system at the time it was built. `AOSystem.registry` automatically rebuilds it
+    when the lists in the system change, but changes to nested references (for example, replacing the detector of a
+    wavefront sensor) are only reflected after calling `AOSystem.refresh_registry`.
+
+    Parameters
+    ----------
+    system
+        `AOSystem` to be indexed.
+    """
+
+    def __init__(self, system) -> None:
+        self._objects: dict[str, list[Referenceable]] = {}
+        self._images: dict[str, Image] = {}
+        self._referrers: dict[int, list[tuple[Any, str]]] = {}
+        self._seen: set[int] = set()
+
+        for _, child in _iter_children(system):
+            self._visit(child)
+        # Referrers from the system itself are registered after visiting, since they are not interesting for lookups
+        for name, child in _iter_children(system):
+            self._referrers.setdefault(id(child), []).append((system, name))
+
+    def _visit(self, obj: Referenceable | Image) -> None:
+        if id(obj) in self._seen:
+            return
+        self._seen.add(id(obj))
+
+        if isinstance(obj, Image):
+            # Image names are case-insensitive, so keys are normalized the same way as in `get_image`
+            key = obj.name.upper()
+            if (other := self._images.get(key)) is not None and other is not obj:
+                raise ValueError(f"Repeated image name '{obj.name}'.")
+            self._images[key] = obj
+        else:
+            self._objects.setdefault(obj.uid, []).append(obj)
+
+        for name, child in _iter_children(obj):
+            self._referrers.setdefault(id(child), []).append((obj, name))
+            self._visit(child)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._objects
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._objects.values())
+
+    def __iter__(self) -> Iterator[Referenceable]:
+        for objs in self._objects.values():
+            yield from objs
+
+    def get(self, uid: str, cls: Type[T] = Referenceable) -> T:
+        """
+        Return the object identified by `uid`.
+
+        Parameters
+        ----------
+        uid
+            Unique identifier of the object.
+        cls : default = Referenceable
+            Type of the object being searched. Only necessary to disambiguate objects of different types that share the
+            same `uid` (for example a `Time` and a `Loop`).
+
+        Raises
+        ------
+        KeyError
+            If no object of type `cls` is identified by `uid`.
+        ValueError
+            If more than one object of type `cls` is identified by `uid`.
+        """
+        matches = [obj for obj in self._objects.get(uid, []) if isinstance(obj, cls)]
+        if not matches:
+            raise KeyError(f"No object of type '{cls.__name__}' with uid '{uid}'.")
+        if len(matches) > 1:
+            raise ValueError(f"Ambiguous uid '{uid}': matches {', '.join(type(x).__name__ for x in matches)}. "
+                             f"Use 'cls' to disambiguate.")
+        return matches[0]
+
+    def get_image(self, name: str) -> Image:
+        """
+        Return the `Image` identified by `name` (case-insensitive).
+
+        Parameters
+        ----------
+        name
+            Name of the image.
+
+        Raises
+        ------
+        KeyError
+            If no image is identified by `name`.
+        """
+        try:
+            return self._images[name.upper()]
+        except KeyError:
+            raise KeyError(f"No image with name '{name}'.") from None
+
+    def objects(self, cls: Type[T] = Referenceable) -> list[T]:
+        """
+        Return all indexed objects of type `cls`.
+
+        Parameters
+        ----------
+        cls : default = Referenceable
+            Type of the objects to be returned.
+        """
+        return [obj for obj in self if isinstance(obj, cls)]
+
+    def images(self) -> list[Image]:
+        """
+        Return all indexed images.
+        """
+        return list(self._images.values())
+
+    def referrers(self, obj: Referenceable | Image, cls: type = object) -> list[tuple[Any, str]]:
+        """
+        Return the objects that reference `obj`, as a list of (referrer, field name) pairs.
+
+        Parameters
+        ----------
+        obj
+            Object whose referrers are to be found.
+        cls : default = object
+            Only return referrers of this type. For example, ``registry.referrers(wfs, aotpy.ControlLoop)`` returns
+            the loops that use `wfs` as input sensor.
+        """
+        return [(r, name) for r, name in self._referrers.get(id(obj), []) if isinstance(r, cls)]
@@ -0,0 +1,213 @@
+"""
+This module contains classes that enable sharing an adaptive optics system between processes without copying its
+image data.
+"""
+
+import io
+import os
+import pickle
+import weakref
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .image import LazyArray
+from .registry import SystemRegistry
+
+__all__ = ['SharedSystem', 'SharedSystemHandle']
+
+# Blocks attached by this process, along with the number of arrays created from them that are still alive. Blocks are
+# closed once all of their arrays (and any views of them) have been garbage collected.
+_attached_blocks: dict[str, list] = {}
+
+# Blocks that are no longer used but could not be closed yet, since the buffer of their last array is only released
+# after its finalizer runs. Closing them is retried whenever blocks are attached or detached.
+_pending_blocks: list[shared_memory.SharedMemory] = []
+
+
+@dataclass(frozen=True)
+class _BlockDescriptor:
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class SharedSystemHandle:
+    """Picklable description of an `AOSystem` whose image data lives in shared memory blocks.
+
+    Handles are cheap to send to other processes, since they only contain the object graph (without image data) and
+    the descriptors of the shared memory blocks. Use `AOSystem.from_shared` to rebuild the system from a handle."""
+
+    graph: bytes
+    """Pickled object graph, where image data is replaced by references to shared memory blocks."""
+
+    blocks: tuple[_BlockDescriptor, ...] = field(default=())
+    """Descriptors of the shared memory blocks that contain image data."""
+
+    tracker_pid: int = None
+    """Process ID of the resource tracker of the owner process, which tells attaching processes whether they share it
+    (only relevant for Python < 3.13)."""
+
+
+class _SharedPickler(pickle.Pickler):
+    def __init__(self, file, arrays: dict[int, int]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._arrays = arrays
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (np.ndarray, LazyArray)) and (index := self._arrays.get(id(obj))) is not None:
+            return index
+        return None
+
+
+class _SharedUnpickler(pickle.Unpickler):
+    def __init__(self, file, arrays: list[np.ndarray]):
+        super().__init__(file)
+        self._arrays = arrays
+
+    def persistent_load(self, pid):
+        return self._arrays[pid]
+
+
+def _close_pending() -> None:
+    for shm in list(_pending_blocks):
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        _pending_blocks.remove(shm)
+
+
+def _tracker_pid() -> int | None:
+    return getattr(resource_tracker._resource_tracker, '_pid', None)
+
+
+def _shares_tracker(owner_tracker_pid: int | None) -> bool:
+    if (pid := _tracker_pid()) is None:
+        # Child processes of the owner (or of its ancestors) inherit the connection to its tracker, but not its ID
+        return getattr(resource_tracker._resource_tracker, '_fd', None) is not None
+    return pid == owner_tracker_pid
+
+
+def _attach(name: str, owner_tracker_pid: int = None) -> shared_memory.SharedMemory:
+    _close_pending()
+    if (entry := _attached_blocks.get(name)) is not None:
+        entry[1] += 1
+        return entry[0]
+    try:
+        # Only the owner of the blocks should unlink them, so the attaching process should not track them
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 does not support disabling tracking, so the block is unregistered from the resource tracker
+        # (otherwise it would be unlinked, or reported as leaked, when this process exits). Processes that share the
+        # tracker of the owner (such as its child processes) must not do so, since that would remove the registration
+        # of the owner instead.
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix' and not _shares_tracker(owner_tracker_pid):
+            resource_tracker.unregister(shm._name, 'shared_memory')
+    _attached_blocks[name] = [shm, 1]
+    return shm
+
+
+def _detach(name: str) -> None:
+    entry = _attached_blocks[name]
+    entry[1] -= 1
+    if entry[1] == 0:
+        del _attached_blocks[name]
+        _pending_blocks.append(entry[0])
+    _close_pending()
+
+
+def _release(blocks: list[shared_memory.SharedMemory]) -> None:
+    for shm in blocks:
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedSystem:
+    """Owner of the shared memory blocks that contain the image data of an `AOSystem`.
+
+    Created via `AOSystem.to_shared`. Lazy image data (see `LazyArray`) is computed one chunk at a time directly into
+    shared memory, so it is never fully loaded in the memory of the owner process. The blocks remain available until
+    `close` is called (or the context manager is exited), after which other processes can no longer attach to them.
+    Processes that have already attached keep their mapping until the systems rebuilt from the handle (and any arrays
+    taken from them) are garbage collected. If `close` is never called, the blocks are released when this object is
+    garbage collected.
+
+    Parameters
+    ----------
+    system
+        `AOSystem` whose image data is to be copied into shared memory.
+    """
+
+    def __init__(self, system) -> None:
+        arrays: dict[int, int] = {}
+        blocks: list[shared_memory.SharedMemory] = []
+        descriptors: list[_BlockDescriptor] = []
+        self._finalizer = weakref.finalize(self, _release, blocks)
+        for image in SystemRegistry(system).images():
+            data = image.data
+            if not isinstance(data, (np.ndarray, LazyArray)) or data.dtype.hasobject or id(data) in arrays:
+                continue
+            shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+            blocks.append(shm)
+            array = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+            if isinstance(data, LazyArray):
+                start = 0
+                for chunk in data.iter_chunks():
+                    array[start:start + len(chunk)] = chunk
+                    start += len(chunk)
+            else:
+                array[...] = data
+            arrays[id(data)] = len(descriptors)
+            descriptors.append(_BlockDescriptor(shm.name, data.shape, data.dtype.str))
+
+        buffer = io.BytesIO()
+        _SharedPickler(buffer, arrays).dump(system)
+        self._blocks = blocks
+        self.handle: SharedSystemHandle = SharedSystemHandle(graph=buffer.getvalue(), blocks=tuple(descriptors),
+                                                                tracker_pid=_tracker_pid())
+        """Picklable handle that can be sent to other processes."""
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the shared memory blocks."""
+        return sum(shm.size for shm in self._blocks)
+
+    def close(self) -> None:
+        """
+        Close and unlink all shared memory blocks.
+        """
+        self._finalizer()
+
+    def __enter__(self) -> 'SharedSystem':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @staticmethod
+    def load(handle: SharedSystemHandle):
+        """
+        Rebuild the system described by `handle`, with image data backed by shared memory (read-only). Blocks are
+        attached once per process, and detached when no array backed by them is in use anymore.
+
+        Parameters
+        ----------
+        handle
+            Handle obtained from `SharedSystem.handle`.
+        """
+        arrays = []
+        for desc in handle.blocks:
+            shm = _attach(desc.name, handle.tracker_pid)
+            array = np.ndarray(desc.shape, dtype=np.dtype(desc.dtype), buffer=shm.buf)
+            array.flags.writeable = False
+            # Views of the array keep it alive, so the block is only detached once none of them are in use
+            weakref.finalize(array, _detach, desc.name)
+            arrays.append(array)
+        return _SharedUnpickler(io.BytesIO(handle.graph), arrays).load()
@@ -2,16 +2,34 @@
 This module contains classes that describe different types of wavefront correctors in a system.
 """
 
+import os
 from dataclasses import dataclass, field
 
+import numpy as np
+
 from .aberration import Aberration
 from .base import Referenceable, Coordinates
-from .image import Image
+from .image import Image, LazyArray, SparseArray, _allocate, _iter_chunks, _scatter, _select_time
 from .telescope import Telescope
 
 __all__ = ['WavefrontCorrector', 'DeformableMirror', 'TipTiltMirror', 'LinearStage']
 
 
+def _grid_indices(values: np.ndarray) -> np.ndarray:
+    # Index of each value in a regular grid whose pitch is the smallest spacing between distinct values
+    unique = np.unique(values)
+    if len(unique) < 2:
+        return np.zeros(len(values), dtype=int)
+    diffs = np.diff(unique)
+    # Differences much smaller than the extent of the values are considered rounding errors
+    pitch = diffs[diffs > 1e-6 * (unique[-1] - unique[0])].min()
+    position = (values - unique[0]) / pitch
+    indices = np.rint(position).astype(int)
+    if np.any(np.abs(position - indices) > 0.1):
+        raise ValueError("Actuator coordinates are not on a regular grid.")
+    return indices
+
+
 @dataclass(kw_only=True)
 class WavefrontCorrector(Referenceable):
     """Abstract class that contains data related to a wavefront corrector in the system."""
@@ -50,7 +68,8 @@ class WavefrontCorrector(Referenceable):
 class DeformableMirror(WavefrontCorrector):
     """Contains data related to a deformable mirror in the system."""
     actuator_coordinates: list[Coordinates] = field(default_factory=list)
-    'List of horizontal/vertical coordinates of the valid actuators of the DM. (in m units)'
+    """List of horizontal/vertical coordinates of the valid actuators of the DM. For DMs with many actuators, a
+    `CoordinatesArray` can be used instead of a list. (in m units)"""
 
     influence_function: Image = None
     """A set of 2D images, one for each valid actuator, where each image represents the displacement of the surface of
@@ -60,6 +79,162 @@ class DeformableMirror(WavefrontCorrector):
     stroke: float = None
     'Maximum possible actuator displacement, measured as an excursion from a central null position. (in m units)'
 
+    _influence_matrix: tuple = field(default=None, init=False, repr=False, compare=False)
+
+    def _get_influence_matrix(self):
+        """
+        Get the influence functions restricted to the pupil, as a matrix with dimensions :math:`n_p \\times a_v`
+        (where :math:`n_p` is the number of pixels in the `pupil_mask`, or all pixels if there is no mask) and the
+        boolean mask of the pupil. The matrix is a scipy sparse matrix if the influence functions are a `SparseArray`.
+        The result is cached until the influence functions or the pupil mask (or their data) are replaced.
+        """
+        if self.influence_function is None:
+            raise ValueError(f"Deformable mirror '{self.uid}' has no influence function.")
+        key = tuple((id(img), id(img.data)) if img is not None else None
+                    for img in (self.influence_function, self.pupil_mask))
+        if self._influence_matrix is not None and self._influence_matrix[0] == key:
+            return self._influence_matrix[1:]
+        data = self.influence_function.data
+        shape = tuple(data.shape[1:])
+        if self.pupil_mask is not None:
+            pupil = np.asarray(self.pupil_mask.data) != 0
+            if pupil.shape != shape:
+                raise ValueError(f"Pupil mask with dimensions {pupil.shape} does not match influence functions with "
+                                 f"dimensions {shape}.")
+        else:
+            pupil = np.ones(shape, dtype=bool)
+        columns = np.flatnonzero(pupil)
+        if isinstance(data, SparseArray):
+            matrix = data.to_scipy('csc')[:, columns].T.tocsr()
+        else:
+            matrix = np.ascontiguousarray(np.asarray(data).reshape(len(data), -1)[:, columns].T)
+        self._influence_matrix = (key, matrix, pupil)
+        return matrix, pupil
+
+    def phase_maps(self, commands: Image, *, fill_value: float = np.nan, chunk: int = None,
+                   out: np.ndarray | str | os.PathLike = None, name: str = None) -> Image:
+        """
+        Compute the shape of the mirror for each frame of `commands`, as the sum of the `influence_function` of each
+        actuator weighted by the respective command. Only the pixels inside the `pupil_mask` are computed.
+
+        The influence functions restricted to the pupil are flattened into a matrix once (and cached), so that each
+        chunk of frames is projected with a single matrix product. If the influence functions are a `SparseArray`, a
+        scipy sparse matrix is used instead.
+
+        Parameters
+        ----------
+        commands
+            Commands with dimensions :math:`t \\times a_v`, such as the `commands` of a loop.
+        fill_value : default = np.nan
+            Value of the pixels outside the pupil.
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk of maps occupies roughly
+            `LazyArray.chunk_bytes`.
+        out : optional
+            Where the maps (with dimensions :math:`t \\times h \\times w`) are written. If None, a new array is
+            allocated. If it is a path, the result is written into a memory-mapped ``.npy`` file created there.
+            Otherwise, it must be an array with the correct shape.
+        name : optional
+            Name of the returned image. If None, a name is derived from the `uid` of the mirror.
+
+        Returns
+        -------
+            `Image` containing the maps, with the same `time` as the commands.
+
+        Raises
+        ------
+        ValueError
+            If the necessary data is missing or if dimensions do not match.
+        """
+        matrix, pupil = self._get_influence_matrix()
+        data = commands.data
+        if data.ndim != 2 or data.shape[1] != matrix.shape[1]:
+            raise ValueError(f"Commands with dimensions {tuple(data.shape)} do not match influence functions for "
+                             f"{matrix.shape[1]} actuators.")
+        dtype = np.result_type(data.dtype, matrix.dtype, np.float32)
+        if chunk is None:
+            chunk = max(LazyArray.chunk_bytes // max(pupil.size * dtype.itemsize, 1), 1)
+        outside = ~pupil
+        result = _allocate(out, (len(data), *pupil.shape), dtype)
+        for start, frames in _iter_chunks(data, chunk):
+            block = result[start:start + len(frames)]
+            block[:, outside] = fill_value
+            # Products are computed as matrix times frames, so that sparse matrices are always the left operand
+            block[:, pupil] = (matrix @ frames.astype(dtype, copy=False).T).T
+        if isinstance(result, np.memmap):
+            result.flush()
+        return Image(name if name is not None else f'{self.uid} phase maps', result,
+                     unit=self.influence_function.unit, time=commands.time)
+
+    def actuator_grid(self) -> tuple[np.ndarray, tuple[int, int]]:
+        """
+        Place the valid actuators in a regular 2D grid, based on their `actuator_coordinates`. Columns correspond to
+        increasing horizontal coordinates and rows to increasing vertical coordinates. The pitch of the grid along each
+        axis is the smallest spacing between actuators, so other geometries (for example hexagonal) result in grids
+        where some cells are empty.
+
+        Returns
+        -------
+            Array with dimensions :math:`a_v \\times 2` whose rows contain the (row, column) indices of the respective
+            actuator, and the shape of the grid.
+
+        Raises
+        ------
+        ValueError
+            If the mirror has no actuator coordinates or if they do not fit a regular grid.
+        """
+        if not len(self.actuator_coordinates):
+            raise ValueError(f"Deformable mirror '{self.uid}' has no actuator coordinates.")
+        coordinates = np.asarray(self.actuator_coordinates, dtype=np.float64)
+        positions = np.column_stack([_grid_indices(coordinates[:, 1]), _grid_indices(coordinates[:, 0])])
+        shape = tuple(int(n) for n in positions.max(axis=0) + 1)
+        if len(np.unique(np.ravel_multi_index(positions.T, shape))) != len(positions):
+            raise ValueError(f"Actuator coordinates of deformable mirror '{self.uid}' do not fit a regular grid, since "
+                             f"more than one actuator corresponds to the same cell.")
+        return positions, shape
+
+    def to_maps(self, commands: Image, *, frames=None, fill_value: float = np.nan, chunk: int = None,
+                out: np.ndarray | str | os.PathLike = None, name: str = None) -> Image:
+        """
+        Scatter data defined for each valid actuator (such as the `commands` of a loop) into maps of the actuator grid
+        (see `actuator_grid`), where each value is placed in the cell of the respective actuator. For example, commands
+        with dimensions :math:`t \\times a_v` become maps with dimensions :math:`t \\times h \\times w`. Each chunk of
+        frames is scattered with a single vectorized assignment.
+
+        Parameters
+        ----------
+        commands
+            Data whose last dimension corresponds to the :math:`a_v` valid actuators.
+        frames : optional
+            Slice or sequence of indices that selects which frames (elements of the first dimension of the data) are
+            scattered. If None, all frames are scattered.
+        fill_value : default = np.nan
+            Value of the cells that do not correspond to any actuator.
+        chunk : optional
+            Number of frames processed at a time. If None, it is chosen so that each chunk of maps occupies roughly
+            `LazyArray.chunk_bytes`.
+        out : optional
+            Where the maps are written. If None, a new array is allocated. If it is a path, the result is written into
+            a memory-mapped ``.npy`` file created there. Otherwise, it must be an array with the correct shape.
+        name : optional
+            Name of the returned image. If None, a name is derived from the name of the data.
+
+        Returns
+        -------
+            `Image` containing the maps, with the `time` of the selected frames.
+
+        Raises
+        ------
+        ValueError
+            If the actuator coordinates do not fit a regular grid or if the last dimension of the data does not match
+            the valid actuators.
+        """
+        positions, shape = self.actuator_grid()
+        result, indices = _scatter(commands.data, positions[:, 0], positions[:, 1], shape, frames=frames,
+                                   fill_value=fill_value, chunk_size=chunk, out=out)
+        return Image(name if name is not None else f'{commands.name} maps', result, unit=commands.unit,
+                     time=_select_time(commands.time, indices, len(commands.data)))
+
 
 @dataclass(kw_only=True)
 class TipTiltMirror(WavefrontCorrector):
@@ -47,6 +47,15 @@ FILE_REFERENCE = 'FILEREF'
 URL_REFERENCE = 'URLREF'
 IMAGE_UNIT = 'BUNIT'
 
+# Sparse images are stored as binary tables in coordinate (COO) format: one zero-based index column per axis (following
+# the FITS axis order, INDEX1 being the fastest varying axis) and one column for the values. The shape of the equivalent
+# dense image is stored in the SNAXIS/SNAXISn keywords, analogous to NAXIS/NAXISn.
+IMAGE_SPARSE = 'SPARSE'
+IMAGE_SPARSE_COO = 'COO'
+IMAGE_SPARSE_NAXIS = 'SNAXIS'
+IMAGE_SPARSE_INDEX = 'INDEX'
+IMAGE_SPARSE_VALUE = 'VALUE'
+
 UNIT_DIMENSIONLESS = '1'
 UNIT_COUNT = 'count'
 UNIT_METERS = 'm'
@@ -11,7 +11,8 @@ from astropy.io import fits
 
 import aotpy
 from . import _keywords as kw
-from .utils import FITSURLImage, FITSFileImage, image_from_hdu, keyword_is_relevant, metadatum_from_card
+from .utils import FITSURLImage, FITSFileImage, image_from_hdu, is_sparse_hdu, keyword_is_relevant, \
+    metadatum_from_card
 from ..base import SystemReader
 
 _reference_pattern = re.compile(r'([^<]+)<(.+)>(\d+)?')
@@ -120,7 +121,7 @@ class FITSReader(SystemReader):
                 if hdu.name in table_count:
                     table_count[hdu.name] += 1
                 else:
-                    if hdu.is_image:
+                    if hdu.is_image or is_sparse_hdu(hdu):
                         if not hdu.name:
                             raise ValueError('All image extensions in file must have a name.')
                         if hdu.name in self._images:
@@ -400,8 +401,7 @@ class FITSReader(SystemReader):
                 uid=data[kw.REFERENCE_UID],
                 modes=self._handle_image(data[kw.ABERRATION_MODES]),
                 coefficients=self._handle_image(data[kw.ABERRATION_COEFFICIENTS]),
-                offsets=[aotpy.Coordinates(x, y)
-                         for x, y in zip(data[kw.ABERRATION_X_OFFSETS], data[kw.ABERRATION_Y_OFFSETS])],
+                offsets=aotpy.CoordinatesArray.from_xy(data[kw.ABERRATION_X_OFFSETS], data[kw.ABERRATION_Y_OFFSETS]),
             ), False]
 
     def _handle_telescopes(self, hdus: fits.HDUList):
@@ -450,8 +450,8 @@ class FITSReader(SystemReader):
                     warnings.warn(f"Ignored unknown segment type '{t}'.")
                     seg = aotpy.Monolithic()
                 seg.size = data[kw.TELESCOPE_SEGMENTS_SIZE]
-                seg.coordinates = [aotpy.Coordinates(x, y)
-                                   for x, y in zip(data[kw.TELESCOPE_SEGMENTS_X], data[kw.TELESCOPE_SEGMENTS_Y])]
+                seg.coordinates = aotpy.CoordinatesArray.from_xy(data[kw.TELESCOPE_SEGMENTS_X],
+                                                                 data[kw.TELESCOPE_SEGMENTS_Y])
 
             tel.segments = seg
             tel.transformation_matrix = self._handle_image(data[kw.TRANSFORMATION_MATRIX])
@@ -656,8 +656,8 @@ class FITSReader(SystemReader):
             wfs.measurements = self._handle_image(data[kw.WAVEFRONT_SENSOR_MEASUREMENTS])
             wfs.ref_measurements = self._handle_image(data[kw.WAVEFRONT_SENSOR_REF_MEASUREMENTS])
             wfs.subaperture_mask = self._handle_image(data[kw.WAVEFRONT_SENSOR_SUBAPERTURE_MASK])
-            wfs.mask_offsets = [aotpy.Coordinates(x, y) for x, y in zip(data[kw.WAVEFRONT_SENSOR_MASK_X_OFFSETS],
-                                                                        data[kw.WAVEFRONT_SENSOR_MASK_Y_OFFSETS])]
+            wfs.mask_offsets = aotpy.CoordinatesArray.from_xy(data[kw.WAVEFRONT_SENSOR_MASK_X_OFFSETS],
+                                                              data[kw.WAVEFRONT_SENSOR_MASK_Y_OFFSETS])
             wfs.subaperture_size = data[kw.WAVEFRONT_SENSOR_SUBAPERTURE_SIZE]
             wfs.subaperture_intensities = self._handle_image(data[kw.WAVEFRONT_SENSOR_SUBAPERTURE_INTENSITIES])
             wfs.wavelength = data[kw.WAVEFRONT_SENSOR_WAVELENGTH]
@@ -703,9 +703,9 @@ class FITSReader(SystemReader):
                     uid=uid,
                     telescope=telescope,
                     n_valid_actuators=data[kw.WAVEFRONT_CORRECTOR_N_VALID_ACTUATORS],
-                    actuator_coordinates=[aotpy.Coordinates(x, y) for x, y in
-                                          zip(other_data[kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_X],
-                                              other_data[kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_Y])],
+                    actuator_coordinates=aotpy.CoordinatesArray.from_xy(
+                        other_data[kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_X],
+                        other_data[kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_Y]),
                     influence_function=self._handle_image(other_data[kw.WAVEFRONT_CORRECTOR_DM_INFLUENCE_FUNCTION]),
                     stroke=other_data[kw.WAVEFRONT_CORRECTOR_DM_STROKE]
                 )
@@ -13,7 +13,8 @@ import aotpy
 from . import _keywords as kw
 
 __all__ = ['FITSFileImage', 'FITSURLImage', 'image_from_file', 'image_from_hdus', 'image_from_hdu',
-           'metadatum_from_card', 'metadata_from_hdu', 'datetime_to_iso', 'keyword_is_relevant']
+           'metadatum_from_card', 'metadata_from_hdu', 'datetime_to_iso', 'keyword_is_relevant', 'is_sparse_hdu',
+           'sparse_hdu_from_image']
 
 
 def keyword_is_relevant(keyword):
@@ -26,6 +27,49 @@ def keyword_is_relevant(keyword):
     return keyword not in _standard_keywords and not _standard_patterns.fullmatch(keyword)
 
 
+_sparse_patterns = re.compile(rf'{kw.IMAGE_SPARSE}|{kw.IMAGE_SPARSE_NAXIS}\d*|TFIELDS|T(TYPE|FORM|UNIT|DIM)\d+')
+
+
+def is_sparse_hdu(hdu) -> bool:
+    """Check if HDU is a binary table that contains a sparse image."""
+    return isinstance(hdu, fits.BinTableHDU) and hdu.header.get(kw.IMAGE_SPARSE) == kw.IMAGE_SPARSE_COO
+
+
+def sparse_hdu_from_image(image: aotpy.Image, header: fits.Header = None) -> fits.BinTableHDU:
+    """
+    Get binary table HDU that stores the sparse data of `image` in coordinate (COO) format.
+
+    Parameters
+    ----------
+    image
+        `Image` with sparse data.
+    header : optional
+        Header to be used in the HDU, the sparse format keywords are added to it.
+    """
+    data: aotpy.SparseArray = image.data
+    hdr = fits.Header() if header is None else header.copy()
+    hdr[kw.IMAGE_SPARSE] = kw.IMAGE_SPARSE_COO
+    hdr[kw.IMAGE_SPARSE_NAXIS] = data.ndim
+    for i, n in enumerate(reversed(data.shape), start=1):
+        hdr[f'{kw.IMAGE_SPARSE_NAXIS}{i}'] = n
+    index_dtype = np.int32 if max(data.shape, default=0) <= np.iinfo(np.int32).max else np.int64
+    arrays = [data.coords[data.ndim - i].astype(index_dtype) for i in range(1, data.ndim + 1)]
+    names = [f'{kw.IMAGE_SPARSE_INDEX}{i}' for i in range(1, data.ndim + 1)]
+    table = np.rec.fromarrays([*arrays, data.values], names=[*names, kw.IMAGE_SPARSE_VALUE])
+    return fits.BinTableHDU(data=table, header=hdr, name=image.name)
+
+
+def _sparse_array_from_hdu(hdu: fits.BinTableHDU) -> aotpy.SparseArray:
+    hdr = hdu.header
+    ndim = hdr[kw.IMAGE_SPARSE_NAXIS]
+    shape = tuple(hdr[f'{kw.IMAGE_SPARSE_NAXIS}{i}'] for i in range(ndim, 0, -1))
+    table = hdu.data
+    if table is None:
+        return aotpy.SparseArray(np.empty((ndim, 0), dtype=np.int64), np.empty(0), shape)
+    coords = np.array([table[f'{kw.IMAGE_SPARSE_INDEX}{i}'] for i in range(ndim, 0, -1)], dtype=np.int64)
+    return aotpy.SparseArray(coords.reshape(ndim, -1), np.asarray(table[kw.IMAGE_SPARSE_VALUE]), shape)
+
+
 class _FITSExternalImage(aotpy.Image):
     """Describes an external FITS file containing multidimensional data and metadata related to it."""
 
@@ -173,13 +217,13 @@ def _get_image_fields_from_hdus(hdus: fits.HDUList, index: int = None) -> \
         tuple[str, np.ndarray, str, str, list[aotpy.Metadatum]]:
     if index is None:
         for hdu in hdus:
-            if hdu.is_image and hdu.data is not None:
+            if (hdu.is_image and hdu.data is not None) or is_sparse_hdu(hdu):
                 break
         else:
             raise ValueError('Could not find any image data in FITS file.')
     else:
         hdu = hdus[index]
-        if not hdu.is_image or hdu.data is None:
+        if (not hdu.is_image or hdu.data is None) and not is_sparse_hdu(hdu):
             raise ValueError(f'Referenced HDU {hdu.name} does not contain image data.')
 
     return _get_image_fields_from_hdu(hdu)
@@ -187,6 +231,11 @@ def _get_image_fields_from_hdus(hdus: fits.HDUList, index: int = None) -> \
 
 def _get_image_fields_from_hdu(hdu) -> tuple[str, np.ndarray, str, str, list[aotpy.Metadatum]]:
     metadata = metadata_from_hdu(hdu)
+    if is_sparse_hdu(hdu):
+        data = _sparse_array_from_hdu(hdu)
+        metadata = [x for x in metadata if not _sparse_patterns.fullmatch(x.key)]
+    else:
+        data = hdu.data
     unit = None
     if (md := next((x for x in metadata if x.key == kw.IMAGE_UNIT), None)) is not None:
         unit = md.value
@@ -195,7 +244,7 @@ def _get_image_fields_from_hdu(hdu) -> tuple[str, np.ndarray, str, str, list[aot
     if (md := next((x for x in metadata if x.key == kw.TIME_REFERENCE), None)) is not None:
         _time = md.value
         metadata.remove(md)
-    return hdu.name, hdu.data, unit, _time, metadata
+    return hdu.name, data, unit, _time, metadata
 
 
 def metadatum_from_card(card: fits.Card):
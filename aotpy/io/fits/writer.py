@@ -10,7 +10,7 @@ from astropy.io import fits
 
 import aotpy
 from . import _keywords as kw
-from .utils import FITSFileImage, FITSURLImage, datetime_to_iso
+from .utils import FITSFileImage, FITSURLImage, datetime_to_iso, sparse_hdu_from_image
 from ..base import SystemWriter
 
 # NaN is defined here as a single precision float (32-bits), which is the lowest possible float precision in FITS.
@@ -38,6 +38,47 @@ def write_system_to_fits(filename: str, system: aotpy.AOSystem, **kwargs) -> Non
     FITSWriter(system).write(filename, **kwargs)
 
 
+def _stream_image_hdu(filename: str | os.PathLike, image: aotpy.Image, header: fits.Header,
+                      chunk_size: int = None) -> None:
+    """Append an image extension to `filename`, writing the `LazyArray` data of `image` one chunk at a time."""
+    # StreamingHDU does not handle path-like objects correctly, so the filename must be a string
+    filename = os.fspath(filename)
+    data: aotpy.LazyArray = image.data
+    dtype = data.dtype
+    if dtype.kind == 'b':
+        dtype = np.dtype(np.uint8)
+    elif dtype.kind == 'f' and dtype.itemsize < 4:
+        dtype = np.dtype(np.float32)
+    elif dtype.kind == 'i' and dtype.itemsize == 1:
+        dtype = np.dtype(np.int16)
+    dtype = dtype.newbyteorder('=')
+    # Unsigned integers (except 8-bit) are stored as signed integers with an offset, as specified by the FITS standard
+    offset = 1 << (8 * dtype.itemsize - 1) if dtype.kind == 'u' and dtype.itemsize > 1 else 0
+    stored = np.dtype(f'>i{dtype.itemsize}') if offset else dtype.newbyteorder('>')
+
+    if len(data) == 0:
+        with fits.open(filename, mode='append') as hdus:
+            hdus.append(fits.ImageHDU(name=image.name, data=np.empty(data.shape, dtype), header=header))
+        return
+
+    hdr = fits.ImageHDU(name=image.name, data=np.zeros((1, *data.shape[1:]), dtype=stored), header=header).header
+    hdr[f'NAXIS{data.ndim}'] = len(data)
+    if offset:
+        hdr['BZERO'] = offset
+        hdr['BSCALE'] = 1
+
+    stream = fits.StreamingHDU(filename, hdr)
+    try:
+        for chunk in data.iter_chunks(chunk_size):
+            chunk = np.asarray(chunk, dtype=dtype)
+            if offset:
+                # Subtracting the offset is equivalent to flipping the most significant bit
+                chunk = (chunk ^ dtype.type(offset)).view(f'i{dtype.itemsize}')
+            stream.write(np.ascontiguousarray(chunk, dtype=stored))
+    finally:
+        stream.close()
+
+
 class FITSWriter(SystemWriter):
     def __init__(self, system: aotpy.AOSystem) -> None:
         self._system = system
@@ -50,6 +91,10 @@ class FITSWriter(SystemWriter):
 
         self._images: dict[str, aotpy.Image] = {}
 
+        self._lazy_images: list[tuple[aotpy.Image, fits.Header]] = []
+        """Images whose data is a `LazyArray`, along with their headers. These are not part of the HDU list, since
+        their data is streamed into the file when writing."""
+
         self._handle_data()
 
         primary_hdu = self._create_primary_hdu()
@@ -57,17 +102,39 @@ class FITSWriter(SystemWriter):
         image_hdus = self._create_image_hdus()
         self._hdus = fits.HDUList([primary_hdu, *bintable_hdus, *image_hdus])
 
-    def write(self, filename: str | os.PathLike, **kwargs) -> None:
-        self.get_hdus().writeto(filename, **kwargs)
+    def write(self, filename: str | os.PathLike, *, chunk_size: int = None, **kwargs) -> None:
+        """
+        Write the initialized `system` into the specified `filename`.
+
+        Images whose data is a `LazyArray` are streamed into the file one chunk at a time, so that they never need to be
+        fully loaded into memory.
+
+        Parameters
+        ----------
+        filename
+            Path to the file that will be written.
+        chunk_size : optional
+            Number of elements of the first dimension of each chunk written for lazy images. If None, the chunks
+            occupy roughly `LazyArray.chunk_bytes`.
+        **kwargs
+            Keyword arguments passed on to `astropy.io.fits.HDUList.writeto`.
+        """
+        self._hdus.writeto(filename, **kwargs)
+        for image, hdr in self._lazy_images:
+            _stream_image_hdu(filename, image, hdr, chunk_size)
 
     def get_hdus(self) -> fits.HDUList:
         """
-        Get the list of HDUs that compose the AOT FITS file for the initialized system.
+        Get the list of HDUs that compose the AOT FITS file for the initialized system. Images whose data is a
+        `LazyArray` are fully loaded into memory.
         Returns
         -------
             `HDUList` that composes the AOT FITS file for the initialized system.
         """
-        return self._hdus
+        if not self._lazy_images:
+            return self._hdus
+        return fits.HDUList([*self._hdus, *(fits.ImageHDU(name=image.name, data=image.data.load(), header=hdr)
+                                            for image, hdr in self._lazy_images)])
 
     def _handle_data(self):
         for atm in self._system.atmosphere_params:
@@ -134,6 +201,8 @@ class FITSWriter(SystemWriter):
             elif field.format == kw.LIST_FORMAT:
                 if value is None:
                     value = []
+                elif isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.number):
+                    pass  # Numeric arrays cannot contain None, so they can be used as they are
                 else:
                     try:
                         value = [_nan if v is None else v for v in value]
@@ -149,6 +218,13 @@ class FITSWriter(SystemWriter):
         table[obj.uid] = (obj, converted)
         return True
 
+    @staticmethod
+    def _split_coordinates(coordinates: list[aotpy.Coordinates]) -> tuple[np.ndarray, np.ndarray]:
+        # Move whole columns at once instead of building one list per component
+        if not isinstance(coordinates, aotpy.CoordinatesArray):
+            coordinates = aotpy.CoordinatesArray(coordinates)
+        return coordinates.x, coordinates.y
+
     @staticmethod
     def _create_row_reference(uid: str) -> str:
         return f'{kw.ROW_REFERENCE}<{uid}>'
@@ -157,6 +233,7 @@ class FITSWriter(SystemWriter):
         if time is None:
             return None
         if time.timestamps is not None and time.frame_numbers is not None \
+                and len(time.timestamps) > 0 and len(time.frame_numbers) > 0 \
                 and len(time.timestamps) != len(time.frame_numbers):
             raise ValueError(f"Error in Time '{time.uid}': If both 'timestamps' and 'frame_numbers' are non-null, they"
                              f"must have the same length.")
@@ -217,12 +294,13 @@ class FITSWriter(SystemWriter):
         if abr is None:
             return None
 
+        offsets_x, offsets_y = self._split_coordinates(abr.offsets)
         row = {
             kw.REFERENCE_UID: abr.uid,
             kw.ABERRATION_MODES: self._handle_image(abr.modes),
             kw.ABERRATION_COEFFICIENTS: self._handle_image(abr.coefficients),
-            kw.ABERRATION_X_OFFSETS: [off.x for off in abr.offsets],
-            kw.ABERRATION_Y_OFFSETS: [off.y for off in abr.offsets]
+            kw.ABERRATION_X_OFFSETS: offsets_x,
+            kw.ABERRATION_Y_OFFSETS: offsets_y
         }
         self._add_to_table(kw.ABERRATIONS_TABLE, abr, row)
         return self._create_row_reference(abr.uid)
@@ -261,8 +339,7 @@ class FITSWriter(SystemWriter):
             else:
                 raise NotImplementedError
             segments_size = tel.segments.size
-            segments_x = [coord.x for coord in tel.segments.coordinates]
-            segments_y = [coord.y for coord in tel.segments.coordinates]
+            segments_x, segments_y = self._split_coordinates(tel.segments.coordinates)
 
         row = {
             kw.REFERENCE_UID: tel.uid,
@@ -409,6 +486,7 @@ class FITSWriter(SystemWriter):
         else:
             raise NotImplementedError
 
+        offsets_x, offsets_y = self._split_coordinates(wfs.mask_offsets)
         row = {
             kw.REFERENCE_UID: wfs.uid,
             kw.WAVEFRONT_SENSOR_TYPE: wfs_type,
@@ -418,8 +496,8 @@ class FITSWriter(SystemWriter):
             kw.WAVEFRONT_SENSOR_MEASUREMENTS: self._handle_image(wfs.measurements),
             kw.WAVEFRONT_SENSOR_REF_MEASUREMENTS: self._handle_image(wfs.ref_measurements),
             kw.WAVEFRONT_SENSOR_SUBAPERTURE_MASK: self._handle_image(wfs.subaperture_mask),
-            kw.WAVEFRONT_SENSOR_MASK_X_OFFSETS: [off.x for off in wfs.mask_offsets],
-            kw.WAVEFRONT_SENSOR_MASK_Y_OFFSETS: [off.y for off in wfs.mask_offsets],
+            kw.WAVEFRONT_SENSOR_MASK_X_OFFSETS: offsets_x,
+            kw.WAVEFRONT_SENSOR_MASK_Y_OFFSETS: offsets_y,
             kw.WAVEFRONT_SENSOR_SUBAPERTURE_SIZE: wfs.subaperture_size,
             kw.WAVEFRONT_SENSOR_SUBAPERTURE_INTENSITIES: self._handle_image(wfs.subaperture_intensities),
             kw.WAVEFRONT_SENSOR_WAVELENGTH: wfs.wavelength,
@@ -442,10 +520,11 @@ class FITSWriter(SystemWriter):
 
         if isinstance(cor, aotpy.DeformableMirror):
             cor_type = kw.WAVEFRONT_CORRECTOR_TYPE_DM
+            actuators_x, actuators_y = self._split_coordinates(cor.actuator_coordinates)
             row = {
                 kw.REFERENCE_UID: cor.uid,
-                kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_X: [coord.x for coord in cor.actuator_coordinates],
-                kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_Y: [coord.y for coord in cor.actuator_coordinates],
+                kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_X: actuators_x,
+                kw.WAVEFRONT_CORRECTOR_DM_ACTUATORS_Y: actuators_y,
                 kw.WAVEFRONT_CORRECTOR_DM_INFLUENCE_FUNCTION: self._handle_image(cor.influence_function),
                 kw.WAVEFRONT_CORRECTOR_DM_STROKE: cor.stroke
             }
@@ -608,7 +687,7 @@ class FITSWriter(SystemWriter):
             hdus.append(fits.BinTableHDU.from_columns(name=table_name, columns=columns))
         return hdus
 
-    def _create_image_hdus(self) -> list[fits.ImageHDU]:
+    def _create_image_hdus(self) -> list[fits.ImageHDU | fits.BinTableHDU]:
         hdus = []
         for image in self._images.values():
             hdr = fits.Header([(f'HIERARCH {md.key}' if len(md.key) > 8 else md.key,
@@ -618,5 +697,10 @@ class FITSWriter(SystemWriter):
                 hdr[kw.TIME_REFERENCE] = self._create_row_reference(image.time.uid)
             if image.unit is not None:
                 hdr[kw.IMAGE_UNIT] = image.unit
-            hdus.append(fits.ImageHDU(name=image.name, data=image.data, header=hdr))
+            if isinstance(image.data, aotpy.SparseArray):
+                hdus.append(sparse_hdu_from_image(image, hdr))
+            elif isinstance(image.data, aotpy.LazyArray):
+                self._lazy_images.append((image, hdr))
+            else:
+                hdus.append(fits.ImageHDU(name=image.name, data=image.data, header=hdr))
         return hdus
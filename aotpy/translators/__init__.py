@@ -3,10 +3,32 @@ This subpackage contains modules with translators, which are able to convert non
 objects.
 
 The aotpy objects created by these translators can be handled as any other aotpy object regardless of origin.
+
+Translator modules are only imported when they are first used, either by accessing the translator classes from this
+subpackage or by selecting them via `translate`. This keeps ``import aotpy`` fast and avoids importing optional
+dependencies that are not needed.
 """
 
-from .galacsi import GALACSITranslator
-from .ciao import CIAOTranslator
-from .eris import ERISTranslator
-from .naomi import NAOMITranslator
-from .papyrus import PAPYRUSTranslator
+from .registry import *
+from . import cache
+
+# Translator classes available from this subpackage, mapped to the name they are registered with
+_LAZY_TRANSLATORS = {
+    'GALACSITranslator': 'GALACSI',
+    'CIAOTranslator': 'CIAO',
+    'ERISTranslator': 'ERIS',
+    'NAOMITranslator': 'NAOMI',
+    'PAPYRUSTranslator': 'PAPYRUS',
+}
+
+__all__ = registry.__all__ + list(_LAZY_TRANSLATORS)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_TRANSLATORS:
+        return get_translator(_LAZY_TRANSLATORS[name])
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_TRANSLATORS))
@@ -2,6 +2,7 @@
 This module contains a base class for translating non-standard AO telemetry data.
 """
 
+import os
 from abc import ABC, abstractmethod
 
 import aotpy
@@ -19,23 +20,77 @@ class BaseTranslator(ABC):
 
     """
 
+    _supports_lazy: bool = False
+    """Whether the translator accepts the ``lazy`` keyword argument, which keeps large data in `LazyArray` objects."""
+
     @abstractmethod
     def __init__(self, *args) -> None:
         self.system: aotpy.AOSystem = aotpy.AOSystem()
 
     @classmethod
-    def translate(cls, *args) -> aotpy.AOSystem:
+    def translate(cls, *args, **kwargs) -> aotpy.AOSystem:
         """
-        Initialize class with `args`, return translated `AOSystem`.
+        Initialize class with `args` and `kwargs`, return translated `AOSystem`.
 
         Parameters
         ----------
         *args
             Arguments used to initialize the translator class.
+        **kwargs
+            Keyword arguments used to initialize the translator class (for example ``lazy``).
 
         Returns
         -------
             `AOSystem` containing translated data.
         """
-        t = cls(*args)
+        t = cls(*args, **kwargs)
         return t.system
+
+    @classmethod
+    def translate_cached(cls, *args, cache_dir: str | os.PathLike = None, hash_contents: bool = False,
+                         **kwargs) -> aotpy.AOSystem:
+        """
+        Initialize class with `args` and `kwargs`, return translated `AOSystem`, reusing a previous translation of the
+        same data if it is available in the cache. See `aotpy.translators.cache.translate_cached`.
+
+        Parameters
+        ----------
+        *args
+            Arguments used to initialize the translator class.
+        cache_dir : optional
+            Directory where cached systems are stored. If None, `aotpy.translators.cache.default_cache_dir` is used.
+        hash_contents : default = False
+            Whether the contents of the input files should also be hashed, instead of only their sizes and modification
+            times.
+        **kwargs
+            Keyword arguments used to initialize the translator class.
+
+        Returns
+        -------
+            `AOSystem` containing translated data.
+        """
+        from .cache import translate_cached
+        return translate_cached(cls, *args, cache_dir=cache_dir, hash_contents=hash_contents, **kwargs)
+
+    @classmethod
+    def translate_to_file(cls, *args, filename: str | os.PathLike, **kwargs) -> None:
+        """
+        Initialize class with `args` and write the translated `AOSystem` directly to `filename`.
+
+        If the translator supports it, large data is translated lazily and streamed into the file one chunk at a time,
+        so that peak memory usage is bounded by the chunk size instead of the length of the recording.
+
+        Parameters
+        ----------
+        *args
+            Arguments used to initialize the translator class.
+        filename
+            Path to the file to be written.
+        **kwargs
+            Keyword arguments passed on to `AOSystem.write_to_file` (for example ``overwrite`` or ``chunk_size``).
+        """
+        if cls._supports_lazy:
+            t = cls(*args, lazy=True)
+        else:
+            t = cls(*args)
+        t.system.write_to_file(filename, **kwargs)
@@ -0,0 +1,143 @@
+"""
+This module contains an on-disk cache of translated systems, which avoids repeating the translation of data that has not
+changed since it was last translated.
+
+Translated systems are stored as AOT FITS files, named after a fingerprint of the translator, its arguments and the
+files found in each path passed on to it. Any change to the input files (or to the translator options) produces a new
+fingerprint, so stale entries are never used.
+"""
+
+import hashlib
+import os
+from importlib import metadata
+from pathlib import Path
+from typing import Type
+
+import aotpy
+from .base import BaseTranslator
+
+__all__ = ['default_cache_dir', 'fingerprint', 'translate_cached', 'clear_cache']
+
+# Increase whenever the layout of cache entries changes, so that old entries are ignored
+_CACHE_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    """
+    Return the default directory for cached translations.
+
+    It can be set with the ``AOTPY_CACHE_DIR`` environment variable, otherwise it defaults to ``~/.cache/aotpy``.
+    """
+    if (path := os.environ.get('AOTPY_CACHE_DIR')) is not None:
+        return Path(path)
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'aotpy'
+
+
+def _hash_file(h, file: Path) -> None:
+    with open(file, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+
+
+def fingerprint(*paths: str | os.PathLike, hash_contents: bool = False, extra=None) -> str:
+    """
+    Compute a fingerprint that identifies the current state of the files in `paths`.
+
+    The fingerprint is based on the relative path, size and modification time of every file in `paths` (folders are
+    searched recursively). Any change in these produces a new fingerprint.
+
+    Parameters
+    ----------
+    *paths
+        Paths to the files or folders to be fingerprinted.
+    hash_contents : default = False
+        Whether the contents of every file should also be hashed. This is slower, since every file is fully read, but
+        detects changes that preserve both the size and the modification time of files.
+    extra : optional
+        Any other information that should be part of the fingerprint (for example, translator options). Its
+        representation is used, so it should be deterministic.
+    """
+    h = hashlib.sha256()
+    h.update(repr(extra).encode())
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files = sorted(p for p in path.rglob('*') if p.is_file())
+        else:
+            files = [path]
+        h.update(f'{path.name}\0{len(files)}\n'.encode())
+        for file in files:
+            st = file.stat()
+            h.update(f'{file.relative_to(path) if file != path else file.name}\0{st.st_size}\0'
+                     f'{st.st_mtime_ns}\n'.encode())
+            if hash_contents:
+                _hash_file(h, file)
+    return h.hexdigest()
+
+
+def _aotpy_version() -> str:
+    try:
+        return metadata.version('aotpy')
+    except metadata.PackageNotFoundError:
+        return ''
+
+
+def translate_cached(translator: Type[BaseTranslator], *args, cache_dir: str | os.PathLike = None,
+                     hash_contents: bool = False, **kwargs) -> aotpy.AOSystem:
+    """
+    Translate data with `translator`, reusing a previous translation of the same data if it exists in the cache.
+
+    Every argument that refers to an existing path is fingerprinted (see `fingerprint`), along with the remaining
+    arguments and `kwargs` (except ``lazy``). If a cached system with the same fingerprint exists, it is read from disk
+    instead of translating the data again. Otherwise, the data is translated (lazily, if the translator supports it)
+    and written into the cache. In both cases the system is read from the cached file, so it is the same regardless of
+    whether the cache was hit or not.
+
+    Parameters
+    ----------
+    translator
+        Translator class to be used.
+    *args
+        Arguments used to initialize the translator class.
+    cache_dir : optional
+        Directory where cached systems are stored. If None, `default_cache_dir` is used.
+    hash_contents : default = False
+        Whether the contents of the input files should also be hashed (see `fingerprint`).
+    **kwargs
+        Keyword arguments used to initialize the translator class.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    paths = [a for a in args if isinstance(a, (str, os.PathLike)) and os.path.exists(a)]
+    others = [a for a in args if not isinstance(a, (str, os.PathLike)) or not os.path.exists(a)]
+    key = fingerprint(*paths, hash_contents=hash_contents,
+                      extra=(_CACHE_VERSION, _aotpy_version(), translator.__module__, translator.__qualname__,
+                             others, sorted((k, v) for k, v in kwargs.items() if k != 'lazy')))
+    filename = cache_dir / f'{translator.__name__}_{key}.fits'
+    if not filename.is_file():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        if translator._supports_lazy:
+            kwargs.setdefault('lazy', True)
+        # Only move the file into place once it is complete, so that an interrupted translation is never reused
+        partial = filename.with_name(f'{filename.stem}.{os.getpid()}.partial.fits')
+        try:
+            translator(*args, **kwargs).system.write_to_file(partial, overwrite=True)
+            os.replace(partial, filename)
+        finally:
+            partial.unlink(missing_ok=True)
+    return aotpy.AOSystem.read_from_file(filename)
+
+
+def clear_cache(cache_dir: str | os.PathLike = None) -> None:
+    """
+    Delete all cached systems.
+
+    Parameters
+    ----------
+    cache_dir : optional
+        Directory where cached systems are stored. If None, `default_cache_dir` is used.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    if not cache_dir.is_dir():
+        return
+    for file in cache_dir.glob('*Translator_*.fits'):
+        file.unlink(missing_ok=True)
@@ -19,21 +19,38 @@ from .eso import ESOTranslator
 class CIAOTranslator(ESOTranslator):
     """Contains functions for translating telemetry data produced by ESO's CIAO system.
 
+    Long recordings are split into several segments (``CIAO_LOOP_0001.fits``, ``CIAO_LOOP_0002.fits``, etc.). All
+    segments found in `path` are translated as a single time series. The calibration files of the first segment are
+    used.
+
     Parameters
     ----------
     path
         Path to folder containing telemetry data.
     at_number : {1, 2, 3, 4}
         Number of the AT that produced the data.
+    lazy : default = False
+        Whether large loop data (gradients, pixels, commands, etc.) should be kept in `LazyArray` objects, which are
+        computed one chunk at a time from the memory-mapped files when needed, instead of being loaded into memory.
     """
 
-    def __init__(self, path: str, at_number: int):
+    _supports_lazy = True
+
+    def __init__(self, path: str, at_number: int, *, lazy: bool = False):
         path = Path(path)
         self._at_number = at_number
+        self._lazy = lazy
+
+        loop_segments = self._find_segments(path, 'CIAO_LOOP')
+        # Calibration files are saved alongside each segment
+        suffix = loop_segments[0].stem[-5:]
+        self._prefetch(*(path / f'{f}{suffix}.fits' for f in [
+            'Acq.DET1.REFSLP', 'Recn.REC1.CM', 'RecnOptimiser.S2M', 'RecnOptimiser.M2V', 'RecnOptimiser.HO_IM',
+            'HOCtr.ACT_POS_REF_MAP'
+        ]))
 
-        with fits.open(path / 'CIAO_LOOP_0001.fits', extname='LoopFrame') as hdus:
-            main_hdr = hdus[0].header
-            main_loop_frame = hdus['LoopFrame'].data
+        main_hdr = fits.getheader(loop_segments[0])
+        main_loop_frame = self._read_segments(loop_segments, extname='LoopFrame')
 
         self.system = aotpy.AOSystem(
             ao_mode='SCAO',
@@ -59,8 +76,8 @@ class CIAOTranslator(ESOTranslator):
         loop_time = aotpy.Time('Loop Time', timestamps=main_timestamps.tolist(),
                                frame_numbers=main_frame_numbers.tolist())
 
-        gradients = self._stack_slopes(main_loop_frame['Gradients'], slope_axis=1)
-        reference = self._stack_slopes(fits.getdata(path / 'Acq.DET1.REFSLP_0001.fits'), slope_axis=1)[0]
+        gradients = self._loop_slopes(main_loop_frame['Gradients'])
+        reference = self._stack_slopes(self._getdata(path / f'Acq.DET1.REFSLP{suffix}.fits'), slope_axis=1)[0]
         wfs = aotpy.ShackHartmann(
             uid='WFS',
             source=ngs,
@@ -68,11 +85,12 @@ class CIAOTranslator(ESOTranslator):
             detector=aotpy.Detector('SAPHIRA'),
             measurements=aotpy.Image('Gradients', gradients, time=loop_time),
             ref_measurements=aotpy.Image('Acq.DET1.REFSLP', reference),
-            subaperture_intensities=aotpy.Image(f'Intensities', main_loop_frame['Intensities'], time=loop_time),
+            subaperture_intensities=aotpy.Image(f'Intensities', self._loop_data(main_loop_frame['Intensities']),
+                                                time=loop_time),
             centroiding_algorithm=main_hdr['ESO AOS ACQ CENTROID ALGO']
         )
 
-        pix_loop_frame = fits.getdata(path / 'CIAO_PIXELS_0001.fits')
+        pix_loop_frame = self._read_segments(self._find_segments(path, 'CIAO_PIXELS'))
         wfs.detector.pixel_intensities = aotpy.Image(
             'Pixels',
             data=self._get_pixel_data_from_table(pix_loop_frame),
@@ -83,28 +101,28 @@ class CIAOTranslator(ESOTranslator):
                                        n_valid_actuators=60)
         ittm = aotpy.TipTiltMirror('Image Tip-Tilt Mirror (ITTM)', telescope=self.system.main_telescope)
 
-        cm = self._stack_slopes(fits.getdata(path / 'Recn.REC1.CM_0001.fits'), slope_axis=1)
+        cm = self._stack_slopes(self._getdata(path / f'Recn.REC1.CM{suffix}.fits'), slope_axis=1)
         ho_cm = cm[: ho_dm.n_valid_actuators]
         tt_cm = cm[ho_dm.n_valid_actuators:]
 
-        s2m = self._stack_slopes(fits.getdata(path / 'RecnOptimiser.S2M_0001.fits'), slope_axis=1)
+        s2m = self._stack_slopes(self._getdata(path / f'RecnOptimiser.S2M{suffix}.fits'), slope_axis=1)
         if main_hdr['ESO AOS CM MODES CONTROLLED'] != s2m.shape[0]:
             warnings.warn("Keyword 'ESO AOS CM MODES CONTROLLED' does not match modes in measurements to modes matrix")
         s2m = aotpy.Image('RecnOptimiser.S2M', s2m)
 
-        m2c = fits.getdata(path / 'RecnOptimiser.M2V_0001.fits')
+        m2c = self._getdata(path / f'RecnOptimiser.M2V{suffix}.fits')
         ho_m2c = m2c[:ho_dm.n_valid_actuators]
         tt_m2c = m2c[ho_dm.n_valid_actuators:]
 
-        ho_im = self._stack_slopes(fits.getdata(path / 'RecnOptimiser.HO_IM_0001.fits'), slope_axis=0)
+        ho_im = self._stack_slopes(self._getdata(path / f'RecnOptimiser.HO_IM{suffix}.fits'), slope_axis=0)
         ho_loop = aotpy.ControlLoop(
             'HO Loop',
             input_sensor=wfs,
             commanded_corrector=ho_dm,
             time=loop_time,
-            commands=aotpy.Image('HODM positions', main_loop_frame['HODM_Positions'], time=loop_time),
+            commands=aotpy.Image('HODM positions', self._loop_data(main_loop_frame['HODM_Positions']), time=loop_time),
             ref_commands=aotpy.Image('HOCtr.ACT_POS_REF_MAP',
-                                     fits.getdata(path / 'HOCtr.ACT_POS_REF_MAP_0001.fits')[0]),
+                                     self._getdata(path / f'HOCtr.ACT_POS_REF_MAP{suffix}.fits')[0]),
             control_matrix=aotpy.Image('HO Control Matrix', ho_cm),
             measurements_to_modes=s2m,
             modes_to_commands=aotpy.Image('HO modes to commands', ho_m2c),
@@ -118,7 +136,7 @@ class CIAOTranslator(ESOTranslator):
             input_sensor=wfs,
             commanded_corrector=ittm,
             time=loop_time,
-            commands=aotpy.Image('ITTM positions', main_loop_frame['ITTM_Positions'], time=loop_time),
+            commands=aotpy.Image('ITTM positions', self._loop_data(main_loop_frame['ITTM_Positions']), time=loop_time),
             ref_commands=aotpy.Image('ESO AOS TTM REFPOS',
                                      np.array([main_hdr['ESO AOS TTM REFPOS X'], main_hdr['ESO AOS TTM REFPOS Y']])),
             control_matrix=aotpy.Image('TT Control Matrix', tt_cm),
@@ -149,6 +167,7 @@ class CIAOTranslator(ESOTranslator):
         self.system.wavefront_correctors = [ho_dm, ittm]
         self.system.loops = [ho_loop, tt_loop]
         self.system.atmosphere_params = [asm, aos]
+        self._clear_prefetched()
 
     def _get_eso_telescope_name(self) -> str:
         # Allow for both:
@@ -8,7 +8,6 @@ from datetime import datetime
 from pathlib import Path
 
 import numpy as np
-from astropy.io import fits
 
 import aotpy
 from aotpy.io import image_from_file
@@ -25,10 +24,16 @@ class ERISTranslator(ESOTranslator):
     ----------
     path
         Path to folder containing all system data.
+    lazy : default = False
+        Whether large loop data (gradients, pixels, commands, etc.) should be kept in `LazyArray` objects, which are
+        computed one chunk at a time from the memory-mapped files when needed, instead of being loaded into memory.
     """
 
-    def __init__(self, path):
+    _supports_lazy = True
+
+    def __init__(self, path, *, lazy: bool = False):
         self._path = Path(path)
+        self._lazy = lazy
         self.system = aotpy.AOSystem(name='ERIS AO')
         self.system.main_telescope = aotpy.MainTelescope(
             uid='ESO VLT UT4',
@@ -52,6 +57,7 @@ class ERISTranslator(ESOTranslator):
             self._handle_lgs_data(lgs_loop_file, lgs_pixel_file, lo_loop_file, lo_pixel_file)
         else:
             raise ValueError('Path does not contain necessary telemetry data.')
+        self._clear_prefetched()
 
     def _find_bintable_files(self, name):
         file = list(self._path.glob(f'{name}_*.fits'))
@@ -65,8 +71,18 @@ class ERISTranslator(ESOTranslator):
 
     def _handle_lgs_data(self, lgs_loop_file, lgs_pixel_file, lo_loop_file, lo_pixel_file):
         self.system.ao_mode = 'LTAO'
-        lgs_loop_frame = fits.getdata(lgs_loop_file, extname='LGSLoopFrame')
-        lgs_pix_frame = fits.getdata(lgs_pixel_file, extname='LGSPixelFrame')
+        self._prefetch(*(self._path / f for f in [
+            'JitCtr.CFG.DYNAMIC.fits', 'LGSAcq.DET1.REFSLP_WITH_OFFSETS.fits', 'LGSAcq.DET1.DARK.fits',
+            'LGSAcq.DET1.WEIGHT.fits', 'LGSAcq.DET1.BACKGROUND.fits', 'CLMatrixOptimiser.S2M.fits',
+            'CLMatrixOptimiser.M2S.fits', 'LGSDet.CFG.DYNAMIC.fits', 'LGSCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits',
+            'LGSCtr.A_TERMS.fits', 'LGSCtr.B_TERMS.fits', 'CLMatrixOptimiser.M2V.fits', 'CLMatrixOptimiser.V2M.fits',
+            'JitRecnOptimiser.JitCM.fits', 'JitRecnCalibrat.IM.fits', 'LOAcq.DET1.REFSLP_WITH_OFFSETS.fits',
+            'LOAcq.DET1.DARK.fits', 'LOAcq.DET1.WEIGHT.fits', 'LOAcq.DET1.BACKGROUND.fits',
+            'LOCtr.SENSOR_2_MODES.fits', 'LODet.CFG.DYNAMIC.fits', 'LOCtr.A_TERMS.fits', 'LOCtr.B_TERMS.fits',
+            'TruthCtr.SENSOR_2_MODES.fits', 'TruthCtr.A_TERMS.fits', 'TruthCtr.B_TERMS.fits'
+        ]))
+        lgs_loop_frame = self._read_loop_frame(lgs_loop_file, 'LGSLoopFrame')
+        lgs_pix_frame = self._read_loop_frame(lgs_pixel_file, 'LGSPixelFrame')
 
         lgs_timestamps = lgs_loop_frame['Seconds'] + lgs_loop_frame['USeconds'] / 1.e6
         self.system.date_beginning = datetime.utcfromtimestamp(lgs_timestamps[0])
@@ -75,7 +91,7 @@ class ERISTranslator(ESOTranslator):
         lgs_time = aotpy.Time('LGS Loop Time', timestamps=lgs_timestamps.tolist(),
                               frame_numbers=lgs_frame_numbers.tolist())
 
-        active_laser = fits.getheader(self._path / 'JitCtr.CFG.DYNAMIC.fits')['ACTIVE_JITTER']
+        active_laser = self._getheader(self._path / 'JitCtr.CFG.DYNAMIC.fits')['ACTIVE_JITTER']
         llt = aotpy.LaserLaunchTelescope(f'LLT{active_laser}')
         lgs = aotpy.SodiumLaserGuideStar(uid='LGS', laser_launch_telescope=llt)
         self.system.sources.append(lgs)
@@ -83,27 +99,27 @@ class ERISTranslator(ESOTranslator):
         eris_data_path = importlib.resources.files('aotpy.data') / 'ERIS'
         with importlib.resources.as_file(eris_data_path / 'ho_subap.fits') as p:
             subaperture_mask = image_from_file(p, name='LGS WFS SUBAPERTURE MASK')
-        n_valid_subapertures = np.count_nonzero(subaperture_mask.data != -1)
+        n_valid_subapertures = len(aotpy.WavefrontSensor.get_subaperture_positions(subaperture_mask))
 
-        reference = self._stack_slopes(fits.getdata(self._path / 'LGSAcq.DET1.REFSLP_WITH_OFFSETS.fits'),
+        reference = self._stack_slopes(self._getdata(self._path / 'LGSAcq.DET1.REFSLP_WITH_OFFSETS.fits'),
                                        slope_axis=1)[0]
         lgs_wfs = aotpy.ShackHartmann(
             uid='LGS WFS',
             source=lgs,
             n_valid_subapertures=n_valid_subapertures,
-            measurements=aotpy.Image('LGS Gradients', self._stack_slopes(lgs_loop_frame['Gradients'], slope_axis=1)),
+            measurements=aotpy.Image('LGS Gradients', self._loop_slopes(lgs_loop_frame['Gradients'])),
             ref_measurements=aotpy.Image('LGSAcq.DET1.REFSLP_WITH_OFFSETS', reference),
             subaperture_mask=subaperture_mask,
             mask_offsets=[aotpy.Coordinates(0, 0)],
-            subaperture_intensities=aotpy.Image('LGS Intensities', lgs_loop_frame['Intensities'])
+            subaperture_intensities=aotpy.Image('LGS Intensities', self._loop_data(lgs_loop_frame['Intensities']))
         )
         self.system.wavefront_sensors.append(lgs_wfs)
 
         lgs_wfs.detector = aotpy.Detector(
             uid='LGS DET1',
-            dark=image_from_file(self._path / 'LGSAcq.DET1.DARK.fits'),
-            weight_map=image_from_file(self._path / 'LGSAcq.DET1.WEIGHT.fits'),
-            sky_background=image_from_file(self._path / 'LGSAcq.DET1.BACKGROUND.fits'),
+            dark=self._image_from_file(self._path / 'LGSAcq.DET1.DARK.fits'),
+            weight_map=self._image_from_file(self._path / 'LGSAcq.DET1.WEIGHT.fits'),
+            sky_background=self._image_from_file(self._path / 'LGSAcq.DET1.BACKGROUND.fits'),
             pixel_intensities=aotpy.Image(name='LGS Pixels',
                                           data=self._get_pixel_data_from_table(lgs_pix_frame),
                                           time=aotpy.Time('LGS Pixel Time',
@@ -112,24 +128,24 @@ class ERISTranslator(ESOTranslator):
         lgs_wfs.subaperture_size = \
             lgs_wfs.detector.pixel_intensities.data.shape[0] // lgs_wfs.subaperture_mask.data.shape[0]
 
-        s2m = self._stack_slopes(fits.getdata(self._path / 'CLMatrixOptimiser.S2M.fits'), slope_axis=1)
-        m2s = self._stack_slopes(fits.getdata(self._path / 'CLMatrixOptimiser.M2S.fits'), slope_axis=0)
+        s2m = self._stack_slopes(self._getdata(self._path / 'CLMatrixOptimiser.S2M.fits'), slope_axis=1)
+        m2s = self._stack_slopes(self._getdata(self._path / 'CLMatrixOptimiser.M2S.fits'), slope_axis=0)
 
-        lgs_freq = fits.getheader(self._path / 'LGSDet.CFG.DYNAMIC.fits')['FREQ']
+        lgs_freq = self._getheader(self._path / 'LGSDet.CFG.DYNAMIC.fits')['FREQ']
         self.system.loops.append(aotpy.ControlLoop(
             uid='High-order loop',
             input_sensor=lgs_wfs,
             commanded_corrector=self.dsm,
-            commands=aotpy.Image('DSM_positions', lgs_loop_frame['DSM_Positions']),
+            commands=aotpy.Image('DSM_positions', self._loop_data(lgs_loop_frame['DSM_Positions'])),
             ref_commands=aotpy.Image('LGSCtr.ACT_POS_REF_MAP_WITH_OFFSETS',
-                                     fits.getdata(self._path / 'LGSCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]),
+                                     self._getdata(self._path / 'LGSCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]),
             time=lgs_time,
             framerate=lgs_freq,
-            time_filter_num=aotpy.Image('LGSCtr.A_TERMS', fits.getdata(self._path / 'LGSCtr.A_TERMS.fits').T),
-            time_filter_den=aotpy.Image('LGSCtr.B_TERMS', fits.getdata(self._path / 'LGSCtr.B_TERMS.fits').T),
+            time_filter_num=aotpy.Image('LGSCtr.A_TERMS', self._getdata(self._path / 'LGSCtr.A_TERMS.fits').T),
+            time_filter_den=aotpy.Image('LGSCtr.B_TERMS', self._getdata(self._path / 'LGSCtr.B_TERMS.fits').T),
             measurements_to_modes=aotpy.Image('CLMatrixOptimiser.S2M', s2m),
-            modes_to_commands=image_from_file(self._path / 'CLMatrixOptimiser.M2V.fits'),
-            commands_to_modes=image_from_file(self._path / 'CLMatrixOptimiser.V2M.fits'),
+            modes_to_commands=self._image_from_file(self._path / 'CLMatrixOptimiser.M2V.fits'),
+            commands_to_modes=self._image_from_file(self._path / 'CLMatrixOptimiser.V2M.fits'),
             modes_to_measurements=aotpy.Image('CLMatrixOptimiser.M2S', m2s),
         ))
 
@@ -138,14 +154,14 @@ class ERISTranslator(ESOTranslator):
             telescope=llt
         )
 
-        cm = self._stack_slopes(fits.getdata(self._path / 'JitRecnOptimiser.JitCM.fits'), slope_axis=1)
-        im = self._stack_slopes(fits.getdata(self._path / 'JitRecnCalibrat.IM.fits'), slope_axis=0)
+        cm = self._stack_slopes(self._getdata(self._path / 'JitRecnOptimiser.JitCM.fits'), slope_axis=1)
+        im = self._stack_slopes(self._getdata(self._path / 'JitRecnCalibrat.IM.fits'), slope_axis=0)
         # jit_ref = fits.getdata(path_lgs / 'JitCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]
         self.system.loops.append(aotpy.ControlLoop(
             uid='Jitter loop',
             input_sensor=lgs_wfs,
             commanded_corrector=jit,
-            commands=aotpy.Image('Jitter_Positions', lgs_loop_frame['Jitter_Positions']),
+            commands=aotpy.Image('Jitter_Positions', self._loop_data(lgs_loop_frame['Jitter_Positions'])),
             # ref_commands=aotpy.Image(f'Jit{i}Ctr.ACT_POS_REF_MAP_WITH_OFFSETS', jit_ref[(i - 1) * 2: i * 2]),
             time=lgs_time,
             framerate=lgs_freq,
@@ -164,7 +180,7 @@ class ERISTranslator(ESOTranslator):
             uid='Jitter Offload loop',
             input_corrector=jit,
             commanded_corrector=fsm,
-            commands=aotpy.Image('Jitter_Offload', lgs_loop_frame['Jitter_Offload']),
+            commands=aotpy.Image('Jitter_Offload', self._loop_data(lgs_loop_frame['Jitter_Offload'])),
             # ref_commands=aotpy.Image(f'Jit{i}Ctr.OACT_POS_REF_MAP', off_ref[(i - 1) * 2: i * 2]),
             time=lgs_time,
             framerate=lgs_freq,
@@ -176,8 +192,8 @@ class ERISTranslator(ESOTranslator):
         ngs = aotpy.NaturalGuideStar(uid='NGS')
         self.system.sources.append(ngs)
 
-        lo_loop_frame = fits.getdata(lo_loop_file, extname='LOLoopFrame')
-        lo_pix_frame = fits.getdata(lo_pixel_file, extname='LOPixelFrame')
+        lo_loop_frame = self._read_loop_frame(lo_loop_file, 'LOLoopFrame')
+        lo_pix_frame = self._read_loop_frame(lo_pixel_file, 'LOPixelFrame')
 
         lo_timestamps = lo_loop_frame['Seconds'] + lo_loop_frame['USeconds'] / 1.e6
         if np.all(lo_timestamps == 0):
@@ -190,19 +206,19 @@ class ERISTranslator(ESOTranslator):
 
         with importlib.resources.as_file(eris_data_path / 'lo_subap.fits') as p:
             subaperture_mask = image_from_file(p, name='LO WFS SUBAPERTURE MASK')
-        n_valid_subapertures = np.count_nonzero(subaperture_mask.data != -1)
+        n_valid_subapertures = len(aotpy.WavefrontSensor.get_subaperture_positions(subaperture_mask))
 
-        reference = self._stack_slopes(fits.getdata(self._path / 'LOAcq.DET1.REFSLP_WITH_OFFSETS.fits'),
+        reference = self._stack_slopes(self._getdata(self._path / 'LOAcq.DET1.REFSLP_WITH_OFFSETS.fits'),
                                        slope_axis=1)[0]
         lo_wfs = aotpy.ShackHartmann(
             uid='LO WFS',
             source=ngs,
             n_valid_subapertures=n_valid_subapertures,
-            measurements=aotpy.Image('LO Gradients', self._stack_slopes(lo_loop_frame['Gradients'], slope_axis=1)),
+            measurements=aotpy.Image('LO Gradients', self._loop_slopes(lo_loop_frame['Gradients'])),
             ref_measurements=aotpy.Image('LOAcq.DET1.REFSLP_WITH_OFFSETS', reference),
             subaperture_mask=subaperture_mask,
             mask_offsets=[aotpy.Coordinates(0, 0)],
-            subaperture_intensities=aotpy.Image('LO Intensities', lo_loop_frame['Intensities'])
+            subaperture_intensities=aotpy.Image('LO Intensities', self._loop_data(lo_loop_frame['Intensities']))
         )
 
         lo_pix_fc = lo_pix_frame['FrameCounter']
@@ -246,9 +262,9 @@ class ERISTranslator(ESOTranslator):
 
         lo_wfs.detector = aotpy.Detector(
             uid='LO DET1',
-            dark=image_from_file(self._path / 'LOAcq.DET1.DARK.fits'),
-            weight_map=image_from_file(self._path / 'LOAcq.DET1.WEIGHT.fits'),
-            sky_background=image_from_file(self._path / 'LOAcq.DET1.BACKGROUND.fits'),
+            dark=self._image_from_file(self._path / 'LOAcq.DET1.DARK.fits'),
+            weight_map=self._image_from_file(self._path / 'LOAcq.DET1.WEIGHT.fits'),
+            sky_background=self._image_from_file(self._path / 'LOAcq.DET1.BACKGROUND.fits'),
             pixel_intensities=aotpy.Image(name='LO Pixels',
                                           data=self._get_pixel_data_from_table(lo_pix_frame),
                                           time=aotpy.Time('LO Pixel Time',
@@ -258,20 +274,20 @@ class ERISTranslator(ESOTranslator):
         lo_wfs.subaperture_size = \
             lo_wfs.detector.pixel_intensities.data.shape[0] // lo_wfs.subaperture_mask.data.shape[0]
 
-        s2m = self._stack_slopes(fits.getdata(self._path / 'LOCtr.SENSOR_2_MODES.fits'), slope_axis=1)
+        s2m = self._stack_slopes(self._getdata(self._path / 'LOCtr.SENSOR_2_MODES.fits'), slope_axis=1)
 
         self.system.loops.append(aotpy.ControlLoop(
             uid='Low-order loop',
             input_sensor=lo_wfs,
             commanded_corrector=self.dsm,
-            commands=aotpy.Image('LO_DSM_positions', lo_loop_frame['LO_DSM_positions']),
-            modal_coefficients=aotpy.Image('LO_Modal', lo_loop_frame['LO_Modal']),
+            commands=aotpy.Image('LO_DSM_positions', self._loop_data(lo_loop_frame['LO_DSM_positions'])),
+            modal_coefficients=aotpy.Image('LO_Modal', self._loop_data(lo_loop_frame['LO_Modal'])),
             # ref_commands=aotpy.Image('LGSCtr.ACT_POS_REF_MAP_WITH_OFFSETS',
             #                         fits.getdata(path_lgs / 'LGSCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]),
             time=lo_time,
-            framerate=fits.getheader(self._path / 'LODet.CFG.DYNAMIC.fits')['FREQ'],
-            time_filter_num=aotpy.Image('LOCtr.A_TERMS', fits.getdata(self._path / 'LOCtr.A_TERMS.fits').T),
-            time_filter_den=aotpy.Image('LOCtr.B_TERMS', fits.getdata(self._path / 'LOCtr.B_TERMS.fits').T),
+            framerate=self._getheader(self._path / 'LODet.CFG.DYNAMIC.fits')['FREQ'],
+            time_filter_num=aotpy.Image('LOCtr.A_TERMS', self._getdata(self._path / 'LOCtr.A_TERMS.fits').T),
+            time_filter_den=aotpy.Image('LOCtr.B_TERMS', self._getdata(self._path / 'LOCtr.B_TERMS.fits').T),
             measurements_to_modes=aotpy.Image('LOCtr.SENSOR_2_MODES', s2m),
         ))
 
@@ -281,20 +297,26 @@ class ERISTranslator(ESOTranslator):
         )
         self.system.wavefront_correctors.append(trombone)
 
-        s2m = self._stack_slopes(fits.getdata(self._path / 'TruthCtr.SENSOR_2_MODES.fits'), slope_axis=1)
+        s2m = self._stack_slopes(self._getdata(self._path / 'TruthCtr.SENSOR_2_MODES.fits'), slope_axis=1)
         self.system.loops.append(aotpy.ControlLoop(
             uid='Truth loop',
             input_sensor=lo_wfs,
             commanded_corrector=trombone,
-            time_filter_num=aotpy.Image('TruthCtr.A_TERMS', fits.getdata(self._path / 'TruthCtr.A_TERMS.fits').T),
-            time_filter_den=aotpy.Image('TruthCtr.B_TERMS', fits.getdata(self._path / 'TruthCtr.B_TERMS.fits').T),
+            time_filter_num=aotpy.Image('TruthCtr.A_TERMS', self._getdata(self._path / 'TruthCtr.A_TERMS.fits').T),
+            time_filter_den=aotpy.Image('TruthCtr.B_TERMS', self._getdata(self._path / 'TruthCtr.B_TERMS.fits').T),
             measurements_to_modes=aotpy.Image('TruthCtr.SENSOR_2_MODES', s2m),
         ))
 
     def _handle_ngs_data(self, ho_loop_file, ho_pixel_file):
         self.system.ao_mode = 'SCAO'
-        ho_loop_frame = fits.getdata(ho_loop_file, extname='HOLoopFrame')
-        ho_pix_frame = fits.getdata(ho_pixel_file, extname='HOPixelFrame')
+        self._prefetch(*(self._path / f for f in [
+            'HOAcq.DET1.REFSLP_WITH_OFFSETS.fits', 'HOAcq.DET1.DARK.fits', 'HOAcq.DET1.WEIGHT.fits',
+            'HOAcq.DET1.BACKGROUND.fits', 'CLMatrixOptimiser.S2M.fits', 'CLMatrixOptimiser.M2S.fits',
+            'HOCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits', 'HODet.CFG.DYNAMIC.fits', 'HOCtr.A_TERMS.fits',
+            'HOCtr.B_TERMS.fits', 'CLMatrixOptimiser.M2V.fits', 'CLMatrixOptimiser.V2M.fits'
+        ]))
+        ho_loop_frame = self._read_loop_frame(ho_loop_file, 'HOLoopFrame')
+        ho_pix_frame = self._read_loop_frame(ho_pixel_file, 'HOPixelFrame')
 
         ho_timestamps = ho_loop_frame['Seconds'] + ho_loop_frame['USeconds'] / 1.e6
         self.system.date_beginning = datetime.utcfromtimestamp(ho_timestamps[0])
@@ -309,27 +331,27 @@ class ERISTranslator(ESOTranslator):
         eris_data_path = importlib.resources.files('aotpy.data') / 'ERIS'
         with importlib.resources.as_file(eris_data_path / 'ho_subap.fits') as p:
             subaperture_mask = image_from_file(p, name='LO WFS SUBAPERTURE MASK')
-        n_valid_subapertures = np.count_nonzero(subaperture_mask.data != -1)
+        n_valid_subapertures = len(aotpy.WavefrontSensor.get_subaperture_positions(subaperture_mask))
 
-        reference = self._stack_slopes(fits.getdata(self._path / 'HOAcq.DET1.REFSLP_WITH_OFFSETS.fits'),
+        reference = self._stack_slopes(self._getdata(self._path / 'HOAcq.DET1.REFSLP_WITH_OFFSETS.fits'),
                                        slope_axis=1)[0]
         ho_wfs = aotpy.ShackHartmann(
             uid='HO WFS',
             source=ngs,
             n_valid_subapertures=n_valid_subapertures,
-            measurements=aotpy.Image('Gradients', self._stack_slopes(ho_loop_frame['Gradients'], slope_axis=1)),
+            measurements=aotpy.Image('Gradients', self._loop_slopes(ho_loop_frame['Gradients'])),
             ref_measurements=aotpy.Image('HOAcq.DET1.REFSLP_WITH_OFFSETS.fits', reference),
             subaperture_mask=subaperture_mask,
             mask_offsets=[aotpy.Coordinates(0, 0)],
-            subaperture_intensities=aotpy.Image('Intensities', ho_loop_frame['Intensities'])
+            subaperture_intensities=aotpy.Image('Intensities', self._loop_data(ho_loop_frame['Intensities']))
         )
         self.system.wavefront_sensors.append(ho_wfs)
 
         ho_wfs.detector = aotpy.Detector(
             uid='DET1',
-            dark=image_from_file(self._path / 'HOAcq.DET1.DARK.fits'),
-            weight_map=image_from_file(self._path / 'HOAcq.DET1.WEIGHT.fits'),
-            sky_background=image_from_file(self._path / 'HOAcq.DET1.BACKGROUND.fits'),
+            dark=self._image_from_file(self._path / 'HOAcq.DET1.DARK.fits'),
+            weight_map=self._image_from_file(self._path / 'HOAcq.DET1.WEIGHT.fits'),
+            sky_background=self._image_from_file(self._path / 'HOAcq.DET1.BACKGROUND.fits'),
             pixel_intensities=aotpy.Image(name='HO Pixels',
                                           data=self._get_pixel_data_from_table(ho_pix_frame),
                                           time=aotpy.Time('HO Pixel Time',
@@ -338,23 +360,23 @@ class ERISTranslator(ESOTranslator):
         ho_wfs.subaperture_size = \
             ho_wfs.detector.pixel_intensities.data.shape[0] // ho_wfs.subaperture_mask.data.shape[0]
 
-        s2m = self._stack_slopes(fits.getdata(self._path / 'CLMatrixOptimiser.S2M.fits'), slope_axis=1)
-        m2s = self._stack_slopes(fits.getdata(self._path / 'CLMatrixOptimiser.M2S.fits'), slope_axis=0)
+        s2m = self._stack_slopes(self._getdata(self._path / 'CLMatrixOptimiser.S2M.fits'), slope_axis=1)
+        m2s = self._stack_slopes(self._getdata(self._path / 'CLMatrixOptimiser.M2S.fits'), slope_axis=0)
 
         self.system.loops.append(aotpy.ControlLoop(
             uid='High-order loop',
             input_sensor=ho_wfs,
             commanded_corrector=self.dsm,
-            commands=aotpy.Image('DSM_positions', ho_loop_frame['DSM_Positions']),
+            commands=aotpy.Image('DSM_positions', self._loop_data(ho_loop_frame['DSM_Positions'])),
             ref_commands=aotpy.Image('HOCtr.ACT_POS_REF_MAP_WITH_OFFSETS',
-                                     fits.getdata(self._path / 'HOCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]),
+                                     self._getdata(self._path / 'HOCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]),
             time=ho_time,
-            framerate=fits.getheader(self._path / 'HODet.CFG.DYNAMIC.fits')['FREQ'],
-            time_filter_num=aotpy.Image('HOCtr.A_TERMS', fits.getdata(self._path / 'HOCtr.A_TERMS.fits').T),
-            time_filter_den=aotpy.Image('HOCtr.B_TERMS', fits.getdata(self._path / 'HOCtr.B_TERMS.fits').T),
+            framerate=self._getheader(self._path / 'HODet.CFG.DYNAMIC.fits')['FREQ'],
+            time_filter_num=aotpy.Image('HOCtr.A_TERMS', self._getdata(self._path / 'HOCtr.A_TERMS.fits').T),
+            time_filter_den=aotpy.Image('HOCtr.B_TERMS', self._getdata(self._path / 'HOCtr.B_TERMS.fits').T),
             measurements_to_modes=aotpy.Image('CLMatrixOptimiser.S2M', s2m),
-            modes_to_commands=image_from_file(self._path / 'CLMatrixOptimiser.M2V.fits'),
-            commands_to_modes=image_from_file(self._path / 'CLMatrixOptimiser.V2M.fits'),
+            modes_to_commands=self._image_from_file(self._path / 'CLMatrixOptimiser.M2V.fits'),
+            commands_to_modes=self._image_from_file(self._path / 'CLMatrixOptimiser.V2M.fits'),
             modes_to_measurements=aotpy.Image('CLMatrixOptimiser.M2S', m2s),
         ))
 
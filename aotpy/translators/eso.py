@@ -7,32 +7,186 @@ functionality).
 
 """
 
+import os
+import re
+import threading
 import warnings
 from abc import abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import timedelta, datetime, timezone
+from pathlib import Path
 
 import astropy.table
 import numpy as np
 from astropy.io import fits
 from astropy.time import Time
 
-try:
-    from pyvo.dal import tap
-except (ImportError, ModuleNotFoundError):
-    tap = None
-
+import aotpy
 from ..core.base import Metadatum
+from ..io.fits.utils import image_from_file, image_from_hdus
 from .base import BaseTranslator
 
 ESO_TAP_OBS = "https://archive.eso.org/tap_obs"
 
+# Thread pool shared by all ESO translators for loading calibration files concurrently. Loading is I/O bound (especially
+# on network filesystems), so threads are enough to overlap the latency of opening and reading each file.
+_io_executor: ThreadPoolExecutor | None = None
+_io_executor_lock = threading.Lock()
+
+
+def _import_tap():
+    # pyvo is only imported when the archive is queried, since it is slow to import and rarely needed
+    try:
+        from pyvo.dal import tap
+    except (ImportError, ModuleNotFoundError):
+        return None
+    return tap
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=ESOTranslator.io_workers, thread_name_prefix='aotpy-io')
+        return _io_executor
+
+
+def _read_hdus(path: str | os.PathLike) -> fits.HDUList:
+    """Read all HDUs in file into memory, so that they can still be used after the file is closed."""
+    with fits.open(path, memmap=False) as hdus:
+        for hdu in hdus:
+            _ = hdu.data
+        return hdus
+
+
+class _SegmentedTable:
+    """Binary table split over several segment files, which can be accessed as if it were a single table.
+
+    Columns with one value per frame are small, so they are concatenated right away. Other columns are concatenated
+    lazily (see `LazyArray.concatenate`), so that the segments are only read when needed."""
+
+    def __init__(self, tables: list[fits.FITS_rec]) -> None:
+        self.tables = tables
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self.tables)
+
+    def __getitem__(self, name: str) -> np.ndarray | aotpy.LazyArray:
+        if len(self.tables) == 1:
+            return self.tables[0][name]
+        columns = [t[name] for t in self.tables]
+        if columns[0].ndim == 1:
+            return np.concatenate(columns)
+        return aotpy.LazyArray.concatenate(columns)
+
 
 class ESOTranslator(BaseTranslator):
     """Abstract class for translators for ESO systems.
 
     Translators are able to convert non-standard AO telemetry data files into an `AOSystem` object.
+
+    ESO systems produce many small calibration files. Translators declare the files they need via `_prefetch`, which
+    loads them concurrently through a thread pool shared by all ESO translators, and then access them with `_getdata`,
+    `_getheader` and `_image_from_file`.
+
+    Loop data is read from memory-mapped binary tables. In lazy mode, the translated images refer to the memory-mapped
+    columns through `LazyArray` objects, and derived data (such as slopes separated into tip and tilt or windowed
+    pixels) is only computed, one chunk of frames at a time, when it is requested by the writer or the user.
+    Otherwise, derived data is computed right away and loaded into memory.
     """
 
+    _lazy: bool = False
+    """Whether large loop data is wrapped in `LazyArray` objects instead of being loaded into memory."""
+
+    io_workers: int = 8
+    """Maximum number of threads used to load calibration files concurrently. If lower than 2, files are loaded
+    sequentially. Must be set before the first translation."""
+
+    def _prefetch(self, *paths: str | os.PathLike) -> None:
+        """
+        Start loading the files in `paths` concurrently. Files that are not prefetched are loaded when first accessed.
+
+        Parameters
+        ----------
+        *paths
+            Paths to the FITS files that will be needed during translation.
+        """
+        prefetched = self.__dict__.setdefault('_prefetched', {})
+        for path in paths:
+            path = Path(path)
+            if path in prefetched:
+                continue
+            if self.io_workers < 2:
+                future = Future()
+                try:
+                    future.set_result(_read_hdus(path))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = _get_io_executor().submit(_read_hdus, path)
+            prefetched[path] = future
+
+    def _clear_prefetched(self) -> None:
+        """
+        Discard all prefetched files. Should be called at the end of the translation, in order to free memory.
+        """
+        self.__dict__.pop('_prefetched', None)
+
+    def _get_hdus(self, path: str | os.PathLike) -> fits.HDUList:
+        path = Path(path)
+        prefetched = self.__dict__.setdefault('_prefetched', {})
+        if path not in prefetched:
+            self._prefetch(path)
+        return prefetched[path].result()
+
+    def _getdata(self, path: str | os.PathLike, extname: str = None) -> np.ndarray:
+        """
+        Equivalent of `astropy.io.fits.getdata` that uses prefetched files.
+
+        Parameters
+        ----------
+        path
+            Path to the FITS file.
+        extname : optional
+            Name of the extension containing the data. If omitted, the primary HDU is used, unless it has no data, in
+            which case the first extension is used.
+        """
+        hdus = self._get_hdus(path)
+        if extname is not None:
+            return hdus[extname].data
+        if hdus[0].data is None and len(hdus) > 1:
+            return hdus[1].data
+        return hdus[0].data
+
+    def _getheader(self, path: str | os.PathLike) -> fits.Header:
+        """
+        Equivalent of `astropy.io.fits.getheader` (primary header) that uses prefetched files.
+
+        Parameters
+        ----------
+        path
+            Path to the FITS file.
+        """
+        return self._get_hdus(path)[0].header
+
+    def _image_from_file(self, path: str | os.PathLike, *, name: str = None) -> aotpy.Image:
+        """
+        Equivalent of `aotpy.io.image_from_file` that uses prefetched files.
+
+        Parameters
+        ----------
+        path
+            Path to the FITS file.
+        name : optional
+            Name of the Image. If None, the name is the same as in the file.
+        """
+        try:
+            hdus = self._get_hdus(path)
+        except FileNotFoundError:
+            # Let image_from_file handle missing files (the user is allowed to select them manually)
+            return image_from_file(path, name=name)
+        return image_from_hdus(hdus, name=name)
+
     @abstractmethod
     def _get_eso_telescope_name(self) -> str:
         """
@@ -128,7 +282,7 @@ class ESOTranslator(BaseTranslator):
             metadata['HIERARCH ESO TEL ALT'] = self.system.main_telescope.elevation
 
         if query_archive:
-            if tap is None:
+            if (tap := _import_tap()) is None:
                 raise ImportError("Querying the ESO archive requires the pyvo module."
                                   "You can set the 'query_archive' option to False to skip querying the archive.")
             beg = Time(self.system.date_beginning, scale='utc')
@@ -174,7 +328,7 @@ class ESOTranslator(BaseTranslator):
 
         Requires pyvo.
         """
-        if tap is None:
+        if (tap := _import_tap()) is None:
             raise ImportError("Querying the ESO archive requires the pyvo module.")
 
         delta = timedelta(minutes=1)
@@ -207,7 +361,103 @@ class ESOTranslator(BaseTranslator):
         return -(az - 180) % 360
 
     @staticmethod
-    def _get_pixel_data_from_table(pix_frame: fits.FITS_rec) -> np.ndarray:
+    def _read_loop_frame(path: str | os.PathLike, extname: str = None) -> fits.FITS_rec:
+        """
+        Read the binary table with loop data in `path`. The table is memory-mapped, so that its columns are only read
+        from disk when they are accessed.
+
+        Parameters
+        ----------
+        path
+            Path to the FITS file.
+        extname : optional
+            Name of the extension containing the table. If omitted, the first extension is used.
+        """
+        if extname is None:
+            return fits.getdata(path, ext=1, memmap=True)
+        return fits.getdata(path, extname=extname, memmap=True)
+
+    @staticmethod
+    def _find_segments(path: Path, prefix: str) -> list[Path]:
+        """
+        Find all segments of a recording, which are named `prefix` followed by a four digit number (for example
+        ``CIAO_LOOP_0001.fits``, ``CIAO_LOOP_0002.fits``, etc.), sorted by number.
+
+        Parameters
+        ----------
+        path
+            Path to folder containing the segments.
+        prefix
+            Name of the segment files before the segment number.
+        """
+        pattern = re.compile(rf'{re.escape(prefix)}_(\d{{4}})\.fits')
+        segments = sorted((int(m.group(1)), p) for p in path.iterdir() if (m := pattern.fullmatch(p.name)))
+        if not segments:
+            raise FileNotFoundError(f"No '{prefix}_NNNN.fits' files found in '{path}'.")
+        numbers = [n for n, _ in segments]
+        if numbers != list(range(numbers[0], numbers[0] + len(numbers))):
+            warnings.warn(f"Numbering of '{prefix}' segments is not consecutive: {numbers}.")
+        return [p for _, p in segments]
+
+    @classmethod
+    def _read_segments(cls, segments: list[Path], extname: str = None) -> _SegmentedTable:
+        """
+        Read the (memory-mapped) binary tables in each of the `segments` of a recording and check that they form a
+        contiguous sequence of frames, according to their 'FrameCounter' column.
+
+        Parameters
+        ----------
+        segments
+            Paths to the segment files, in order.
+        extname : optional
+            Name of the extension containing the table. If omitted, the first extension is used.
+        """
+        tables = [cls._read_loop_frame(p, extname) for p in segments]
+        for i in range(1, len(tables)):
+            prev, cur = tables[i - 1], tables[i]
+            if len(prev) == 0 or len(cur) == 0:
+                continue
+            last, first = int(prev['FrameCounter'][-1]), int(cur['FrameCounter'][0])
+            if first <= last:
+                raise ValueError(f"Segment '{segments[i].name}' starts at frame {first}, which is not after the last "
+                                 f"frame of segment '{segments[i - 1].name}' ({last}).")
+            # Frames might be decimated, so the expected step is the one observed inside the previous segment
+            step = int(np.median(np.diff(prev['FrameCounter']))) if len(prev) > 1 else 1
+            if first - last != step:
+                warnings.warn(f"Segment '{segments[i].name}' is not contiguous with segment "
+                              f"'{segments[i - 1].name}': {(first - last) // step - 1} frames seem to be missing.")
+        return _SegmentedTable(tables)
+
+    def _loop_data(self, data: np.ndarray, func=None) -> np.ndarray | aotpy.LazyArray:
+        """
+        Get loop data after applying `func`. If the translator is lazy, a `LazyArray` is returned instead, so that
+        `func` is only applied one chunk at a time when the data is needed.
+
+        Parameters
+        ----------
+        data
+            Loop data, usually a (memory-mapped) column of a FITS binary table.
+        func : optional
+            Function to be applied to the data. It must preserve the length of the first dimension.
+        """
+        if self._lazy:
+            return aotpy.LazyArray(data, func)
+        if isinstance(data, aotpy.LazyArray):
+            data = data.load()
+        return data if func is None else func(data)
+
+    def _loop_slopes(self, data: np.ndarray) -> np.ndarray | aotpy.LazyArray:
+        """
+        Get loop slopes (one frame per row) separated into tip and tilt, see `_loop_data` and `_stack_slopes`.
+
+        Parameters
+        ----------
+        data
+            Loop slopes, usually a (memory-mapped) column of a FITS binary table.
+        """
+        return self._loop_data(data, lambda x: self._stack_slopes(x, slope_axis=1))
+
+    def _get_pixel_data_from_table(self, pix_frame: fits.FITS_rec) -> np.ndarray | aotpy.LazyArray:
         """
         Get properly reshaped pixel data from FITS binary table data.
 
@@ -223,18 +473,31 @@ class ESOTranslator(BaseTranslator):
         sizes_x = sizes_x[0]
         sizes_y = sizes_y[0]
 
-        return pix_frame['Pixels'][:, :sizes_x * sizes_y].reshape(-1, sizes_x, sizes_y)
+        return self._loop_data(pix_frame['Pixels'], lambda x: x[:, :sizes_x * sizes_y].reshape(-1, sizes_x, sizes_y))
 
     @staticmethod
     def _stack_slopes(data: np.ndarray, slope_axis: int) -> np.ndarray:
-        # ESO slopes are ordered tip1, tilt1, tip2, tilt2, etc., so even numbers are tip and odd numbers are tilt.
-        # We separate and then stack them.
-        if slope_axis == 0:
-            tip = data[::2]
-            tilt = data[1::2]
-        elif slope_axis == 1:
-            tip = data[:, ::2]
-            tilt = data[:, 1::2]
-        else:
+        """
+        Separate interleaved slopes into tip and tilt, which are stacked along the second dimension.
+
+        ESO slopes are ordered tip1, tilt1, tip2, tilt2, etc., so even indices are tip and odd indices are tilt. Slopes
+        with dimensions :math:`t \\times 2s_v` become :math:`t \\times 2 \\times s_v` (``slope_axis=1``) and matrices
+        with dimensions :math:`2s_v \\times n` become :math:`s_v \\times 2 \\times n` (``slope_axis=0``).
+
+        The result is a strided view over `data` whenever numpy can split the slope axis without copying, which is the
+        case for any array with a fixed stride along that axis (including non-contiguous ones, such as memory-mapped
+        columns of FITS tables). Otherwise, `numpy.reshape` silently returns a copy.
+
+        Parameters
+        ----------
+        data
+            Array containing interleaved slopes.
+        slope_axis : {0, 1}
+            Axis of `data` along which the slopes are interleaved.
+        """
+        if slope_axis not in (0, 1):
             raise NotImplementedError
-        return np.stack([tip, tilt], axis=1)
+        # Splitting the slope axis into (slope, tip/tilt) only changes the strides, so reshape returns a view unless
+        # numpy cannot express the split with strides
+        shape = data.shape[:slope_axis] + (data.shape[slope_axis] // 2, 2) + data.shape[slope_axis + 1:]
+        return np.moveaxis(data.reshape(shape), slope_axis + 1, 1)
@@ -8,7 +8,6 @@ from datetime import datetime
 from pathlib import Path
 
 import numpy as np
-from astropy.io import fits
 
 import aotpy
 from aotpy.io import image_from_file
@@ -29,9 +28,15 @@ class GALACSITranslator(ESOTranslator):
         Path to folder containing IR data (IRAcq, IRCtr, IRLoopMonitor).
     path_pix
         Path to folder containing pixel data.
+    lazy : default = False
+        Whether large loop data (gradients, pixels, commands, etc.) should be kept in `LazyArray` objects, which are
+        computed one chunk at a time from the memory-mapped files when needed, instead of being loaded into memory.
     """
 
-    def __init__(self, path_lgs: str, path_ir: str, path_pix: str):
+    _supports_lazy = True
+
+    def __init__(self, path_lgs: str, path_ir: str, path_pix: str, *, lazy: bool = False):
+        self._lazy = lazy
         self.system = aotpy.AOSystem(ao_mode='LTAO', name='GALACSI')
         self.system.main_telescope = aotpy.MainTelescope(
             uid='ESO VLT UT4',
@@ -39,14 +44,33 @@ class GALACSITranslator(ESOTranslator):
             inscribed_diameter=8.2
         )
 
+        path_lgs = Path(path_lgs)
+        self._prefetch(*(path_lgs / f for f in [
+            'RTC.USED_ACT_MAP.fits', 'LGSCtr.ACT_POS_MODAL_PROJECTION.fits', 'LGSCtr.A_TERMS.fits',
+            'LGSCtr.B_TERMS.fits', 'JitCtr.A_TERMS.fits', 'JitCtr.B_TERMS.fits',
+            'JitCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits', 'JitCtr.OACT_POS_REF_MAP.fits', 'JitCtr.PROJ_MAP_SCALED.fits',
+            'RTC.IMref4Atm.fits'
+        ]))
+        for i in range(1, 5):
+            self._prefetch(*(path_lgs / f for f in [
+                f'LGSAcq.DET{i}.REFSLP_WITH_OFFSETS.fits', f'LGSAcq.DET{i}.DARK.fits', f'LGSAcq.DET{i}.WEIGHT.fits',
+                f'LGSRecn.REC{i}.HOCM.fits', f'JitRecnOptimiser.JitCM{i}.fits'
+            ]))
+        path_ir = Path(path_ir)
+        self._prefetch(*(path_ir / f for f in [
+            'IRAcq.DET1.REFSLP_WITH_OFFSETS.fits', 'IRAcq.DET1.DARK.fits', 'IRAcq.DET1.WEIGHT.fits',
+            'IRCtr.SENSOR_2_MODES.fits', 'IRCtr.MODES_2_ACT.fits', 'IRCtr.A_TERMS.fits', 'IRCtr.B_TERMS.fits'
+        ]))
+
         self._handle_lgs_data(path_lgs)
         self._handle_ngs_data(path_ir, path_pix)
+        self._clear_prefetched()
 
     def _handle_lgs_data(self, path_lgs):
         path_lgs = Path(path_lgs)
-        lgs_loop_frame = fits.getdata(path_lgs / f'{path_lgs.name}.fits', extname='LGSLoopFrame')
+        lgs_loop_frame = self._read_loop_frame(path_lgs / f'{path_lgs.name}.fits', 'LGSLoopFrame')
 
-        self.dsm_valid = fits.getdata(path_lgs / 'RTC.USED_ACT_MAP.fits')[0] - 1
+        self.dsm_valid = self._getdata(path_lgs / 'RTC.USED_ACT_MAP.fits')[0] - 1
         # We have to subtract one because the array uses one-based indexing unlike Python
 
         self.dsm = aotpy.DeformableMirror(
@@ -66,25 +90,26 @@ class GALACSITranslator(ESOTranslator):
         aof_data_path = importlib.resources.files('aotpy.data') / 'GALACSI'
         with importlib.resources.as_file(aof_data_path / 'subap.fits') as p:
             subaperture_mask = image_from_file(p)
-        n_valid_subapertures = np.count_nonzero(subaperture_mask.data != -1)
-
-        dsm_positions = aotpy.Image('DSM_positions', lgs_loop_frame['DSM_Positions'][:, self.dsm_valid])
-        m2c = image_from_file(path_lgs / 'LGSCtr.ACT_POS_MODAL_PROJECTION.fits')
-        lgs_tfz_num = aotpy.Image('LGSCtr.A_TERMS', fits.getdata(path_lgs / 'LGSCtr.A_TERMS.fits').T)
-        lgs_tfz_den = aotpy.Image('LGSCtr.B_TERMS', fits.getdata(path_lgs / 'LGSCtr.B_TERMS.fits').T)
-        jit_tfz_num = fits.getdata(path_lgs / 'JitCtr.A_TERMS.fits').T
-        jit_tfz_den = fits.getdata(path_lgs / 'JitCtr.B_TERMS.fits').T
-        jit_ref = fits.getdata(path_lgs / 'JitCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]
-        off_ref = fits.getdata(path_lgs / 'JitCtr.OACT_POS_REF_MAP.fits')[0, :]
-        proj_map = fits.getdata(path_lgs / f'JitCtr.PROJ_MAP_SCALED.fits')
-        im_list = np.split(fits.getdata(path_lgs / f'RTC.IMref4Atm.fits')[:, self.dsm_valid], 4, axis=0)
+        n_valid_subapertures = len(aotpy.WavefrontSensor.get_subaperture_positions(subaperture_mask))
+
+        dsm_positions = aotpy.Image('DSM_positions',
+                                    self._loop_data(lgs_loop_frame['DSM_Positions'], lambda x: x[:, self.dsm_valid]))
+        m2c = self._image_from_file(path_lgs / 'LGSCtr.ACT_POS_MODAL_PROJECTION.fits')
+        lgs_tfz_num = aotpy.Image('LGSCtr.A_TERMS', self._getdata(path_lgs / 'LGSCtr.A_TERMS.fits').T)
+        lgs_tfz_den = aotpy.Image('LGSCtr.B_TERMS', self._getdata(path_lgs / 'LGSCtr.B_TERMS.fits').T)
+        jit_tfz_num = self._getdata(path_lgs / 'JitCtr.A_TERMS.fits').T
+        jit_tfz_den = self._getdata(path_lgs / 'JitCtr.B_TERMS.fits').T
+        jit_ref = self._getdata(path_lgs / 'JitCtr.ACT_POS_REF_MAP_WITH_OFFSETS.fits')[:, 0]
+        off_ref = self._getdata(path_lgs / 'JitCtr.OACT_POS_REF_MAP.fits')[0, :]
+        proj_map = self._getdata(path_lgs / f'JitCtr.PROJ_MAP_SCALED.fits')
+        im_list = np.split(self._getdata(path_lgs / f'RTC.IMref4Atm.fits')[:, self.dsm_valid], 4, axis=0)
         for i in range(1, 5):
             llt = aotpy.LaserLaunchTelescope(f'LLT{i}')
             lgs = aotpy.SodiumLaserGuideStar(uid=f'LGS{i}', laser_launch_telescope=llt)
             self.system.sources.append(lgs)
 
-            gradients = self._stack_slopes(lgs_loop_frame[f'WFS{i}_Gradients'], slope_axis=1)
-            reference = self._stack_slopes(fits.getdata(path_lgs / f'LGSAcq.DET{i}.REFSLP_WITH_OFFSETS.fits'),
+            gradients = self._loop_slopes(lgs_loop_frame[f'WFS{i}_Gradients'])
+            reference = self._stack_slopes(self._getdata(path_lgs / f'LGSAcq.DET{i}.REFSLP_WITH_OFFSETS.fits'),
                                            slope_axis=1)[0]
             wfs = aotpy.ShackHartmann(
                 uid=f'LGS WFS{i}',
@@ -93,17 +118,18 @@ class GALACSITranslator(ESOTranslator):
                 measurements=aotpy.Image(f'WFS{i}_Gradients', gradients),
                 ref_measurements=aotpy.Image(f'LGSAcq.DET{i}.REFSLP_WITH_OFFSETS', reference),
                 subaperture_mask=subaperture_mask,
-                subaperture_intensities=aotpy.Image(f'WFS{i}_Intensities', lgs_loop_frame[f'WFS{i}_Intensities'])
+                subaperture_intensities=aotpy.Image(f'WFS{i}_Intensities',
+                                                    self._loop_data(lgs_loop_frame[f'WFS{i}_Intensities']))
             )
 
             wfs.detector = aotpy.Detector(
                 uid=f'LGS DET{i}',
-                dark=image_from_file(path_lgs / f'LGSAcq.DET{i}.DARK.fits'),
-                weight_map=image_from_file(path_lgs / f'LGSAcq.DET{i}.WEIGHT.fits')
+                dark=self._image_from_file(path_lgs / f'LGSAcq.DET{i}.DARK.fits'),
+                weight_map=self._image_from_file(path_lgs / f'LGSAcq.DET{i}.WEIGHT.fits')
             )
             self.system.wavefront_sensors.append(wfs)
 
-            cm = self._stack_slopes(fits.getdata(path_lgs / f'LGSRecn.REC{i}.HOCM.fits')[self.dsm_valid], slope_axis=1)
+            cm = self._stack_slopes(self._getdata(path_lgs / f'LGSRecn.REC{i}.HOCM.fits')[self.dsm_valid], slope_axis=1)
             im = self._stack_slopes(im_list[i - 1], slope_axis=0)
             self.system.loops.append(aotpy.ControlLoop(
                 uid=f'High-order loop {i}',
@@ -123,12 +149,12 @@ class GALACSITranslator(ESOTranslator):
                 telescope=llt
             )
 
-            cm = self._stack_slopes(fits.getdata(path_lgs / f'JitRecnOptimiser.JitCM{i}.fits'), slope_axis=1)
+            cm = self._stack_slopes(self._getdata(path_lgs / f'JitRecnOptimiser.JitCM{i}.fits'), slope_axis=1)
             self.system.loops.append(aotpy.ControlLoop(
                 uid=f'Jitter loop {i}',
                 input_sensor=wfs,
                 commanded_corrector=jit,
-                commands=aotpy.Image(f'Jitter{i}_Positions', lgs_loop_frame[f'Jitter{i}_Positions']),
+                commands=aotpy.Image(f'Jitter{i}_Positions', self._loop_data(lgs_loop_frame[f'Jitter{i}_Positions'])),
                 ref_commands=aotpy.Image(f'Jit{i}Ctr.ACT_POS_REF_MAP_WITH_OFFSETS', jit_ref[(i - 1) * 2: i * 2]),
                 time=lgs_time,
                 framerate=1000,
@@ -147,7 +173,7 @@ class GALACSITranslator(ESOTranslator):
                 uid=f'Jitter Offload loop {i}',
                 input_corrector=jit,
                 commanded_corrector=fsm,
-                commands=aotpy.Image(f'Jitter{i}_Offload', lgs_loop_frame[f'Jitter{i}_Offload']),
+                commands=aotpy.Image(f'Jitter{i}_Offload', self._loop_data(lgs_loop_frame[f'Jitter{i}_Offload'])),
                 ref_commands=aotpy.Image(f'Jit{i}Ctr.OACT_POS_REF_MAP', off_ref[(i - 1) * 2: i * 2]),
                 time=lgs_time,
                 offload_matrix=aotpy.Image(f'Jitter{i}_Offload_Matrix', proj_map[(i - 1) * 2:i * 2, (i - 1) * 2:i * 2])
@@ -157,9 +183,9 @@ class GALACSITranslator(ESOTranslator):
 
     def _handle_ngs_data(self, path_ir, path_pix):
         path_ir = Path(path_ir)
-        ir_loop_frame = fits.getdata(path_ir / f'{path_ir.name}.fits', extname='IRLoopFrame')
+        ir_loop_frame = self._read_loop_frame(path_ir / f'{path_ir.name}.fits', 'IRLoopFrame')
         path_pix = Path(path_pix)
-        pix_loop_frame = fits.getdata(path_pix / f'{path_pix.name}.fits', extname='IRPixelFrame')
+        pix_loop_frame = self._read_loop_frame(path_pix / f'{path_pix.name}.fits', 'IRPixelFrame')
 
         ngs_timestamps = ir_loop_frame['Seconds'] + ir_loop_frame['USeconds'] / 1.e6
         if np.all(ngs_timestamps == 0):
@@ -173,16 +199,17 @@ class GALACSITranslator(ESOTranslator):
         ngs = aotpy.NaturalGuideStar('NGS')
         self.system.sources.append(ngs)
 
-        gradients = self._stack_slopes(ir_loop_frame['WFS_Gradients'], slope_axis=1)
-        reference = self._stack_slopes(fits.getdata(path_ir / 'IRAcq.DET1.REFSLP_WITH_OFFSETS.fits'), slope_axis=1)[0]
+        gradients = self._loop_slopes(ir_loop_frame['WFS_Gradients'])
+        reference = self._stack_slopes(self._getdata(path_ir / 'IRAcq.DET1.REFSLP_WITH_OFFSETS.fits'), slope_axis=1)[0]
         ngs_wfs = aotpy.ShackHartmann(
             uid='NGS WFS1',
             n_valid_subapertures=4,  # All subapertures are valid
-            subaperture_mask=aotpy.Image('NGS_WFS_SUBAPERTURE_MASK', np.array([[1, 3], [2, 4]])),
+            subaperture_mask=aotpy.Image('NGS_WFS_SUBAPERTURE_MASK',
+                                         aotpy.WavefrontSensor.index_subapertures(np.ones((2, 2)), order='F')),
             source=ngs,
             measurements=aotpy.Image('NGS_WFS_Gradients', gradients),
             ref_measurements=aotpy.Image('IRAcq.DET1.REFSLP_WITH_OFFSETS', reference),
-            subaperture_intensities=aotpy.Image('WFS_Intensities', ir_loop_frame['WFS_Intensities'])
+            subaperture_intensities=aotpy.Image('WFS_Intensities', self._loop_data(ir_loop_frame['WFS_Intensities']))
         )
         self.system.wavefront_sensors.append(ngs_wfs)
 
@@ -205,25 +232,26 @@ class GALACSITranslator(ESOTranslator):
 
         ngs_wfs.detector = aotpy.Detector(
             uid='NGS DET1',
-            dark=image_from_file(path_ir / 'IRAcq.DET1.DARK.fits'),
-            weight_map=image_from_file(path_ir / 'IRAcq.DET1.WEIGHT.fits'),
+            dark=self._image_from_file(path_ir / 'IRAcq.DET1.DARK.fits'),
+            weight_map=self._image_from_file(path_ir / 'IRAcq.DET1.WEIGHT.fits'),
             pixel_intensities=aotpy.Image(name='NGS Pixels',
                                           data=self._get_pixel_data_from_table(pix_loop_frame),
                                           time=pix_time)
         )
 
-        s2m = self._stack_slopes(fits.getdata(path_ir / 'IRCtr.SENSOR_2_MODES.fits'), slope_axis=1)
-        m2c = fits.getdata(path_ir / 'IRCtr.MODES_2_ACT.fits')[self.dsm_valid]
+        s2m = self._stack_slopes(self._getdata(path_ir / 'IRCtr.SENSOR_2_MODES.fits'), slope_axis=1)
+        m2c = self._getdata(path_ir / 'IRCtr.MODES_2_ACT.fits')[self.dsm_valid]
         self.system.loops.append(aotpy.ControlLoop(
             uid='Low-order loop',
             input_sensor=ngs_wfs,
             commanded_corrector=self.dsm,
-            commands=aotpy.Image('LO_Positions', ir_loop_frame['LO_Positions'][:, self.dsm_valid]),
+            commands=aotpy.Image('LO_Positions',
+                                 self._loop_data(ir_loop_frame['LO_Positions'], lambda x: x[:, self.dsm_valid])),
             measurements_to_modes=aotpy.Image('IRCtr.SENSOR_2_MODES', s2m),
             modes_to_commands=aotpy.Image('IRCtr.MODES_2_ACT', m2c),
             time=ir_time,
-            time_filter_num=aotpy.Image('IRCtr.A_TERMS', fits.getdata(path_ir / 'IRCtr.A_TERMS.fits').T),
-            time_filter_den=aotpy.Image('IRCtr.B_TERMS', fits.getdata(path_ir / 'IRCtr.B_TERMS.fits').T)
+            time_filter_num=aotpy.Image('IRCtr.A_TERMS', self._getdata(path_ir / 'IRCtr.A_TERMS.fits').T),
+            time_filter_den=aotpy.Image('IRCtr.B_TERMS', self._getdata(path_ir / 'IRCtr.B_TERMS.fits').T)
         ))
 
     def _get_eso_telescope_name(self) -> str:
@@ -11,7 +11,6 @@ import numpy as np
 from astropy.io import fits
 
 import aotpy
-from aotpy.io import image_from_file
 from .eso import ESOTranslator
 
 
@@ -21,21 +20,39 @@ from .eso import ESOTranslator
 class NAOMITranslator(ESOTranslator):
     """Contains functions for translating telemetry data produced by ESO's NAOMI system.
 
+    Long recordings are split into several segments (``NAOMI_LOOP_0001.fits``, ``NAOMI_LOOP_0002.fits``, etc.). All
+    segments found in `path` are translated as a single time series. The calibration files of the first segment are
+    used.
+
     Parameters
     ----------
     path
         Path to folder containing telemetry data.
     at_number : {1, 2, 3, 4}
         Number of the AT that produced the data.
+    lazy : default = False
+        Whether large loop data (gradients, pixels, commands, etc.) should be kept in `LazyArray` objects, which are
+        computed one chunk at a time from the memory-mapped files when needed, instead of being loaded into memory.
     """
 
-    def __init__(self, path: str, at_number: int):
+    _supports_lazy = True
+
+    def __init__(self, path: str, at_number: int, *, lazy: bool = False):
         path = Path(path)
         self._at_number = at_number
+        self._lazy = lazy
+
+        loop_segments = self._find_segments(path, 'NAOMI_LOOP')
+        # Calibration files are saved alongside each segment
+        suffix = loop_segments[0].stem[-5:]
+        self._prefetch(*(path / f'{f}{suffix}.fits' for f in [
+            'Acq.DET1.REFSLP_WITH_OFFSETS', 'Ctr.MODAL_OFFSETS_ROTATED', 'Acq.DET1.WEIGHT', 'Acq.DET1.DARK',
+            'Acq.DET1.FLAT', 'Acq.DET1.DEAD', 'Acq.DET1.BACKGROUND', 'Recn.REC1.CM', 'ModalRecnCalibrat.REF_IM',
+            'Ctr.ACT_POS_REF_MAP', 'Ctr.TERM_A', 'Ctr.TERM_B', 'RTC.M2DM_SCALED', 'RTC.DM2M_SCALED'
+        ]))
 
-        with fits.open(path / 'NAOMI_LOOP_0001.fits', extname='LoopFrame') as hdus:
-            main_hdr = hdus[0].header
-            main_loop_frame: fits.FITS_rec = hdus['LoopFrame'].data
+        main_hdr = fits.getheader(loop_segments[0])
+        main_loop_frame = self._read_segments(loop_segments, extname='LoopFrame')
 
         self.system = aotpy.AOSystem(ao_mode='SCAO', name='NAOMI')
         self.system.main_telescope = aotpy.MainTelescope(
@@ -65,33 +82,35 @@ class NAOMITranslator(ESOTranslator):
         loop_time = aotpy.Time('Loop Time', timestamps=main_timestamps.tolist(),
                                frame_numbers=main_frame_numbers.tolist())
 
-        gradients = self._stack_slopes(main_loop_frame['Gradients'], slope_axis=1)
-        reference = self._stack_slopes(fits.getdata(path / 'Acq.DET1.REFSLP_WITH_OFFSETS_0001.fits'), slope_axis=1)[0]
+        gradients = self._loop_slopes(main_loop_frame['Gradients'])
+        reference = self._stack_slopes(self._getdata(path / f'Acq.DET1.REFSLP_WITH_OFFSETS{suffix}.fits'),
+                                       slope_axis=1)[0]
         wfs = aotpy.ShackHartmann(
             uid='WFS',
             source=ngs,
             n_valid_subapertures=12,
             measurements=aotpy.Image('Gradients', gradients, time=loop_time),
             ref_measurements=aotpy.Image('Acq.DET1.REFSLP_WITH_OFFSETS', reference),
-            subaperture_intensities=aotpy.Image(f'Intensities', main_loop_frame['Intensities'], time=loop_time)
+            subaperture_intensities=aotpy.Image(f'Intensities', self._loop_data(main_loop_frame['Intensities']),
+                                                time=loop_time)
         )
 
         wfs.non_common_path_aberration = aotpy.Aberration(
             uid='NCPA',
             modes=control_modes,
-            coefficients=image_from_file(path / 'Ctr.MODAL_OFFSETS_ROTATED_0001.fits')  # in DM modal space
+            coefficients=self._image_from_file(path / f'Ctr.MODAL_OFFSETS_ROTATED{suffix}.fits')  # in DM modal space
         )
 
         wfs.detector = aotpy.Detector(
             uid='DET',
-            weight_map=image_from_file(path / 'Acq.DET1.WEIGHT_0001.fits'),
-            dark=image_from_file(path / 'Acq.DET1.DARK_0001.fits'),
-            flat_field=image_from_file(path / 'Acq.DET1.FLAT_0001.fits'),
-            bad_pixel_map=image_from_file(path / 'Acq.DET1.DEAD_0001.fits'),
-            sky_background=image_from_file(path / 'Acq.DET1.BACKGROUND_0001.fits')
+            weight_map=self._image_from_file(path / f'Acq.DET1.WEIGHT{suffix}.fits'),
+            dark=self._image_from_file(path / f'Acq.DET1.DARK{suffix}.fits'),
+            flat_field=self._image_from_file(path / f'Acq.DET1.FLAT{suffix}.fits'),
+            bad_pixel_map=self._image_from_file(path / f'Acq.DET1.DEAD{suffix}.fits'),
+            sky_background=self._image_from_file(path / f'Acq.DET1.BACKGROUND{suffix}.fits')
         )
 
-        pix_loop_frame = fits.getdata(path / 'NAOMI_PIXELS_0001.fits')
+        pix_loop_frame = self._read_segments(self._find_segments(path, 'NAOMI_PIXELS'))
         wfs.detector.pixel_intensities = aotpy.Image(
             'Pixels',
             data=self._get_pixel_data_from_table(pix_loop_frame),
@@ -100,34 +119,36 @@ class NAOMITranslator(ESOTranslator):
 
         dm = aotpy.DeformableMirror('DM', telescope=self.system.main_telescope, n_valid_actuators=241)
 
-        modal_coefficients = main_loop_frame['ModalCoefficients']
-        modal_coefficients += fits.getdata(path / 'Ctr.MODAL_OFFSETS_ROTATED_0001.fits') * 2
+        modal_offsets = self._getdata(path / f'Ctr.MODAL_OFFSETS_ROTATED{suffix}.fits') * 2
+        modal_coefficients = self._loop_data(main_loop_frame['ModalCoefficients'],
+                                             lambda x: (x + modal_offsets).astype(x.dtype, copy=False))
         # These are saved in the DM modal space. Need to add the rotated offsets to get the real coefficients that are
         # then sent to the DM after M2DM conversion.
-        s2m = self._stack_slopes(fits.getdata(path / 'Recn.REC1.CM_0001.fits'), slope_axis=1)
+        s2m = self._stack_slopes(self._getdata(path / f'Recn.REC1.CM{suffix}.fits'), slope_axis=1)
         # The S2M matrix is already rotated to to DM modes
-        m2s = self._stack_slopes(fits.getdata(path / 'ModalRecnCalibrat.REF_IM_0001.fits'), slope_axis=0)
+        m2s = self._stack_slopes(self._getdata(path / f'ModalRecnCalibrat.REF_IM{suffix}.fits'), slope_axis=0)
 
         try:
-            ref_commands = aotpy.Image('Ctr.ACT_POS_REF_MAP', fits.getdata(path / 'Ctr.ACT_POS_REF_MAP_0001.fits')[0])
+            ref_commands = aotpy.Image('Ctr.ACT_POS_REF_MAP',
+                                       self._getdata(path / f'Ctr.ACT_POS_REF_MAP{suffix}.fits')[0])
         except FileNotFoundError:
             ref_commands = None
-            warnings.warn("Reference commands file not found ('Ctr.ACT_POS_REF_MAP_0001.fits').")
+            warnings.warn(f"Reference commands file not found ('Ctr.ACT_POS_REF_MAP{suffix}.fits').")
 
         loop = aotpy.ControlLoop(
             uid='Main Loop',
             input_sensor=wfs,
             commanded_corrector=dm,
             time=loop_time,
-            time_filter_num=aotpy.Image('Ctr.TERM_A', fits.getdata(path / 'Ctr.TERM_A_0001.fits')),
-            time_filter_den=aotpy.Image('Ctr.TERM_B', fits.getdata(path / 'Ctr.TERM_B_0001.fits')),
-            commands=aotpy.Image('DM positions', main_loop_frame['Positions'], time=loop_time),
+            time_filter_num=aotpy.Image('Ctr.TERM_A', self._getdata(path / f'Ctr.TERM_A{suffix}.fits')),
+            time_filter_den=aotpy.Image('Ctr.TERM_B', self._getdata(path / f'Ctr.TERM_B{suffix}.fits')),
+            commands=aotpy.Image('DM positions', self._loop_data(main_loop_frame['Positions']), time=loop_time),
             ref_commands=ref_commands,
             modes=control_modes,
             modal_coefficients=aotpy.Image('Modal Coefficients', modal_coefficients, time=loop_time),
             measurements_to_modes=aotpy.Image('Recn.REC1.CM', s2m),
-            modes_to_commands=image_from_file(path / 'RTC.M2DM_SCALED_0001.fits'),
-            commands_to_modes=image_from_file(path / 'RTC.DM2M_SCALED_0001.fits'),
+            modes_to_commands=self._image_from_file(path / f'RTC.M2DM_SCALED{suffix}.fits'),
+            commands_to_modes=self._image_from_file(path / f'RTC.DM2M_SCALED{suffix}.fits'),
             modes_to_measurements=aotpy.Image('ModalRecnCalibrat.REF_IM', m2s),
             closed=main_hdr['ESO AOS LOOP ST'],
             framerate=main_hdr['ESO AOS LOOP RATE']
@@ -148,6 +169,7 @@ class NAOMITranslator(ESOTranslator):
         self.system.wavefront_correctors = [dm]
         self.system.loops = [loop]
         self.system.atmosphere_params = [asm]
+        self._clear_prefetched()
 
     def _get_eso_telescope_name(self) -> str:
         # Allow for both:
@@ -2,11 +2,13 @@
 This module contains a class for translating telemetry data produced by the ALPAO RTC, part of the PAPYRUS system. 
 It assumes the MATLAB files produced by ALPAO RTC have been converted to use struct objects instead of classes. 
 The custom MATLAB function makeTelemetryFileReadable is made for this.
-Note that the use of scipy.io.loadmat to read the .mat files in python suppose that these .mat files were 
-saved with the version -v7 of matlab or anterior. scipy.io.loadmat does not work for files saved with matlab -v7.3.
+Files saved with the version -v7 of matlab or anterior are read with scipy.io.loadmat, which loads the whole file into
+memory. Files saved with matlab -v7.3 are HDF5 files, which are read with h5py. In that case, the large telemetry arrays
+(slopes, detector frames and commands) are read one block at a time, so they do not need to fit in memory.
 """
 
 import importlib.resources
+import weakref
 
 import datetime
 import numpy as np
@@ -20,12 +22,114 @@ try:
 except (ImportError, ModuleNotFoundError):
     loadmat = None
 
+try:
+    import h5py
+except (ImportError, ModuleNotFoundError):
+    h5py = None
+
+
+def _is_hdf5_matfile(file) -> bool:
+    # MATLAB v7.3 files are HDF5 files whose user block starts with a text header that identifies the version
+    with open(file, 'rb') as f:
+        return f.read(128).startswith(b'MATLAB 7.3')
+
+
+def _read_matlab_dataset(ds):
+    """Read a MATLAB variable stored in an HDF5 dataset, simplified like `scipy.io.loadmat` with simplify_cells."""
+    matlab_class = ds.attrs.get('MATLAB_class', b'')
+    if isinstance(matlab_class, bytes):
+        matlab_class = matlab_class.decode()
+    if ds.attrs.get('MATLAB_empty', 0):
+        return np.empty(0)
+    value = ds[()]
+    if matlab_class == 'char':
+        return ''.join(map(chr, value.ravel()))
+    # MATLAB arrays are column-major, so HDF5 stores them with their dimensions reversed
+    value = value.T
+    if matlab_class == 'cell':
+        return [_read_matlab_dataset(ds.file[ref]) for ref in value.ravel()]
+    value = value.squeeze()
+    if matlab_class == 'logical':
+        value = value.astype(bool)
+    return value[()] if value.ndim == 0 else value
+
+
+class _MatlabStruct:
+    """Read-only view of a MATLAB struct stored in a v7.3 (HDF5) MAT-file.
+
+    Fields are read on access, with the same layout as the structs returned by `scipy.io.loadmat` with
+    ``simplify_cells=True``. Large arrays can instead be accessed without reading them with `dataset`."""
+
+    def __init__(self, group) -> None:
+        self._group = group
+
+    def __getitem__(self, key: str):
+        item = self._group[key]
+        if isinstance(item, h5py.Group):
+            return _MatlabStruct(item)
+        return _read_matlab_dataset(item)
+
+    def dataset(self, key: str):
+        """Return the HDF5 dataset of the field `key`, without reading it."""
+        return self._group[key]
+
+
+class _FileHandle:
+    """Owner of an open HDF5 file, which is closed when `close` is called or when the handle is garbage collected."""
 
-class PAPYRUSTranslator(BaseTranslator):
     def __init__(self, file) -> None:
-        if loadmat is None:
-            raise ImportError("Translating PAPYRUS data requires the scipy module.")
-        data = loadmat(file, simplify_cells=True)['data']
+        self.file = file
+        self._finalizer = weakref.finalize(self, file.close)
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+class _StackedDatasets:
+    """Slices of HDF5 datasets with the same first dimension, stacked along a new second dimension if there are several.
+
+    Keeps a reference to the handle of the file, so that it remains open as long as the data may be read."""
+
+    def __init__(self, handle: _FileHandle, *datasets) -> None:
+        self._handle = handle
+        self._datasets = datasets
+
+    def __len__(self) -> int:
+        return len(self._datasets[0])
+
+    def __getitem__(self, key: slice) -> np.ndarray:
+        if len(self._datasets) == 1:
+            return self._datasets[0][key]
+        return np.stack([ds[key] for ds in self._datasets], axis=1)
+
+
+class PAPYRUSTranslator(BaseTranslator):
+    """Contains functions for translating telemetry data produced by the PAPYRUS system.
+
+    Parameters
+    ----------
+    file
+        Path to the MATLAB file containing the telemetry data.
+    lazy : default = False
+        Whether the large telemetry arrays of MATLAB v7.3 files should be kept as `LazyArray` objects, which are only
+        read from the file (one block at a time) when needed. Has no effect for older files, which are fully loaded.
+    """
+
+    _supports_lazy = True
+
+    def __init__(self, file, *, lazy: bool = False) -> None:
+        self._lazy = lazy
+        self._file: _FileHandle | None = None
+        if _is_hdf5_matfile(file):
+            if h5py is None:
+                raise ImportError("Translating PAPYRUS data saved with MATLAB -v7.3 requires the h5py module.")
+            # If the translation fails, the file is closed once the handle is garbage collected
+            self._file = _FileHandle(h5py.File(file, 'r'))
+            data = _MatlabStruct(self._file.file['data'])
+        else:
+            if loadmat is None:
+                raise ImportError("Translating PAPYRUS data requires the scipy module.")
+            data = loadmat(file, simplify_cells=True)['data']
 
         # common fields between SH and PYWFS telemetry
 
@@ -41,7 +145,7 @@ class PAPYRUSTranslator(BaseTranslator):
             inscribed_diameter=1.5,
             pupil_mask=pupil_mask)
 
-        actuator_coordinates = [aotpy.Coordinates(coor[0], coor[1]) for coor in data['wfcCommand']['coordinates']]
+        actuator_coordinates = aotpy.CoordinatesArray(data['wfcCommand']['coordinates'])
         dm = aotpy.DeformableMirror(uid="DM_ALPAO_241",
                                     telescope=self.system.main_telescope,
                                     n_valid_actuators=data['wfc']['offset']['values'].size,
@@ -77,21 +181,10 @@ class PAPYRUSTranslator(BaseTranslator):
             self.system.config = 'WFS : SH'
             self.system.sources = [aotpy.NaturalGuideStar(uid=data['source'])]
 
-            slope_x = data['wfsSlopes']['sx']
-            slope_y = data['wfsSlopes']['sy']
-            measurements = np.empty((slope_x.shape[1], 2, slope_x.shape[0]))
-            measurements[:, 0, :] = np.transpose(slope_x)
-            measurements[:, 1, :] = np.transpose(slope_y)
+            measurements = self._get_slopes(data)
 
-            subaperture_mask = np.array(data['wfsSlopes']['mask'], dtype=int)
-            subaperture_mask[np.where(subaperture_mask == 0)] = -1
-            index = 0
-
-            for j in range(subaperture_mask.shape[1]):
-                for i in range(subaperture_mask.shape[0]):
-                    if subaperture_mask[i, j] != -1:
-                        subaperture_mask[i, j] = index
-                        index += 1
+            # Valid subapertures are numbered in column-major order, as in MATLAB
+            subaperture_mask = aotpy.WavefrontSensor.index_subapertures(data['wfsSlopes']['mask'], order='F')
 
             sh = aotpy.ShackHartmann(uid=data['wfsUid'],
                                      source=self.system.sources[0],
@@ -105,7 +198,7 @@ class PAPYRUSTranslator(BaseTranslator):
             detector = aotpy.Detector(uid='cblue One',
                                       readout_noise=3,
                                       pixel_intensities=aotpy.Image(name="cblue Frames",
-                                                                    data=np.moveaxis(data['wfsImages'], -1, 0),
+                                                                    data=self._get_pixels(data),
                                                                     unit='Cblue One ADU',
                                                                     time=time_pixel_intensities),
                                       frame_rate=float(data['detector']['frameRate']),
@@ -146,7 +239,7 @@ class PAPYRUSTranslator(BaseTranslator):
                 commanded_corrector=dm,
                 input_sensor=sh,
                 commands=aotpy.Image(name='PAPYRUS DM Commands',
-                                     data=np.transpose(data['wfcCommand']['values']),
+                                     data=self._get_commands(data),
                                      unit=data['wfcCommand']['unit'],
                                      time=time_commands),
                 interaction_matrix=aotpy.Image("PAPYRUS Interaction Matrix", interaction_matrix),
@@ -162,21 +255,10 @@ class PAPYRUSTranslator(BaseTranslator):
             self.system.config = 'WFS : Pyramid'
             self.system.sources = [aotpy.NaturalGuideStar(uid='NGS')]
 
-            slope_x = data['wfsSlopes']['sx']
-            slope_y = data['wfsSlopes']['sy']
-            measurements = np.empty((slope_x.shape[1], 2, slope_x.shape[0]))
-            measurements[:, 0, :] = np.transpose(slope_x)
-            measurements[:, 1, :] = np.transpose(slope_y)
-
-            subaperture_mask = np.array(data['wfsSlopes']['mask'], dtype=int)
-            subaperture_mask[np.where(subaperture_mask == 0)] = -1
-            index = 0
+            measurements = self._get_slopes(data)
 
-            for j in range(subaperture_mask.shape[1]):
-                for i in range(subaperture_mask.shape[0]):
-                    if subaperture_mask[i, j] != -1:
-                        subaperture_mask[i, j] = int(index)
-                        index += 1
+            # Valid subapertures are numbered in column-major order, as in MATLAB
+            subaperture_mask = aotpy.WavefrontSensor.index_subapertures(data['wfsSlopes']['mask'], order='F')
 
             pyramid = aotpy.Pyramid(uid=data['wfsUid'],
                                     source=self.system.sources[0],
@@ -190,7 +272,7 @@ class PAPYRUSTranslator(BaseTranslator):
             detector = aotpy.Detector(uid='Ocam2K',
                                       readout_noise=0,
                                       pixel_intensities=aotpy.Image("Ocam2K frames",
-                                                                    np.moveaxis(data['wfsImages'], -1, 0)),
+                                                                    self._get_pixels(data)),
                                       frame_rate=1500.0,
                                       integration_time=data['detector']['exposureTime'],
                                       gain=data['detector']['gain'],
@@ -226,7 +308,7 @@ class PAPYRUSTranslator(BaseTranslator):
                 uid=data['uid'],
                 commanded_corrector=dm,
                 input_sensor=pyramid,
-                commands=aotpy.Image('PAPYRUS DM Commands', np.transpose(data['wfcCommand']['values'])),
+                commands=aotpy.Image('PAPYRUS DM Commands', self._get_commands(data)),
                 interaction_matrix=aotpy.Image("PAPYRUS Interaction Matrix", interaction_matrix),
                 control_matrix=aotpy.Image("PAPYRUS Control Matrix", control_matrix),
                 modes_to_commands=aotpy.Image("M2C", modes_to_commands),
@@ -235,3 +317,59 @@ class PAPYRUSTranslator(BaseTranslator):
                 ref_commands=aotpy.Image('DM flat (i.e loop closed on static aberrations)', ref_commands),
                 time_filter_num=aotpy.Image("Loop gain", np.array([float(gain)])))
             self.system.loops.append(loop)
+
+        if not lazy:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Close the MATLAB v7.3 file. Lazy data (see `lazy`) can no longer be read afterwards. Otherwise, the file is
+        already closed once the translation is done, since all data has been read.
+
+        If this is never called, the file is closed once the translator and all lazy data that reads from it are
+        garbage collected.
+        """
+        if self._file is not None:
+            self._file.close()
+
+    def _loop_data(self, source, func=None) -> np.ndarray | aotpy.LazyArray:
+        """
+        Get telemetry data from a MATLAB v7.3 file, reading `source` in blocks and applying `func` to each block. If
+        the translator is lazy, a `LazyArray` is returned instead, so that the data is only read when needed.
+
+        Parameters
+        ----------
+        source
+            Datasets containing the data, one frame per row.
+        func : optional
+            Function to be applied to each block. It must preserve the length of the first dimension.
+        """
+        array = aotpy.LazyArray(source, func)
+        return array if self._lazy else array.load()
+
+    def _get_slopes(self, data) -> np.ndarray | aotpy.LazyArray:
+        """
+        Get the slopes with dimensions (frame, axis, subaperture).
+        """
+        if isinstance(data, _MatlabStruct):
+            slopes = data['wfsSlopes']
+            return self._loop_data(_StackedDatasets(self._file, slopes.dataset('sx'), slopes.dataset('sy')))
+        return np.stack((data['wfsSlopes']['sx'].T, data['wfsSlopes']['sy'].T), axis=1)
+
+    def _get_pixels(self, data) -> np.ndarray | aotpy.LazyArray:
+        """
+        Get the detector frames with dimensions (frame, y, x).
+        """
+        if isinstance(data, _MatlabStruct):
+            # Stored as (frame, x, y), since HDF5 reverses the dimensions of MATLAB arrays
+            return self._loop_data(_StackedDatasets(self._file, data.dataset('wfsImages')),
+                                   lambda x: x.transpose(0, 2, 1))
+        return np.moveaxis(data['wfsImages'], -1, 0)
+
+    def _get_commands(self, data) -> np.ndarray | aotpy.LazyArray:
+        """
+        Get the DM commands with dimensions (frame, actuator).
+        """
+        if isinstance(data, _MatlabStruct):
+            return self._loop_data(_StackedDatasets(self._file, data['wfcCommand'].dataset('values')))
+        return np.transpose(data['wfcCommand']['values'])
@@ -0,0 +1,210 @@
+"""
+This module contains a registry of the available translators, which enables detecting which translator can handle
+some data and translating it without knowing its origin in advance.
+
+Translator modules (and their optional dependencies) are only imported when a translator is actually selected. In
+order to keep detection cheap, each translator is registered with a probe function that only checks file names and, if
+necessary, FITS headers.
+"""
+
+import importlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Type
+
+from astropy.io import fits
+
+import aotpy
+from .base import BaseTranslator
+
+__all__ = ['register_translator', 'available_translators', 'detect_translators', 'get_translator', 'translate']
+
+
+@dataclass(frozen=True)
+class _TranslatorEntry:
+    module: str
+    """Name of the module that contains the translator."""
+
+    class_name: str
+    """Name of the translator class inside `module`."""
+
+    probe: Callable[[Path], tuple | None]
+    """Function that, given a path, returns the positional arguments for initializing the translator if the path
+    contains data it can handle, or None otherwise."""
+
+
+_TRANSLATORS: dict[str, _TranslatorEntry] = {}
+
+
+def register_translator(name: str, module: str, class_name: str, probe: Callable[[Path], tuple | None]) -> None:
+    """
+    Register a translator, so that it can be detected and selected by `translate`.
+
+    Parameters
+    ----------
+    name
+        Name that identifies the translator (usually the name of the AO system).
+    module
+        Fully qualified name of the module that contains the translator. It is only imported when the translator is
+        selected.
+    class_name
+        Name of the translator class inside `module`.
+    probe
+        Function that receives a path and returns the positional arguments for initializing the translator if the path
+        contains data it can handle, or None otherwise. It should be cheap, avoiding reading anything other than
+        directory listings and headers.
+    """
+    if name in _TRANSLATORS:
+        raise ValueError(f"Translator '{name}' is already registered.")
+    _TRANSLATORS[name] = _TranslatorEntry(module, class_name, probe)
+
+
+def available_translators() -> list[str]:
+    """
+    Return the names of all registered translators.
+    """
+    return list(_TRANSLATORS)
+
+
+def detect_translators(path: str | os.PathLike) -> dict[str, tuple]:
+    """
+    Return the translators that can handle the data in `path`, along with the positional arguments for initializing
+    each of them. No translator modules are imported.
+
+    Parameters
+    ----------
+    path
+        Path to the data (file or folder, depending on the translator).
+    """
+    path = Path(path)
+    detected = {}
+    for name, entry in _TRANSLATORS.items():
+        try:
+            args = entry.probe(path)
+        except OSError:
+            args = None
+        if args is not None:
+            detected[name] = args
+    return detected
+
+
+def get_translator(name: str) -> Type[BaseTranslator]:
+    """
+    Return the translator class registered as `name`, importing its module if necessary.
+
+    Parameters
+    ----------
+    name
+        Name of the translator, as returned by `available_translators`.
+    """
+    try:
+        entry = _TRANSLATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown translator '{name}'. "
+                         f"Available translators: {str(available_translators())[1:-1]}") from None
+    return getattr(importlib.import_module(entry.module), entry.class_name)
+
+
+def translate(path: str | os.PathLike, *, translator: str = None, cache: bool | str | os.PathLike = False,
+              **kwargs) -> aotpy.AOSystem:
+    """
+    Translate the data in `path` into an `AOSystem`, automatically selecting the appropriate translator.
+
+    Parameters
+    ----------
+    path
+        Path to the data (file or folder, depending on the translator).
+    translator : optional
+        Name of the translator to be used. If None, it is detected from the data in `path`.
+    cache : default = False
+        Whether to reuse a previous translation of the same data (see `aotpy.translators.cache.translate_cached`). If a
+        path is given, it is used as the cache directory instead of the default one.
+    **kwargs
+        Keyword arguments passed on to the translator (for example ``at_number`` for NAOMI and CIAO, or ``lazy``).
+
+    Raises
+    ------
+    ValueError
+        If no translator (or more than one translator) recognizes the data in `path`.
+    """
+    if translator is None:
+        detected = detect_translators(path)
+        if not detected:
+            raise ValueError(f"No translator recognizes the data in '{path}'.")
+        if len(detected) > 1:
+            raise ValueError(f"Data in '{path}' is recognized by more than one translator "
+                             f"({str(list(detected))[1:-1]}). Use 'translator' to select one.")
+        translator, args = next(iter(detected.items()))
+        cls = get_translator(translator)
+    else:
+        cls = get_translator(translator)
+        if (args := _TRANSLATORS[translator].probe(Path(path))) is None:
+            raise ValueError(f"Translator '{translator}' does not recognize the data in '{path}'.")
+    if cache is not False:
+        return cls.translate_cached(*args, cache_dir=None if cache is True else cache, **kwargs)
+    return cls(*args, **kwargs).system
+
+
+def _has_extension(path: Path, extname: str) -> bool:
+    # Headers are read lazily, so only the headers up to the requested extension are read
+    with fits.open(path) as hdus:
+        try:
+            hdus[extname]
+        except KeyError:
+            return False
+        return True
+
+
+def _probe_eris(path: Path) -> tuple | None:
+    if not path.is_dir():
+        return None
+    if all(any(path.glob(f'{name}_*.fits')) for name in ('hoLoopData', 'hoPixelData')) or \
+            all(any(path.glob(f'{name}_*.fits')) for name in ('lgsLoopData', 'loLoopData', 'lgsPixelData',
+                                                               'loPixelData')):
+        return path,
+    return None
+
+
+def _probe_galacsi(path: Path) -> tuple | None:
+    # GALACSI data is split into three folders (LGS, IR and pixel data), each containing a file with the same name
+    if not path.is_dir():
+        return None
+    found = {}
+    for folder in path.iterdir():
+        if not (file := folder / f'{folder.name}.fits').is_file():
+            continue
+        for extname in ('LGSLoopFrame', 'IRLoopFrame', 'IRPixelFrame'):
+            if extname not in found and _has_extension(file, extname):
+                found[extname] = folder
+                break
+    if len(found) != 3:
+        return None
+    return found['LGSLoopFrame'], found['IRLoopFrame'], found['IRPixelFrame']
+
+
+def _probe_segments(prefix: str) -> Callable[[Path], tuple | None]:
+    def probe(path: Path) -> tuple | None:
+        if path.is_dir() and any(path.glob(f'{prefix}_LOOP_[0-9][0-9][0-9][0-9].fits')):
+            return path,
+        return None
+
+    return probe
+
+
+def _probe_papyrus(path: Path) -> tuple | None:
+    if not (path.is_file() and path.suffix.lower() == '.mat'):
+        return None
+    with open(path, 'rb') as f:
+        header = f.read(128)
+    # All MATLAB files (including v7.3, which are HDF5 files) start with a descriptive text header
+    if header.startswith(b'MATLAB'):
+        return path,
+    return None
+
+
+register_translator('ERIS', 'aotpy.translators.eris', 'ERISTranslator', _probe_eris)
+register_translator('GALACSI', 'aotpy.translators.galacsi', 'GALACSITranslator', _probe_galacsi)
+register_translator('NAOMI', 'aotpy.translators.naomi', 'NAOMITranslator', _probe_segments('NAOMI'))
+register_translator('CIAO', 'aotpy.translators.ciao', 'CIAOTranslator', _probe_segments('CIAO'))
+register_translator('PAPYRUS', 'aotpy.translators.papyrus', 'PAPYRUSTranslator', _probe_papyrus)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from aotpy.core.image import LazyArray
+
+
+class _CountingFunction:
+    def __init__(self) -> None:
+        self.rows = 0
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        self.rows += len(x)
+        return x * 2
+
+
+@pytest.mark.parametrize('key', [slice(None, None, 100), slice(900, 100, -3), [5, 7], [7, 5, 5, -1], [],
+                                 np.arange(1000) % 7 == 0, (slice(None, None, 50), 1), ([3, 1], slice(None), 2)])
+def test_lazy_array_selection_matches_numpy(key):
+    source = np.arange(6000, dtype=float).reshape(1000, 2, 3)
+    np.testing.assert_array_equal(LazyArray(source, lambda x: x * 2)[key], (source * 2)[key])
+
+
+def test_lazy_array_selection_computes_selected_frames_only():
+    func = _CountingFunction()
+    lazy = LazyArray(np.arange(1000, dtype=float), func)
+    func.rows = 0
+    lazy[::100]
+    assert func.rows == 10
+    func.rows = 0
+    lazy[[5, 7]]
+    assert func.rows == 3
+
+
+def test_lazy_array_selection_out_of_bounds():
+    lazy = LazyArray(np.arange(10))
+    with pytest.raises(IndexError):
+        lazy[[10]]
+    with pytest.raises(IndexError):
+        lazy[np.ones(3, dtype=bool)]
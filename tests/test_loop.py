@@ -0,0 +1,28 @@
+import warnings
+
+import numpy as np
+
+import aotpy
+
+
+def _integrator_loop(gain: float = 0.5) -> aotpy.ControlLoop:
+    telescope = aotpy.MainTelescope('TEL')
+    dm = aotpy.DeformableMirror('DM', telescope=telescope, n_valid_actuators=1)
+    wfs = aotpy.ShackHartmann('WFS', source=aotpy.NaturalGuideStar('NGS'), n_valid_subapertures=1, subaperture_size=1)
+    return aotpy.ControlLoop('LOOP', commanded_corrector=dm, input_sensor=wfs, framerate=1000, delay=1,
+                             time_filter_num=aotpy.Image('NUM', np.array([[0, gain]])),
+                             time_filter_den=aotpy.Image('DEN', np.array([[-1, 1]])))
+
+
+def test_transfer_functions_integrator_at_zero_frequency():
+    loop = _integrator_loop()
+    freqs = np.fft.rfftfreq(8, 1e-3)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        tf = loop.transfer_functions(freqs)
+    assert np.isinf(tf.open_loop[0, 0])
+    assert tf.rejection[0, 0] == 0
+    assert tf.noise[0, 0] == 1
+    assert np.all(np.isfinite(tf.rejection)) and np.all(np.isfinite(tf.noise))
+    np.testing.assert_allclose(tf.rejection[:, 1:], 1 / (1 + tf.open_loop[:, 1:]))
+    np.testing.assert_allclose(tf.rejection + tf.noise, 1)
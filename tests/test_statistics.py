@@ -0,0 +1,17 @@
+import numpy as np
+
+import aotpy
+from aotpy.analysis import FrameStatistics, image_statistics
+
+
+def test_frame_statistics_empty_input():
+    stats = FrameStatistics.from_frames(np.empty((0, 3, 4)))
+    assert stats.mean.shape == stats.variance.shape == stats.min.shape == stats.max.shape == (0,)
+    assert stats.nan_count.shape == (0,)
+
+
+def test_image_statistics_empty_recording():
+    stats = image_statistics(aotpy.Image('x', np.empty((0, 3, 4))))
+    assert len(stats.frames.mean) == 0
+    no_frames = image_statistics(aotpy.Image('x', np.empty((0, 3, 4))), per_frame=False)
+    assert no_frames.frames is None